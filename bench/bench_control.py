@@ -0,0 +1,104 @@
+import os
+import socket
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gateway_code.gw_path  # gw_* import flat
+from gw_alloc import THRUSTERS, ThrusterAllocator
+from gw_drivers import MotorDriver, Watchdog, clamp
+from uuv_link import UdpUuvLink, UuvCmd
+from uuv_proto import WIRE_BINARY, WIRE_JSON, encode_cmd, encode_telem
+
+N     = 20_000
+BATCH = 32   # datagrams queued per poll_telem call
+
+TELEM = {
+    "t": time.time(),
+    "sens":  {"p1": 14.7, "p2": 15.2, "laser1": 102.5, "laser2": 98.0},
+    "state": {"arm": True, "timeout": False, "left": 0.0, "right": 1.0},
+}
+
+
+def per_op_ns(fn, number=N):
+    fn()  # warm up
+    return timeit.timeit(fn, number=number) / number * 1e9
+
+
+def bench_send(wire):
+    # Commands go to a bound socket nobody reads; the kernel drops them
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    link = UdpUuvLink("127.0.0.1", cmd_port=sink.getsockname()[1], telemetry_port=0, wire=wire)
+    cmd  = UuvCmd(t=time.time(), mode="MANUAL", arm=True, surge=1.0, yaw=-1.0, heave=0.0, ballast=0.0)
+    rows = [
+        {"name": f"send.{wire}",     "ns_per_op": per_op_ns(lambda: link.send(cmd, force=True))},
+        {"name": f"send_skip.{wire}", "ns_per_op": per_op_ns(lambda: link.send(cmd))},
+    ]
+    link.tx.close()
+    link.rx.close()
+    sink.close()
+    return rows
+
+
+def bench_poll(wire):
+    link = UdpUuvLink("127.0.0.1", telemetry_port=0, wire=wire)
+    addr = ("127.0.0.1", link.rx.getsockname()[1])
+    tx   = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    data = encode_telem(TELEM, wire)
+
+    # Time only the receive side: queue a batch, then drain it
+    total, polls = 0, 500
+    for _ in range(polls):
+        for _ in range(BATCH):
+            tx.sendto(data, addr)
+        t0 = time.perf_counter_ns()
+        link.poll_telem()
+        total += time.perf_counter_ns() - t0
+    tx.close()
+    link.tx.close()
+    link.rx.close()
+    return [{"name": f"poll_telem.{wire}", "ns_per_op": total / (polls * BATCH)}]
+
+
+def bench_mixer():
+    drv = MotorDriver(Watchdog())
+    drv.handle_cmd(encode_cmd(UuvCmd(t=time.time(), mode="MANUAL", arm=True,
+                                     surge=0.6, yaw=-0.3, heave=0.0, ballast=0.0)), time.monotonic())
+    now = time.monotonic()
+    return [
+        {"name": "clamp",               "ns_per_op": per_op_ns(lambda: clamp(1.7))},
+        {"name": "mixer.outputs",       "ns_per_op": per_op_ns(lambda: drv.outputs(now))},
+        {"name": "mixer.serial_command", "ns_per_op": per_op_ns(lambda: drv.serial_command(now))},
+        {"name": "mixer.telem",         "ns_per_op": per_op_ns(lambda: drv.telem(now))},
+    ]
+
+
+def bench_alloc():
+    # Per-tick allocation cost should not grow with the thruster count
+    rows = []
+    for n in (2, 8, 32):
+        alloc = ThrusterAllocator([dict(THRUSTERS[i % 2], name=f"t{i}") for i in range(n)])
+        rows.append({"name": f"alloc.{n}", "ns_per_op":
+                     per_op_ns(lambda: alloc.pwm(alloc.allocate([0.6, -0.3, 0.0])))})
+    return rows
+
+
+def run():
+    rows = []
+    for wire in (WIRE_BINARY, WIRE_JSON):
+        rows += bench_send(wire)
+        rows += bench_poll(wire)
+    rows += bench_mixer()
+    rows += bench_alloc()
+    return rows
+
+
+def main():
+    for r in run():
+        print(f"{r['name']:24s} {r['ns_per_op']:9.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from frame_present import FramePresenter, frombuffer_format
+from video_worker import FrameRing
+
+SIZES  = [(1000, 750), (1920, 1080)]
+SRC    = (1280, 720)   # decoded stream size from the Pi camera
+FRAMES = 200
+
+
+def legacy_path(screen, src, w, h):
+    frame = cv2.resize(src, (w, h))
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    frame_surface = pygame.surfarray.make_surface(np.rot90(frame))
+    screen.blit(frame_surface, (0, 0))
+
+
+def measure(step):
+    step()  # warm up
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    for _ in range(FRAMES):
+        step()
+    dt = (time.perf_counter() - t0) / FRAMES * 1e3
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return dt, peak - before
+
+
+def run():
+    pygame.init()
+    rows = []
+    src = np.random.randint(0, 255, (SRC[1], SRC[0], 3), dtype=np.uint8)
+    fmt = frombuffer_format()
+
+    for w, h in SIZES:
+        screen = pygame.display.set_mode((w, h))
+
+        # Worker side writes into a ring slot; HUD side only blits the slot surface
+        ring = FrameRing(w, h)
+        presenter = FramePresenter(ring, fmt)
+        scaled = np.empty((h, w, 3), dtype=np.uint8)
+        pre = cv2.resize(src, (w, h))
+
+        def worker_step():
+            k = ring.begin_write()
+            cv2.resize(src, (w, h), dst=scaled)
+            cv2.flip(scaled, 1, dst=ring.frames[k])
+            ring.commit(k)
+
+        def ring_step():
+            k = ring.begin_write()
+            np.copyto(ring.frames[k], pre)  # pipeline already scaled
+            ring.commit(k)
+            presenter.update()
+            presenter.blit(screen)
+
+        def hud_step():
+            presenter.update()
+            presenter.blit(screen)
+
+        cases = [
+            ("legacy resize+cvtColor+rot90+make_surface", lambda: legacy_path(screen, src, w, h)),
+            ("ring worker resize+flip (off HUD process)", worker_step),
+            ("ring copy + present (gst-scaled)",          ring_step),
+            ("present only (HUD side)",                   hud_step),
+        ]
+        for label, step in cases:
+            ms, alloc = measure(step)
+            rows.append({"size": f"{w}x{h}", "path": label, "ms_per_frame": ms, "peak_alloc_bytes": alloc})
+
+        presenter.close()
+        ring.close()
+
+    pygame.quit()
+    return rows
+
+
+def main():
+    for r in run():
+        print(f"{r['size']:>9s}  {r['path']:44s} {r['ms_per_frame']:7.3f} ms  {r['peak_alloc_bytes']:>10d} B")
+
+
+if __name__ == "__main__":
+    main()
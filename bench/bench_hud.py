@@ -0,0 +1,65 @@
+import os
+import sys
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from hud_text import HudText
+from main import make_green
+from test_test import draw_guidelines
+
+N     = 2_000
+ICONS = os.path.join(ROOT, "icon_folder")
+
+
+def per_op_ns(fn, number=N):
+    fn()  # warm up
+    return timeit.timeit(fn, number=number) / number * 1e9
+
+
+def run():
+    pygame.init()
+    screen = pygame.display.set_mode((1000, 750))
+    font   = pygame.font.SysFont("Arial", 22)
+    rows   = []
+
+    for name in ("keyw", "arrow", "pitch"):
+        icon = pygame.image.load(os.path.join(ICONS, f"{name}.png")).convert_alpha()
+        rows.append({"name": f"make_green.{name}", "ns_per_op": per_op_ns(lambda: make_green(icon))})
+
+    # Near, middle and far: one, two and three guide sections drawn
+    for dist in (0.5, 1.0, 2.0):
+        rows.append({"name": f"draw_guidelines.{dist}m",
+                     "ns_per_op": per_op_ns(lambda: draw_guidelines(screen, dist, 1000, 750))})
+
+    # One telemetry readout per frame, as the original loop drew it and as HudText does
+    values = [f"{14.0 + i * 0.01:.2f}" for i in range(100)]
+    it = iter(range(10**9))
+    def legacy():
+        v = values[next(it) % 100]
+        screen.blit(font.render(f"P1: {v} PSI", True, (255, 255, 255)), (70, 15))
+    text = HudText()
+    def cached():
+        v = values[next(it) % 100]
+        text.fields(screen, font, (255, 255, 255), (70, 15), "P1: ", v, " PSI")
+    def static():
+        text.text(screen, font, "ARM: True (Enter to toggle)", (200, 200, 200), (10, 200))
+    rows.append({"name": "text.render_blit",   "ns_per_op": per_op_ns(legacy)})
+    rows.append({"name": "text.hudtext_fields", "ns_per_op": per_op_ns(cached)})
+    rows.append({"name": "text.hudtext_static", "ns_per_op": per_op_ns(static)})
+
+    pygame.quit()
+    return rows
+
+
+def main():
+    for r in run():
+        print(f"{r['name']:24s} {r['ns_per_op']:9.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import json
+import os
+import pty
+import random
+import sys
+import threading
+import time
+import timeit
+import tty
+
+import serial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gateway_code.gw_path  # gw_* and uuv_* import flat
+from gw_drivers import CODEC_TEXT, CODEC_COBS, MotorDriver, Watchdog
+from gw_frame import CobsFramer, decode_cmd_frame, encode_telem_frame
+from gw_serial import LineFramer, SerialLink
+
+BAUD    = 115200
+SECONDS = 3.0
+RATES   = [20, 100, 400]   # command and telemetry Hz
+NOISE   = 1e-3             # probability that a telemetry byte is corrupted
+
+SAMPLE = {"p1_psi": 14.7, "p2_psi": 15.25, "dist1_cm": 102.5, "dist2_cm": 98.0}
+
+
+class FakeNano:
+    """
+    Motor Arduino stand-in on the master side of a pty.
+
+    Parses commands in either codec and streams telemetry at telem_hz.
+    With noise > 0 each telemetry byte is corrupted with that probability,
+    like a marginal USB cable.
+    """
+    def __init__(self, fd, codec, telem_hz, noise=0.0):
+        self.fd       = fd
+        self.codec    = codec
+        self.interval = 1.0 / telem_hz
+        self.noise    = noise
+        self.framer   = CobsFramer() if codec == CODEC_COBS else LineFramer()
+        self.commands = 0
+        self.last_cmd = None
+        self.seq      = 0
+        self._running = False
+        self._thread  = threading.Thread(target=self._run, name="fake-nano", daemon=True)
+
+    def start(self):
+        self._running = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+
+    def telem_bytes(self) -> bytes:
+        if self.codec == CODEC_COBS:
+            self.seq = (self.seq + 1) & 0xFF
+            return encode_telem_frame(self.seq, SAMPLE)
+        return ("T " + json.dumps(SAMPLE) + "\n").encode("utf-8")
+
+    def on_unit(self, unit):
+        try:
+            if self.codec == CODEC_COBS:
+                self.last_cmd = decode_cmd_frame(unit)[1:]
+            else:
+                c, *pwm_us, arm = unit.decode().split()
+                self.last_cmd = (tuple(int(us) for us in pwm_us), arm == "1")
+            self.commands += 1
+        except ValueError:
+            pass
+
+    def corrupt(self, data: bytes) -> bytes:
+        if not self.noise:
+            return data
+        data = bytearray(data)
+        for i in range(len(data)):
+            if random.random() < self.noise:
+                data[i] ^= 1 << random.randrange(8)
+        return bytes(data)
+
+    def _run(self):
+        os.set_blocking(self.fd, False)
+        deadline = time.monotonic()
+        while self._running:
+            try:
+                for unit in self.framer.feed(os.read(self.fd, 4096)):
+                    self.on_unit(unit)
+            except BlockingIOError:
+                pass
+            except OSError:
+                return
+            now = time.monotonic()
+            if now >= deadline:
+                os.write(self.fd, self.corrupt(self.telem_bytes()))
+                deadline += self.interval
+            time.sleep(0.0005)
+
+
+def wrong(sample) -> bool:
+    """True if a sample the driver accepted differs from what the device sent."""
+    return any(not isinstance(sample.get(k), (int, float)) or abs(sample[k] - v) > 1e-3
+               for k, v in SAMPLE.items())
+
+
+def run_link(codec, rate, noise=0.0, seconds=SECONDS):
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    ser = serial.Serial(os.ttyname(slave), BAUD, timeout=0.05)
+
+    nano = FakeNano(master, codec, rate, noise).start()
+    drv  = MotorDriver(Watchdog(), codec)
+    bad  = []
+
+    def on_unit(unit):
+        drv.on_line(unit)
+        if drv.last_arduino and wrong(drv.last_arduino):
+            bad.append(drv.last_arduino)
+            drv.last_arduino = {}
+
+    link = SerialLink(ser, on_unit, drv.framer).start()
+
+    # The HUD keeps the motors armed at full surge so every command is non-trivial
+    drv.handle_cmd(json.dumps({"mode": "MANUAL", "arm": True, "surge": 1.0, "yaw": 0.5}).encode(), time.monotonic())
+    t0 = time.monotonic()
+    deadline = t0
+    sent = 0
+    while time.monotonic() - t0 < seconds:
+        now = time.monotonic()
+        drv.watchdog.feed(drv.channel, now)
+        link.write(drv.serial_command(now))
+        sent += 1
+        deadline += 1.0 / rate
+        time.sleep(max(0.0, deadline - time.monotonic()))
+    time.sleep(0.1)
+
+    link.stop()
+    nano.stop()
+    ser.close()
+    os.close(master)
+
+    stats = drv.serial_stats()
+    return {
+        "codec":         codec,
+        "rate_hz":       rate,
+        "noise":         noise,
+        "cmd_sent":      sent,
+        "cmd_received":  nano.commands,
+        "telem_hz":      stats["samples"] / seconds,
+        "rejected":      stats["malformed"] + stats.get("crc_errors", 0),
+        "wrong_accepted": len(bad),
+        "last_cmd":      nano.last_cmd,
+    }
+
+
+def wire_budget(codec):
+    """Bytes per message and the most messages per second 8N1 at BAUD allows."""
+    drv  = MotorDriver(Watchdog(), codec)
+    nano = FakeNano(-1, codec, 1)
+    cmd   = len(drv.serial_command(time.monotonic()))
+    telem = len(nano.telem_bytes())
+    parse = nano.telem_bytes()
+    unit  = drv.framer.feed(parse)[0]
+    ns    = timeit.timeit(lambda: drv.on_line(unit), number=20_000) / 20_000 * 1e9
+    return {
+        "codec":        codec,
+        "cmd_bytes":    cmd,
+        "telem_bytes":  telem,
+        "max_cmd_hz":   BAUD / 10 / cmd,
+        "max_telem_hz": BAUD / 10 / telem,
+        "parse_ns":     ns,
+    }
+
+
+def run():
+    budget = [wire_budget(c) for c in (CODEC_TEXT, CODEC_COBS)]
+    links  = [run_link(c, r) for r in RATES for c in (CODEC_TEXT, CODEC_COBS)]
+    links += [run_link(c, 100, NOISE) for c in (CODEC_TEXT, CODEC_COBS)]
+    return budget, links
+
+
+def main():
+    budget, links = run()
+    print(f"{'codec':6s} {'cmd B':>6s} {'telem B':>8s} {'max cmd Hz':>11s} {'max telem Hz':>13s} {'parse ns':>9s}")
+    for b in budget:
+        print(f"{b['codec']:6s} {b['cmd_bytes']:6d} {b['telem_bytes']:8d} "
+              f"{b['max_cmd_hz']:11.0f} {b['max_telem_hz']:13.0f} {b['parse_ns']:9.0f}")
+    print()
+    print(f"{'codec':6s} {'rate':>5s} {'noise':>6s} {'cmd sent':>9s} {'cmd rx':>7s} "
+          f"{'telem Hz':>9s} {'rejected':>9s} {'wrong':>6s}")
+    for r in links:
+        print(f"{r['codec']:6s} {r['rate_hz']:5d} {r['noise']:6.0e} {r['cmd_sent']:9d} {r['cmd_received']:7d} "
+              f"{r['telem_hz']:9.1f} {r['rejected']:9d} {r['wrong_accepted']:6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from video_pipeline import TRANSPORT_RTP, TRANSPORT_TCP, PipelineBuilder, decoder_element
+from video_relay import TcpRelay, UdpRelay
+
+# Glass-to-glass latency of the TCP and RTP video transports over a lossy
+# loopback link. Python draws the send time into each frame as a barcode,
+# gst-launch encodes and sends it like the Pi, a video_relay drops packets
+# (RTP) or stalls the stream for a retransmission timeout (TCP), and a
+# second gst-launch decodes with the HUD's source pipeline and hands raw
+# frames back, where the barcode is read against the clock.
+#
+# Needs gst-launch-1.0 with x264enc and avdec_h264 (gstreamer1.0-tools,
+# -plugins-ugly, -libav).
+
+W, H, FPS = 640, 480, 30
+SECONDS   = 10.0
+LOSSES    = [0.0, 0.01, 0.05]
+RTP_LATENCY_MS = 50
+
+BLOCK = W // 32          # 24 bits of ms timestamp + 8-bit checksum, one block each
+PORT  = 47000            # receiver port; senders use PORT + 1
+
+
+def stamp(frame, ms):
+    bits = (ms & 0xFFFFFF) << 8 | (sum(((ms & 0xFFFFFF) >> s) & 0xFF for s in (0, 8, 16)) & 0xFF)
+    for i in range(32):
+        frame[:BLOCK, i * BLOCK:(i + 1) * BLOCK] = 255 if bits >> (31 - i) & 1 else 0
+
+
+def read_stamp(frame):
+    """ms (24 bits) from a decoded frame, or None if the checksum fails."""
+    means = frame[BLOCK // 4:BLOCK * 3 // 4].reshape(BLOCK // 2, 32, BLOCK)[:, :, BLOCK // 4:BLOCK * 3 // 4].mean(axis=(0, 2))
+    bits = 0
+    for m in means:
+        bits = bits << 1 | (1 if m > 128 else 0)
+    ms, check = bits >> 8, bits & 0xFF
+    if sum((ms >> s) & 0xFF for s in (0, 8, 16)) & 0xFF != check:
+        return None
+    return ms
+
+
+def sender_pipeline(transport, port):
+    enc = (f"fdsrc fd=0 blocksize={W * H} ! "
+           f"rawvideoparse width={W} height={H} format=gray8 framerate={FPS}/1 ! videoconvert ! "
+           f"x264enc tune=zerolatency speed-preset=ultrafast key-int-max={FPS} bitrate=3000 ! ")
+    if transport == TRANSPORT_RTP:
+        return enc + f"rtph264pay config-interval=-1 pt=96 mtu=1200 ! udpsink host=127.0.0.1 port={port} sync=false"
+    return enc + ("h264parse config-interval=-1 ! video/x-h264,stream-format=byte-stream ! "
+                  f"tcpserversink host=127.0.0.1 port={port} sync=false")
+
+
+def run_link(transport, loss, seconds=SECONDS):
+    launch  = shutil.which("gst-launch-1.0")
+    rtp     = transport == TRANSPORT_RTP
+    builder = PipelineBuilder("127.0.0.1", PORT, W, H, transport=transport, jitter_ms=RTP_LATENCY_MS)
+
+    # 1) Sender -> lossy relay -> receiver
+    sender = subprocess.Popen([launch, "-q"] + shlex.split(sender_pipeline(transport, PORT + 1)),
+                              stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+    if rtp:
+        relay = UdpRelay(PORT + 1, ("127.0.0.1", PORT), loss=loss).start()
+    else:
+        time.sleep(0.5)   # tcpserversink listening
+        relay = TcpRelay(PORT, ("127.0.0.1", PORT + 1), loss=loss).start()
+    receive = (f"{builder.source()} ! {decoder_element('avdec_h264')} ! videoconvert ! "
+               f"video/x-raw,format=GRAY8,width={W},height={H} ! fdsink fd=1 sync=false")
+    receiver = subprocess.Popen([launch, "-q"] + shlex.split(receive),
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    # 2) Frames stamped with the send time, at FPS
+    sent = [0]
+    def send():
+        frame = np.full((H, W), 96, dtype=np.uint8)
+        t0 = time.monotonic()
+        while time.monotonic() - t0 < seconds:
+            stamp(frame, int(time.time() * 1000))
+            try:
+                sender.stdin.write(frame.tobytes())
+                sender.stdin.flush()
+            except OSError:
+                return
+            sent[0] += 1
+            time.sleep(max(0.0, t0 + sent[0] / FPS - time.monotonic()))
+        sender.stdin.close()
+    thread = threading.Thread(target=send, daemon=True)
+    thread.start()
+
+    # 3) Decoded frames back, latency from the stamp
+    latency, corrupt = [], 0
+    size = W * H
+    end  = time.monotonic() + seconds + 2.0
+    while time.monotonic() < end:
+        data = receiver.stdout.read(size)
+        if len(data) < size:
+            break
+        ms = read_stamp(np.frombuffer(data, dtype=np.uint8).reshape(H, W))
+        if ms is None:
+            corrupt += 1
+            continue
+        latency.append(((int(time.time() * 1000) & 0xFFFFFF) - ms) % 0x1000000)
+        if not thread.is_alive() and time.monotonic() > end - 1.0:
+            break
+
+    thread.join(timeout=1.0)
+    for p in (sender, receiver):
+        p.terminate()
+        try:
+            p.wait(timeout=2.0)
+        except subprocess.TimeoutExpired:
+            p.kill()
+    relay.stop()
+
+    lat = np.array(latency, dtype=float)
+    pct = lambda q: float(np.percentile(lat, q)) if len(lat) else None
+    return {
+        "transport": transport,
+        "loss":      loss,
+        "sent":      sent[0],
+        "shown":     len(latency),
+        "corrupt":   corrupt,
+        "p50_ms":    pct(50),
+        "p95_ms":    pct(95),
+        "max_ms":    float(lat.max()) if len(lat) else None,
+        "relay":     relay.stats(),
+    }
+
+
+def run():
+    if shutil.which("gst-launch-1.0") is None:
+        print("bench_video needs gst-launch-1.0 (gstreamer1.0-tools, x264 and libav plugins)")
+        return []
+    return [run_link(t, loss) for loss in LOSSES for t in (TRANSPORT_TCP, TRANSPORT_RTP)]
+
+
+def main():
+    rows = run()
+    if not rows:
+        return
+    fmt = lambda v: f"{v:8.0f}" if v is not None else f"{'-':>8s}"
+    print(f"{'transport':9s} {'loss':>5s} {'sent':>5s} {'shown':>6s} {'corrupt':>8s} "
+          f"{'p50 ms':>8s} {'p95 ms':>8s} {'max ms':>8s}")
+    for r in rows:
+        print(f"{r['transport']:9s} {r['loss']:5.0%} {r['sent']:5d} {r['shown']:6d} {r['corrupt']:8d} "
+              f"{fmt(r['p50_ms'])} {fmt(r['p95_ms'])} {fmt(r['max_ms'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from uuv_link import UuvCmd
+from uuv_proto import (WIRE_BINARY, WIRE_JSON, encode_cmd, decode_cmd,
+                       encode_telem, decode_telem, encode_ballast, decode_ballast)
+
+N = 100_000
+
+CMD = UuvCmd(t=time.time(), mode="MANUAL", arm=True,
+             surge=1.0, yaw=-1.0, heave=0.0, ballast=0.0)
+
+TELEM = {
+    "t": time.time(),
+    "sens":  {"p1": 14.7, "p2": 15.2, "laser1": 102.5, "laser2": 98.0},
+    "state": {"arm": True, "timeout": False, "left": 0.0, "right": 1.0},
+}
+
+
+def bench(label, encode, decode, msg):
+    rows = []
+    for wire in (WIRE_JSON, WIRE_BINARY):
+        data = encode(msg, wire)
+        enc  = timeit.timeit(lambda: encode(msg, wire), number=N) / N * 1e9
+        dec  = timeit.timeit(lambda: decode(data), number=N) / N * 1e9
+        rows.append((label, wire, len(data), enc, dec))
+    return rows
+
+
+def run():
+    rows = []
+    rows += bench("cmd",     encode_cmd,     decode_cmd,     CMD)
+    rows += bench("telem",   encode_telem,   decode_telem,   TELEM)
+    rows += bench("ballast", encode_ballast, decode_ballast, "1010")
+    return rows
+
+
+def main():
+    print(f"{'msg':8s} {'wire':7s} {'bytes':>6s} {'enc ns':>9s} {'dec ns':>9s}")
+    for label, wire, size, enc, dec in run():
+        print(f"{label:8s} {wire:7s} {size:6d} {enc:9.0f} {dec:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+BENCH = os.path.dirname(os.path.abspath(__file__))
+ROOT  = os.path.dirname(BENCH)
+sys.path.insert(0, BENCH)
+
+# Every metric is "lower is better": ns or ms per operation, bytes.
+
+
+def wire_metrics():
+    import bench_wire
+    out = {}
+    for label, wire, size, enc, dec in bench_wire.run():
+        out[f"wire.{label}.{wire}.bytes"]     = size
+        out[f"wire.{label}.{wire}.encode_ns"] = enc
+        out[f"wire.{label}.{wire}.decode_ns"] = dec
+    return out
+
+def control_metrics():
+    import bench_control
+    return {f"control.{r['name']}_ns": r["ns_per_op"] for r in bench_control.run()}
+
+def serial_metrics():
+    import bench_serial
+    out = {}
+    for codec in (bench_serial.CODEC_TEXT, bench_serial.CODEC_COBS):
+        b = bench_serial.wire_budget(codec)
+        out[f"serial.{codec}.cmd_bytes"]   = b["cmd_bytes"]
+        out[f"serial.{codec}.telem_bytes"] = b["telem_bytes"]
+        out[f"serial.{codec}.parse_ns"]    = b["parse_ns"]
+    return out
+
+def frame_metrics():
+    import bench_frame
+    out = {}
+    for r in bench_frame.run():
+        out[f"frame.{r['size']}.{r['path']}.ms"]          = r["ms_per_frame"]
+        out[f"frame.{r['size']}.{r['path']}.peak_bytes"] = r["peak_alloc_bytes"]
+    return out
+
+def hud_metrics():
+    import bench_hud
+    return {f"hud.{r['name']}_ns": r["ns_per_op"] for r in bench_hud.run()}
+
+
+SUITES = {
+    "wire":    wire_metrics,
+    "control": control_metrics,
+    "serial":  serial_metrics,
+    "frame":   frame_metrics,
+    "hud":     hud_metrics,
+}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(old, new, threshold):
+    """Print metrics present in both runs; return the names that got worse than threshold."""
+    worse = []
+    print(f"{'metric':64s} {'old':>12s} {'new':>12s} {'ratio':>7s}")
+    for name in sorted(set(old) & set(new)):
+        a, b = old[name], new[name]
+        ratio = b / a if a else float("inf") if b else 1.0
+        flag  = ""
+        if ratio > threshold:
+            flag = "  WORSE"
+            worse.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  better"
+        print(f"{name:64s} {a:12.1f} {b:12.1f} {ratio:7.2f}{flag}")
+    return worse
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the HUD/gateway micro-benchmarks and save JSON")
+    ap.add_argument("--only",      help="comma-separated suites: " + ",".join(SUITES))
+    ap.add_argument("--out",       help="result file (default bench/results/<commit>_<time>.json)")
+    ap.add_argument("--compare",   metavar="OLD_JSON", help="compare against an earlier result")
+    ap.add_argument("--threshold", type=float, default=1.2, help="ratio counted as a regression")
+    args = ap.parse_args()
+
+    suites  = args.only.split(",") if args.only else list(SUITES)
+    metrics = {}
+    for name in suites:
+        t0 = time.perf_counter()
+        metrics.update(SUITES[name]())
+        print(f"[bench] {name:8s} {time.perf_counter() - t0:6.1f} s")
+
+    result = {
+        "commit":   git_commit(),
+        "time":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python":   platform.python_version(),
+        "machine":  f"{platform.system()} {platform.machine()} {platform.node()}",
+        "suites":   suites,
+        "metrics":  metrics,
+    }
+    out = args.out or os.path.join(BENCH, "results", f"{result['commit']}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(result, f, indent=1, sort_keys=True)
+    print(f"[bench] {len(metrics)} metrics -> {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        print(f"[bench] vs {old['commit']} ({old['time']})")
+        if compare(old["metrics"], metrics, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
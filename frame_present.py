@@ -0,0 +1,49 @@
+import pygame
+
+
+def frombuffer_format() -> str:
+    """BGR surfaces over raw buffers need pygame 2.1.3+; older versions get RGB."""
+    return "BGR" if pygame.version.vernum >= (2, 1, 3) else "RGB"
+
+
+class FramePresenter:
+    """
+    Frame-to-screen path with no per-frame allocation.
+
+    At startup one Surface is wrapped around each FrameRing slot with
+    pygame.image.frombuffer, so the surfaces share memory with the ring.
+    Presenting the newest frame is then a slot lookup and a single blit:
+    no resize, cvtColor, rot90 or make_surface on the HUD side.
+    """
+    def __init__(self, ring, fmt):
+        self.ring = ring
+        self.surfaces = [
+            pygame.image.frombuffer(ring.frames[k], (ring.w, ring.h), fmt)
+            for k in range(ring.slots)
+        ]
+        self.seq  = 0
+        self.slot = -1
+
+    def update(self) -> bool:
+        """Pick up the newest frame; returns True if it is new since last call."""
+        seq, k = self.ring.latest_slot()
+        if k < 0:
+            return False
+        fresh = seq != self.seq
+        self.seq, self.slot = seq, k
+        return fresh
+
+    @property
+    def surface(self):
+        return self.surfaces[self.slot] if self.slot >= 0 else None
+
+    def blit(self, screen, pos=(0, 0)) -> bool:
+        if self.slot < 0:
+            return False
+        screen.blit(self.surfaces[self.slot], pos)
+        return True
+
+    def close(self):
+        # Surfaces pin the shared-memory buffer; release them before the ring
+        self.surfaces = []
+        self.slot = -1
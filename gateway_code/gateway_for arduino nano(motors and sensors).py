@@ -1,133 +1,228 @@
-import json
+import argparse
 import socket
 import time
 import serial
 
+import gw_path  # repo root on sys.path for the uuv_* modules
+from gw_loop import EventLoop
+from gw_sched import SKIP
+from gw_drivers import CODEC_TEXT, CODEC_COBS, MotorDriver, Watchdog
+from gw_alloc import ThrusterAllocator, load_geometry
+from gw_fanout import TelemetryFanout
+from gw_metrics import Metrics, MetricsHttp, RateMeter, StatsSender, collect_driver, parse_addr
+from gw_serial import SerialLink
+from uuv_recorder import FlightRecorder
+
 PI_BIND_IP = "0.0.0.0"
 CMD_PORT   = 9000
 LAPTOP_IP  = "192.168.0.1"
 TELEM_PORT = 9001
 
+# Extra stations (a second laptop, a logger) send a subscribe datagram here
+# and get telemetry until their lease runs out; see UdpUuvLink.subscribe.
+SUBSCRIBE_PORT  = 9003
+MULTICAST_GROUP = None   # e.g. "239.255.0.1" to also send every tick to a group
+
 WATCHDOG_TIMEOUT = 1.5
 SERIAL_PORT = "/dev/ttyUSB0"
 SERIAL_BAUD = 115200
+INIT_DELAY  = 3.0   # the Nano resets when the port opens
 
-# FIX: increased to 20Hz -- halves response delay without flooding buffer
-# Safe because Arduino loop is now 50ms (also 20Hz)
+# CODEC_COBS switches to binary COBS/CRC frames (gw_frame) once the Arduino
+# sketch speaks them; frames are ~4x smaller than the JSON telemetry lines,
+# so both intervals below can then be shortened well past 20Hz / 10Hz.
+SERIAL_CODEC = CODEC_TEXT
+
+# 20Hz matches the Arduino's 50ms loop. Replies are read continuously by a
+# reader thread, so commands no longer have to flush the input buffer.
 SERIAL_CMD_INTERVAL = 1.0 / 20  # 50ms
+TELEM_INTERVAL      = 0.10      # 10Hz to the laptop
+
+# Flight recording of commands, Arduino samples and telemetry (None = off;
+# --record DIR turns it on for one run)
+RECORD_DIR = None
+
+# Counters, gauges and handler timings (gw_metrics). Prometheus text on
+# http://127.0.0.1:9101/metrics (0 = off); reach it with an SSH tunnel.
+# STATS_ADDR ("host", port) also pushes them as a JSON datagram.
+# The console only gets a status line every STATUS_INTERVAL: writing one
+# per serial tick over a slow SSH session can stall the loop.
+METRICS_BIND    = "127.0.0.1"
+METRICS_PORT    = 9101
+STATS_ADDR      = None
+STATS_INTERVAL  = 1.0
+STATUS_INTERVAL = 0.25
+
+class MotorGateway:
+    """
+    Event handlers for the motor/sensor Arduino:
+      - on_cmd:     UDP command socket readable
+      - on_subscribe: UDP subscribe socket readable
+      - send_serial / send_telem: periodic deadlines
+      - print_status: throttled console line
+    Arduino lines arrive on the SerialLink reader thread straight into
+    the driver. Protocol details live in gw_drivers.MotorDriver.
+    While the SerialLink is down (and reopening) the driver's watchdog
+    channel is marked down, so telemetry shows a timeout.
+    """
+    def __init__(self, rx, tx, ser, laptop_addr, recorder=None, codec=SERIAL_CODEC,
+                 sub=None, multicast=None, allocator=None):
+        self.rx  = rx
+        self.tx  = tx
+        self.sub = sub
+        self.laptop_addr = laptop_addr
+        self.drv  = MotorDriver(Watchdog(WATCHDOG_TIMEOUT), codec, allocator)
+        # The laptop gets telemetry in whatever format its commands arrive in
+        self.fanout = TelemetryFanout(tx, [(laptop_addr, lambda: self.drv.telem_wire)], multicast)
+        self.drv.recorder = recorder
+        self.link = SerialLink(ser, self.drv.on_line, self.drv.framer, self.on_link)
+        self.rate = RateMeter()
+
+    # 1) Receive commands from HUD (UDP) -- drain everything queued, keep newest
+    def on_cmd(self, now):
+        while True:
+            try:
+                data, addr = self.rx.recvfrom(65535)
+            except BlockingIOError:
+                return
+            except Exception:
+                return
+            self.drv.handle_cmd(data, now)
 
-def clamp(x, lo=-1.0, hi=1.0):
-    try:
-        x = float(x)
-    except:
-        return 0.0
-    return max(lo, min(hi, x))
+    # 1b) Subscriptions from other stations
+    def on_subscribe(self, now):
+        while True:
+            try:
+                data, addr = self.sub.recvfrom(512)
+            except BlockingIOError:
+                return
+            except Exception:
+                return
+            self.fanout.on_subscribe(data, addr, now)
+
+    # 1c) Serial link lost or back (SerialLink reader thread)
+    def on_link(self, up, why):
+        self.drv.watchdog.link_down(self.drv.channel, not up)
+        if up:
+            print(f"\n[motor] serial {self.link.ser.port} reopened")
+        else:
+            print(f"\n[motor] {why} -- reopening in {self.link.backoff.delay:.1f}s")
+
+    # 2) Compute motor outputs and send to Arduino at 20Hz
+    def send_serial(self, now):
+        try:
+            self.link.write(self.drv.serial_command(now))
+        except Exception:
+            pass   # counted and reported by the link (on_link)
+
+    # 3) Forward telemetry to the laptop and subscribers at ~10Hz
+    def send_telem(self, now):
+        telem = {"t": time.time(), **self.drv.telem(now)}
+        self.fanout.send(telem, now)
+        if self.drv.recorder:
+            self.drv.recorder.telem(telem, telem["t"])
+
+    # 4) Console status a few times per second
+    def print_status(self, now):
+        hz = self.rate.rate(self.link.writes, now)
+        status = self.drv.status(now) if self.link.up else "[MOTOR LINK DOWN]"
+        print(f"{status}  | serial {hz:4.1f}Hz cmd {self.drv.commands} "
+              f"err {self.link.write_errors + self.link.read_errors}   ", end="\r")
+
+    def collect(self, m):
+        """gw_metrics collector for the motor board."""
+        collect_driver(m, "motor", self.drv)
+        m.from_stats("serial", self.link.stats(), gauges=("up",))
+        m.from_stats("serial", self.drv.serial_stats())
+        m.from_stats("telem",  self.fanout.stats(), gauges=("subscribers",))
+
+def parse_args(argv=None):
+    # Defaults are the vehicle's; the simulator (python -m sim) overrides them
+    ap = argparse.ArgumentParser(description="Motor/sensor Arduino gateway")
+    ap.add_argument("--serial",     default=SERIAL_PORT)
+    ap.add_argument("--baud",       type=int, default=SERIAL_BAUD)
+    ap.add_argument("--codec",      default=SERIAL_CODEC, choices=(CODEC_TEXT, CODEC_COBS))
+    ap.add_argument("--laptop-ip",  default=LAPTOP_IP)
+    ap.add_argument("--init-delay", type=float, default=INIT_DELAY)
+    ap.add_argument("--thrusters",  metavar="JSON", help="thruster geometry (default gw_alloc.THRUSTERS)")
+    ap.add_argument("--record",     metavar="DIR", default=RECORD_DIR, help="record the flight into DIR")
+    ap.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="HTTP metrics port (0 = off)")
+    ap.add_argument("--stats-to",   metavar="HOST:PORT", help="also send metrics as JSON datagrams")
+    return ap.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
 
-def main():
     rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     rx.bind((PI_BIND_IP, CMD_PORT))
-    rx.settimeout(0.05)
+    rx.setblocking(False)
+
+    sub = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sub.bind((PI_BIND_IP, SUBSCRIBE_PORT))
+    sub.setblocking(False)
 
     tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    laptop_addr = (LAPTOP_IP, TELEM_PORT)
+    laptop_addr = (args.laptop_ip, TELEM_PORT)
 
-    ser = serial.Serial(SERIAL_PORT, SERIAL_BAUD, timeout=0.05)
+    # The reader thread blocks up to 50ms for the first byte, then bulk-reads
+    ser = serial.Serial(args.serial, args.baud, timeout=0.05)
 
     print("[Pi] Waiting for Arduino to initialize...")
-    time.sleep(3.0)
+    time.sleep(args.init_delay)
     ser.reset_input_buffer()
     ser.reset_output_buffer()
-    print(f"[Pi] Serial open {SERIAL_PORT} @ {SERIAL_BAUD}")
-
-    last_cmd         = None
-    last_cmd_time    = 0.0
-    last_telem_time  = 0.0
-    last_serial_time = 0.0
-    last_arduino     = {}
+    print(f"[Pi] Serial open {args.serial} @ {args.baud} ({args.codec})")
+
+    recorder = FlightRecorder.in_dir(args.record, "motor") if args.record else None
+    multicast = (MULTICAST_GROUP, TELEM_PORT) if MULTICAST_GROUP else None
+    allocator = ThrusterAllocator(load_geometry(args.thrusters)) if args.thrusters else None
+    gw = MotorGateway(rx, tx, ser, laptop_addr, recorder, args.codec, sub, multicast, allocator)
+
+    metrics = Metrics()
+    loop = EventLoop(metrics)
+    loop.add_reader(rx,  gw.on_cmd,       "cmd")
+    loop.add_reader(sub, gw.on_subscribe, "subscribe")
+    # SKIP keeps the Arduino on a steady grid after a stall instead of a burst
+    loop.call_every(SERIAL_CMD_INTERVAL, gw.send_serial,  "serial", SKIP)
+    loop.call_every(TELEM_INTERVAL,      gw.send_telem,   "telem",  SKIP)
+    loop.call_every(STATUS_INTERVAL,     gw.print_status, "status", SKIP)
+
+    metrics.collect(loop.collect)
+    metrics.collect(gw.collect)
+    http = MetricsHttp(metrics, args.metrics_port, METRICS_BIND) if args.metrics_port else None
+    if http:
+        http.attach(loop)
+    stats_addr = parse_addr(args.stats_to) if args.stats_to else STATS_ADDR
+    if stats_addr:
+        loop.call_every(STATS_INTERVAL, StatsSender(metrics, stats_addr, tx).send, "stats", SKIP)
 
     print(f"[Pi] CMD listen  udp://0.0.0.0:{CMD_PORT}")
-    print(f"[Pi] TELEM send  udp://{LAPTOP_IP}:{TELEM_PORT}")
+    print(f"[Pi] TELEM send  udp://{args.laptop_ip}:{TELEM_PORT}")
+    print(f"[Pi] SUBSCRIBE   udp://0.0.0.0:{SUBSCRIBE_PORT}")
+    if multicast:
+        print(f"[Pi] MULTICAST   udp://{MULTICAST_GROUP}:{TELEM_PORT}")
+    if http:
+        print(f"[Pi] METRICS     http://{METRICS_BIND}:{args.metrics_port}/metrics")
+    if stats_addr:
+        print(f"[Pi] STATS send  udp://{stats_addr[0]}:{stats_addr[1]}")
+    if recorder:
+        print(f"[Pi] Recording   {recorder.path}")
     print("[Pi] Waiting for commands...")
 
-    while True:
-        # 1) Receive latest command from HUD (UDP)
-        try:
-            data, addr = rx.recvfrom(65535)
-            cmd = json.loads(data.decode("utf-8"))
-            last_cmd = cmd
-            last_cmd_time = time.time()
-        except socket.timeout:
-            pass
-        except Exception:
-            pass
-
-        now     = time.time()
-        timeout = (now - last_cmd_time) > WATCHDOG_TIMEOUT
-
-        # 2) Compute motor outputs
-        arm   = False
-        surge = 0.0
-        yaw   = 0.0
-
-        if last_cmd and not timeout:
-            arm   = bool(last_cmd.get("arm",   False))
-            surge = clamp(last_cmd.get("surge", 0.0))
-            yaw   = clamp(last_cmd.get("yaw",   0.0))
-
-        if (not arm) or timeout:
-            surge = 0.0
-            yaw   = 0.0
-
-        left  = clamp(surge + yaw)
-        right = clamp(surge - yaw)
-
-        status = "ARMED" if arm and not timeout else "SAFE"
-        print(f"[{status}] surge={surge:+.2f} yaw={yaw:+.2f} -> L={left:+.2f} R={right:+.2f}   ", end="\r")
-
-        # 3) Send command to Arduino at 20Hz
-        if (now - last_serial_time) >= SERIAL_CMD_INTERVAL:
-            L_us    = int(1500 + left  * 400)
-            R_us    = int(1500 + right * 400)
-            arm_int = 1 if (arm and not timeout) else 0
-            try:
-                ser.reset_input_buffer()
-                ser.write(f"C {L_us} {R_us} {arm_int}\n".encode("utf-8"))
-            except Exception as e:
-                print(f"\nSERIAL ERROR: {e}")
-            last_serial_time = now
-
-        # 4) Read telemetry from Arduino
-        try:
-            line = ser.readline().decode("utf-8", errors="ignore").strip()
-            if line.startswith("T "):
-                line = line[2:]
-            if line.startswith("{") and line.endswith("}"):
-                last_arduino = json.loads(line)
-        except Exception:
-            pass
-
-        # 5) Forward telemetry to laptop at ~10Hz
-        if (now - last_telem_time) > 0.10:
-            telem = {
-                "t": now,
-                "sens": {
-                    "p1":     last_arduino.get("p1_psi",   None),
-                    "p2":     last_arduino.get("p2_psi",   None),
-                    "laser1": last_arduino.get("dist1_cm", None),
-                    "laser2": last_arduino.get("dist2_cm", None),
-                },
-                "state": {
-                    "arm":     arm,
-                    "timeout": timeout,
-                    "left":    left,
-                    "right":   right
-                }
-            }
-            try:
-                tx.sendto(json.dumps(telem).encode("utf-8"), laptop_addr)
-            except Exception:
-                pass
-            last_telem_time = now
+    gw.link.start()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        print(f"\n[Pi] loop stats {loop.stats()}")
+        for name, st in loop.timer_stats().items():
+            print(f"[Pi] timer {name:6s} {st}")
+        print(f"[Pi] serial {gw.link.stats()} {gw.drv.serial_stats()}")
+        print(f"[Pi] fanout {gw.fanout.stats()}")
+    gw.link.stop()
+    if http:
+        http.close()
+    if recorder:
+        recorder.close()
 
 if __name__ == "__main__":
     main()
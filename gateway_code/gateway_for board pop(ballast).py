@@ -1,60 +1,142 @@
+import argparse
 import socket
 import time
 import serial
 
+import gw_path  # repo root on sys.path for the uuv_* modules
+from gw_loop import EventLoop
+from gw_drivers import BallastDriver, Watchdog
+from gw_metrics import Metrics, MetricsHttp, StatsSender, collect_driver, parse_addr
+from gw_serial import SerialLink
+from uuv_recorder import FlightRecorder
+
 PI_BIND_IP  = "0.0.0.0"
 BALLAST_PORT = 9002          # UDP port for ballast commands from HUD
 
 SERIAL_PORT = "/dev/ttyUSB1"  # change to actual port when decided
 SERIAL_BAUD = 9600
+INIT_DELAY  = 2.0   # wait for board to initialize
 
 WATCHDOG_TIMEOUT = 1.5  # seconds -- sends "0000" if no command received
+SEND_INTERVAL    = 0.10 # send to board at 10Hz
 
-def main():
-    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    rx.bind((PI_BIND_IP, BALLAST_PORT))
-    rx.settimeout(0.05)
+RECORD_DIR = None  # ballast command recording directory (None = off, or --record DIR)
 
-    ser = serial.Serial(SERIAL_PORT, SERIAL_BAUD, timeout=0.05)
-    time.sleep(2.0)  # wait for board to initialize
-    print(f"[Ballast] Serial open {SERIAL_PORT} @ {SERIAL_BAUD}")
-    print(f"[Ballast] Listening on udp://0.0.0.0:{BALLAST_PORT}")
+# gw_metrics: http://127.0.0.1:9102/metrics (0 = off), optional JSON datagrams
+# to STATS_ADDR, and a console status line at most every STATUS_INTERVAL
+METRICS_BIND    = "127.0.0.1"
+METRICS_PORT    = 9102
+STATS_ADDR      = None
+STATS_INTERVAL  = 1.0
+STATUS_INTERVAL = 0.25
 
-    last_cmd       = "0000"   # safe default -- all valves closed
-    last_cmd_time  = 0.0
-    last_send_time = 0.0
-    SEND_INTERVAL  = 0.10     # send to board at 10Hz
+class BallastGateway:
+    """
+    The ballast board reports nothing, but its SerialLink reader thread
+    still notices a lost port and reopens it; meanwhile the watchdog
+    channel is down, so the valves command is "0000" as on a timeout.
+    """
+    def __init__(self, rx, ser, recorder=None):
+        self.rx  = rx
+        self.drv = BallastDriver(Watchdog(WATCHDOG_TIMEOUT))
+        self.drv.recorder = recorder
+        self.link = SerialLink(ser, lambda line: None, on_link=self.on_link)
 
-    while True:
-        # 1) Receive ballast command from HUD
+    # 1) Receive ballast command from HUD -- drain everything queued
+    def on_cmd(self, now):
+        while True:
+            try:
+                data, addr = self.rx.recvfrom(1024)
+            except BlockingIOError:
+                return
+            except Exception:
+                return
+            self.drv.handle_cmd(data, now)
+
+    # 1b) Serial link lost or back (SerialLink reader thread)
+    def on_link(self, up, why):
+        self.drv.watchdog.link_down(self.drv.channel, not up)
+        if up:
+            print(f"\n[Ballast] serial {self.link.ser.port} reopened")
+        else:
+            print(f"\n[Ballast] {why} -- reopening in {self.link.backoff.delay:.1f}s")
+
+    # 2) Watchdog -- close all valves if no command received
+    # 3) Send to ballast board at 10Hz
+    def send_serial(self, now):
         try:
-            data, addr = rx.recvfrom(1024)
-            cmd = data.decode("utf-8").strip()
-            # Validate -- must be exactly 4 characters of 0s and 1s
-            if len(cmd) == 4 and all(c in "01" for c in cmd):
-                last_cmd = cmd
-                last_cmd_time = time.time()
-        except socket.timeout:
-            pass
+            self.link.write(self.drv.serial_command(now))
         except Exception:
-            pass
+            pass   # counted and reported by the link (on_link)
 
-        now     = time.time()
-        timeout = (now - last_cmd_time) > WATCHDOG_TIMEOUT
+    # 4) Console status a few times per second
+    def print_status(self, now):
+        link = self.link
+        status = self.drv.status(now) if link.up else "[BALLAST LINK DOWN]"
+        print(f"{status}  | cmd {self.drv.commands} "
+              f"writes {link.writes} err {link.write_errors + link.read_errors}   ", end="\r")
 
-        # 2) Watchdog -- close all valves if no command received
-        active_cmd = "0000" if timeout else last_cmd
+    def collect(self, m):
+        """gw_metrics collector for the ballast board."""
+        collect_driver(m, "ballast", self.drv)
+        m.from_stats("serial", self.link.stats(), gauges=("up",))
 
-        status = "TIMEOUT" if timeout else "ACTIVE"
-        print(f"[{status}] ballast={active_cmd}   ", end="\r")
+def parse_args(argv=None):
+    # Defaults are the vehicle's; the simulator (python -m sim) overrides them
+    ap = argparse.ArgumentParser(description="Ballast board gateway")
+    ap.add_argument("--serial",     default=SERIAL_PORT)
+    ap.add_argument("--baud",       type=int, default=SERIAL_BAUD)
+    ap.add_argument("--init-delay", type=float, default=INIT_DELAY)
+    ap.add_argument("--record",     metavar="DIR", default=RECORD_DIR, help="record ballast commands into DIR")
+    ap.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="HTTP metrics port (0 = off)")
+    ap.add_argument("--stats-to",   metavar="HOST:PORT", help="also send metrics as JSON datagrams")
+    return ap.parse_args(argv)
 
-        # 3) Send to ballast board at 10Hz
-        if (now - last_send_time) >= SEND_INTERVAL:
-            try:
-                ser.write(f"{active_cmd}\n".encode("utf-8"))
-            except Exception as e:
-                print(f"\nSERIAL ERROR: {e}")
-            last_send_time = now
+def main(argv=None):
+    args = parse_args(argv)
+
+    rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    rx.bind((PI_BIND_IP, BALLAST_PORT))
+    rx.setblocking(False)
+
+    # The reader thread blocks up to 50ms at a time; it only watches for errors
+    ser = serial.Serial(args.serial, args.baud, timeout=0.05)
+    time.sleep(args.init_delay)
+    print(f"[Ballast] Serial open {args.serial} @ {args.baud}")
+    print(f"[Ballast] Listening on udp://0.0.0.0:{BALLAST_PORT}")
+
+    recorder = FlightRecorder.in_dir(args.record, "ballast") if args.record else None
+    gw = BallastGateway(rx, ser, recorder)
+
+    metrics = Metrics()
+    loop = EventLoop(metrics)
+    loop.add_reader(rx, gw.on_cmd, "cmd")
+    loop.call_every(SEND_INTERVAL,   gw.send_serial,  "serial")
+    loop.call_every(STATUS_INTERVAL, gw.print_status, "status")
+
+    metrics.collect(loop.collect)
+    metrics.collect(gw.collect)
+    http = MetricsHttp(metrics, args.metrics_port, METRICS_BIND) if args.metrics_port else None
+    if http:
+        http.attach(loop)
+        print(f"[Ballast] Metrics on http://{METRICS_BIND}:{args.metrics_port}/metrics")
+    stats_addr = parse_addr(args.stats_to) if args.stats_to else STATS_ADDR
+    if stats_addr:
+        loop.call_every(STATS_INTERVAL, StatsSender(metrics, stats_addr).send, "stats")
+
+    gw.link.start()
+    try:
+        loop.run()
+    except KeyboardInterrupt:
+        print(f"\n[Ballast] loop stats {loop.stats()}")
+        for name, st in loop.timer_stats().items():
+            print(f"[Ballast] timer {name:6s} {st}")
+        print(f"[Ballast] serial {gw.link.stats()}")
+    gw.link.stop()
+    if http:
+        http.close()
+    if recorder:
+        recorder.close()
 
 if __name__ == "__main__":
     main()
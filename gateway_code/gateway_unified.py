@@ -0,0 +1,326 @@
+import argparse
+import asyncio
+import socket
+import time
+import serial
+
+import gw_path  # repo root on sys.path for the uuv_* modules
+from gw_sched import SKIP, Periodic
+from gw_drivers import CODEC_COBS, CODEC_TEXT, MotorDriver, BallastDriver, Watchdog
+from gw_alloc import ThrusterAllocator, load_geometry
+from gw_fanout import TelemetryFanout
+from gw_serial import Backoff
+from gw_metrics import Metrics, RateMeter, StatsSender, collect_driver, http_response, parse_addr
+from uuv_proto import WIRE_JSON
+from uuv_recorder import FlightRecorder
+
+PI_BIND_IP = "0.0.0.0"
+LAPTOP_IP  = "192.168.0.1"
+TELEM_PORT = 9001
+
+# Other stations subscribe here for a telemetry lease (UdpUuvLink.subscribe)
+SUBSCRIBE_PORT  = 9003
+MULTICAST_GROUP = None   # e.g. "239.255.0.1" to also send every tick to a group
+
+WATCHDOG_TIMEOUT = 1.5
+TELEM_INTERVAL   = 0.10  # 10Hz to the laptop
+STATUS_INTERVAL  = 0.25  # console status line, never faster: slow SSH stalls the loop
+
+# gw_metrics: Prometheus text on http://127.0.0.1:9100/metrics (0 = off), and
+# the same snapshot as a JSON datagram every STATS_INTERVAL to STATS_ADDR
+METRICS_BIND   = "127.0.0.1"
+METRICS_PORT   = 9100
+STATS_ADDR     = None   # ("host", port)
+STATS_INTERVAL = 1.0
+
+# One flight recording for every board: commands, Arduino samples and the
+# merged telemetry (None = off; --record DIR turns it on for one run)
+RECORD_DIR = None
+
+# Every board is one serial device plus the UDP port its commands arrive on.
+# Add entries here to drive more boards from the same process. "driver_args"
+# go to the driver, e.g. {"codec": CODEC_COBS} for binary motor frames;
+# --thrusters adds an "allocator" for a thruster layout other than gw_alloc's.
+BOARDS = [
+    {"name": "motor",   "driver": MotorDriver,   "serial": "/dev/ttyUSB0", "baud": 115200,
+     "udp_port": 9000, "interval": 1.0 / 20, "init_delay": 3.0,
+     "driver_args": {"codec": CODEC_TEXT}},
+    {"name": "ballast", "driver": BallastDriver, "serial": "/dev/ttyUSB1", "baud": 9600,
+     "udp_port": 9002, "interval": 0.10,     "init_delay": 2.0},
+]
+
+
+class _CmdProtocol(asyncio.DatagramProtocol):
+    def __init__(self, drv, hist):
+        self.drv  = drv
+        self.hist = hist   # handler run time
+
+    def datagram_received(self, data, addr):
+        t0 = time.perf_counter_ns()
+        self.drv.handle_cmd(data, time.monotonic())
+        self.hist.add((time.perf_counter_ns() - t0) / 1e9)
+
+
+class _SubscribeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, fanout):
+        self.fanout = fanout
+
+    def datagram_received(self, data, addr):
+        self.fanout.on_subscribe(data, addr, time.monotonic())
+
+
+class Board:
+    """
+    One serial device driven by a gw_drivers driver inside the shared loop.
+
+    A read or write error (USB glitch, cable pulled) closes the port and
+    marks the board's watchdog channel down, so its outputs and telemetry
+    show a timeout. The port is then reopened with doubling backoff
+    (gw_serial.Backoff, as SerialLink) and the reader re-registered once
+    it is back.
+    """
+    def __init__(self, cfg, watchdog):
+        self.name     = cfg["name"]
+        self.port     = cfg["serial"]
+        self.baud     = cfg["baud"]
+        self.udp_port = cfg["udp_port"]
+        self.interval = cfg["interval"]
+        self.drv      = cfg["driver"](watchdog, **cfg.get("driver_args", {}))
+        self.ser      = serial.Serial(cfg["serial"], cfg["baud"], timeout=0)
+        self.up       = True
+        self.backoff  = Backoff()
+
+        self.writes       = 0
+        self.write_errors = 0
+        self.read_errors  = 0
+        self.reopens      = 0
+
+    def attach(self):
+        """Start reading; the port is open and the board initialised."""
+        self.ser.reset_input_buffer()
+        self.ser.reset_output_buffer()
+        asyncio.get_running_loop().add_reader(self.ser.fileno(), self.on_readable)
+
+    def on_readable(self):
+        try:
+            self.drv.feed_serial(self.ser.read(self.ser.in_waiting or 1))
+        except Exception as e:
+            self.read_errors += 1
+            self.link_lost(f"SERIAL READ ERROR: {e}")
+
+    def send_serial(self, now):
+        if not self.up:
+            return
+        try:
+            self.ser.write(self.drv.serial_command(now))
+            self.writes += 1
+        except Exception as e:
+            self.write_errors += 1
+            self.link_lost(f"SERIAL ERROR: {e}")
+
+    def link_lost(self, why):
+        # A port that has gone away stays "readable" forever; stop polling it
+        if not self.up:
+            return
+        self.up = False
+        self.drv.watchdog.link_down(self.drv.channel)
+        loop = asyncio.get_running_loop()
+        try:
+            loop.remove_reader(self.ser.fileno())
+        except (OSError, ValueError):
+            pass
+        try:
+            self.ser.close()
+        except Exception:
+            pass
+        print(f"\n[{self.name}] {why} -- reopening in {self.backoff.delay:.1f}s")
+        loop.call_later(self.backoff.delay, self.reopen)
+
+    def reopen(self):
+        loop = asyncio.get_running_loop()
+        try:
+            self.ser = serial.Serial(self.port, self.baud, timeout=0)
+            self.attach()
+        except Exception:
+            loop.call_later(self.backoff.failed(), self.reopen)
+            return
+        self.up      = True
+        self.backoff.reset()
+        self.reopens += 1
+        self.drv.watchdog.link_down(self.drv.channel, False)
+        print(f"\n[{self.name}] serial {self.port} reopened")
+
+    def status(self, now) -> str:
+        return self.drv.status(now) if self.up else f"[{self.name.upper()} LINK DOWN]"
+
+    def collect(self, m):
+        """gw_metrics collector for this board."""
+        collect_driver(m, self.name, self.drv)
+        m.total("serial_writes",       self.writes,       board=self.name)
+        m.total("serial_write_errors", self.write_errors, board=self.name)
+        m.total("serial_read_errors",  self.read_errors,  board=self.name)
+        m.total("serial_reopens",      self.reopens,      board=self.name)
+        m.set("serial_up", int(self.up), board=self.name)
+        if isinstance(self.drv, MotorDriver):
+            m.from_stats("serial", self.drv.serial_stats(), board=self.name)
+
+
+async def every(sched: Periodic, fn, hist=None):
+    """
+    Call fn(now) on sched's deadlines (gw_sched: drift-free, skip or
+    catch-up after a stall), timing each call into hist if given.
+    """
+    clock = time.perf_counter_ns
+    while True:
+        await asyncio.sleep(max(0, sched.deadline_ns - time.monotonic_ns()) / 1e9)
+        now_ns = time.monotonic_ns()
+        while sched.due(now_ns):
+            sched.fire(now_ns)
+            t0 = clock()
+            fn(now_ns / 1e9)
+            if hist is not None:
+                hist.add((clock() - t0) / 1e9)
+
+
+async def _serve_metrics(metrics, reader, writer):
+    """One scrape per connection (gw_metrics.http_response)."""
+    try:
+        request = await asyncio.wait_for(reader.read(2048), 1.0)
+        writer.write(http_response(metrics, request))
+        await writer.drain()
+    except (asyncio.TimeoutError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run(boards_cfg=BOARDS, laptop_ip=LAPTOP_IP, metrics_port=METRICS_PORT, stats_addr=STATS_ADDR,
+              record_dir=RECORD_DIR):
+    loop = asyncio.get_running_loop()
+    watchdog = Watchdog(WATCHDOG_TIMEOUT)
+    metrics  = Metrics()
+
+    boards = [Board(cfg, watchdog) for cfg in boards_cfg]
+    recorder = FlightRecorder.in_dir(record_dir, "unified") if record_dir else None
+    for b in boards:
+        b.drv.recorder = recorder
+    print("[Pi] Waiting for boards to initialize...")
+    await asyncio.sleep(max(cfg.get("init_delay", 0.0) for cfg in boards_cfg))
+
+    for b in boards:
+        b.attach()
+        await loop.create_datagram_endpoint(
+            lambda drv=b.drv, h=metrics.stage(f"cmd_{b.name}"): _CmdProtocol(drv, h),
+            local_addr=(PI_BIND_IP, b.udp_port))
+        codec = f" ({b.drv.codec})" if isinstance(b.drv, MotorDriver) else ""
+        print(f"[Pi] {b.name:8s} serial {b.port}{codec}  cmd udp://{PI_BIND_IP}:{b.udp_port}")
+
+    # Shared telemetry: every board contributes its section to one datagram
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    tx.setblocking(False)
+    laptop_addr = (laptop_ip, TELEM_PORT)
+
+    # Binary telemetry needs the motor sections; without them fall back to JSON
+    has_sens    = any(isinstance(b.drv, MotorDriver) for b in boards)
+    laptop_wire = lambda: boards[0].drv.telem_wire if has_sens else WIRE_JSON
+    multicast   = (MULTICAST_GROUP, TELEM_PORT) if MULTICAST_GROUP else None
+    fanout      = TelemetryFanout(tx, [(laptop_addr, laptop_wire)], multicast)
+    await loop.create_datagram_endpoint(
+        lambda: _SubscribeProtocol(fanout), local_addr=(PI_BIND_IP, SUBSCRIBE_PORT))
+
+    def send_telem(now):
+        telem = {"t": time.time()}
+        for b in boards:
+            telem.update(b.drv.telem(now))
+        fanout.send(telem, now)
+        if recorder:
+            recorder.telem(telem, telem["t"])
+
+    rate = RateMeter()
+
+    def print_status(now):
+        hz   = rate.rate(boards[0].writes, now)
+        cmds = sum(b.drv.commands for b in boards)
+        errs = sum(b.write_errors + b.read_errors for b in boards)
+        print("  ".join(b.status(now) for b in boards)
+              + f"  | {boards[0].name} {hz:4.1f}Hz cmd {cmds} err {errs}   ", end="\r")
+
+    print(f"[Pi] TELEM send  udp://{laptop_ip}:{TELEM_PORT}")
+    print(f"[Pi] SUBSCRIBE   udp://{PI_BIND_IP}:{SUBSCRIBE_PORT}")
+    if multicast:
+        print(f"[Pi] MULTICAST   udp://{MULTICAST_GROUP}:{TELEM_PORT}")
+
+    if recorder:
+        print(f"[Pi] Recording   {recorder.path}")
+
+    schedules = [(Periodic(b.name, b.interval, SKIP), b.send_serial) for b in boards]
+    schedules.append((Periodic("telem",  TELEM_INTERVAL,  SKIP), send_telem))
+    schedules.append((Periodic("status", STATUS_INTERVAL, SKIP), print_status))
+    if stats_addr:
+        schedules.append((Periodic("stats", STATS_INTERVAL, SKIP), StatsSender(metrics, stats_addr, tx).send))
+        print(f"[Pi] STATS send  udp://{stats_addr[0]}:{stats_addr[1]}")
+
+    @metrics.collect
+    def collect(m):
+        for b in boards:
+            b.collect(m)
+        m.from_stats("telem", fanout.stats(), gauges=("subscribers",))
+        for s, _ in schedules:
+            m.total("timer_fired",   s.fired,   timer=s.name)
+            m.total("timer_skipped", s.skipped, timer=s.name)
+            m.set("timer_late_max_seconds", s.late.max, timer=s.name)
+
+    server = None
+    if metrics_port:
+        server = await asyncio.start_server(
+            lambda r, w: _serve_metrics(metrics, r, w), METRICS_BIND, metrics_port)
+        print(f"[Pi] METRICS     http://{METRICS_BIND}:{metrics_port}/metrics")
+    try:
+        await asyncio.gather(*(every(s, fn, metrics.stage(s.name)) for s, fn in schedules))
+    finally:
+        if server:
+            server.close()
+        print()
+        for s, _ in schedules:
+            print(f"[Pi] timer {s.name:7s} {s.stats()}")
+        print(f"[Pi] fanout {fanout.stats()}")
+        if recorder:
+            recorder.close()
+
+
+def parse_args(argv=None):
+    # Defaults are the vehicle's; the simulator (python -m sim) overrides them.
+    # --serial NAME=PORT repoints one board, e.g. --serial motor=/dev/pts/3
+    ap = argparse.ArgumentParser(description="Unified gateway for every board")
+    ap.add_argument("--serial",     action="append", default=[], metavar="NAME=PORT")
+    ap.add_argument("--laptop-ip",  default=LAPTOP_IP)
+    ap.add_argument("--init-delay", type=float)
+    ap.add_argument("--codec",      choices=(CODEC_TEXT, CODEC_COBS), help="motor board serial codec (default BOARDS)")
+    ap.add_argument("--thrusters",  metavar="JSON", help="thruster geometry (default gw_alloc.THRUSTERS)")
+    ap.add_argument("--record",     metavar="DIR", default=RECORD_DIR, help="record the flight into DIR")
+    ap.add_argument("--metrics-port", type=int, default=METRICS_PORT, help="HTTP metrics port (0 = off)")
+    ap.add_argument("--stats-to",   metavar="HOST:PORT", help="also send metrics as JSON datagrams")
+    return ap.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    ports = dict(s.split("=", 1) for s in args.serial)
+    boards_cfg = []
+    for cfg in BOARDS:
+        cfg = dict(cfg, serial=ports.get(cfg["name"], cfg["serial"]))
+        if args.init_delay is not None:
+            cfg["init_delay"] = args.init_delay
+        if args.codec and cfg["driver"] is MotorDriver:
+            cfg["driver_args"] = dict(cfg.get("driver_args", {}), codec=args.codec)
+        if args.thrusters and cfg["driver"] is MotorDriver:
+            allocator = ThrusterAllocator(load_geometry(args.thrusters))
+            cfg["driver_args"] = dict(cfg.get("driver_args", {}), allocator=allocator)
+        boards_cfg.append(cfg)
+    try:
+        stats_addr = parse_addr(args.stats_to) if args.stats_to else STATS_ADDR
+        asyncio.run(run(boards_cfg, args.laptop_ip, args.metrics_port, stats_addr, args.record))
+    except KeyboardInterrupt:
+        print()
+
+if __name__ == "__main__":
+    main()
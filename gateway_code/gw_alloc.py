@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+
+# Thruster allocation: HUD command axes -> one PWM pulse per thruster.
+#
+# Axes are body frame, NED: surge along +x (forward), heave along +z (down),
+# yaw about +z (nose to starboard). Each thruster has a position (x fwd,
+# y starboard, z down, metres) and a unit thrust direction; its column of
+# the effect matrix B is the force/moment one unit of its thrust produces
+# on each axis. Everything below that depends only on the geometry is
+# computed once, so a tick is one matrix-vector product, one max and one
+# table lookup regardless of how many thrusters there are.
+AXES = ("surge", "yaw", "heave")
+
+LUT_SIZE = 2001   # PWM table entries over thrust -1..1 (0.001 steps, ~0.4us at 400us span)
+
+# The vehicle as built: two stern thrusters, 15cm either side of the centreline.
+# "pwm" is the ESC calibration curve, (thrust, pulse us) points interpolated
+# linearly; add points to model a deadband or asymmetric reverse thrust.
+THRUSTERS = [
+    {"name": "left",  "pos": [-0.30, -0.15, 0.0], "dir": [1.0, 0.0, 0.0],
+     "pwm": [[-1.0, 1100], [0.0, 1500], [1.0, 1900]]},
+    {"name": "right", "pos": [-0.30,  0.15, 0.0], "dir": [1.0, 0.0, 0.0],
+     "pwm": [[-1.0, 1100], [0.0, 1500], [1.0, 1900]]},
+]
+
+
+def load_geometry(path):
+    """Thruster list from a JSON file with the same layout as THRUSTERS."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def effect_matrix(thrusters) -> np.ndarray:
+    """B, shape (len(AXES), N): axis force/moment per unit thrust of each thruster."""
+    pos = np.array([t["pos"] for t in thrusters], dtype=float)
+    d   = np.array([t["dir"] for t in thrusters], dtype=float)
+    d  /= np.linalg.norm(d, axis=1, keepdims=True)
+    moment_z = pos[:, 0] * d[:, 1] - pos[:, 1] * d[:, 0]
+    return np.vstack([d[:, 0], moment_z, d[:, 2]])
+
+
+def pwm_table(thrusters, size=LUT_SIZE) -> np.ndarray:
+    """(N, size) pulse widths in us, one row per thruster, over thrust -1..1."""
+    grid  = np.linspace(-1.0, 1.0, size)
+    table = np.empty((len(thrusters), size), dtype=np.uint16)
+    for i, t in enumerate(thrusters):
+        x, us = np.array(t["pwm"], dtype=float).T
+        table[i] = np.rint(np.interp(grid, x, us))
+    return table
+
+
+class ThrusterAllocator:
+    """
+    Maps a command vector over AXES (each -1..1) to per-thruster thrust and
+    PWM pulses.
+
+    A full-scale command on an axis asks for the most that axis can get
+    with every thruster at full thrust, so with the default geometry
+    surge=1 is both thrusters forward and yaw=1 is left forward, right
+    reverse. An axis no thruster acts on (heave on the default vehicle)
+    is ignored.
+
+    When a command needs more than full thrust somewhere, every thruster is
+    scaled down by the same factor: the vehicle goes slower but along the
+    commanded direction, where clamping each thruster would let yaw eat
+    into surge.
+    """
+    def __init__(self, thrusters=THRUSTERS):
+        self.names = [t["name"] for t in thrusters]
+        self.n     = len(thrusters)
+
+        # 1) Effect matrix and the reach of each axis
+        B = effect_matrix(thrusters)
+        self.reach = np.abs(B).sum(axis=1)
+
+        # 2) Minimum-norm allocation, with command units folded in:
+        #    thrust = pinv(B) @ (command * reach)
+        self.matrix = np.linalg.pinv(B) * self.reach
+
+        # 3) Calibration lookup tables
+        self.table   = pwm_table(thrusters)
+        self._rows   = np.arange(self.n)
+        self._scale  = (LUT_SIZE - 1) / 2.0
+        self.neutral = self.pwm(np.zeros(self.n))
+
+        self.saturated = 0   # ticks that had to be scaled down
+
+    def allocate(self, command) -> np.ndarray:
+        """Thrust per thruster (-1..1) for a command over AXES."""
+        thrust = self.matrix @ np.asarray(command, dtype=float)
+        peak   = np.abs(thrust).max()
+        if peak > 1.0:
+            thrust /= peak
+            self.saturated += 1
+        return thrust
+
+    def pwm(self, thrust) -> np.ndarray:
+        """Pulse widths in us for a thrust vector, through the calibration tables."""
+        idx = np.rint((np.clip(thrust, -1.0, 1.0) + 1.0) * self._scale).astype(np.intp)
+        return self.table[self._rows, idx]
@@ -0,0 +1,287 @@
+import json
+import time
+
+from gw_alloc import AXES, ThrusterAllocator
+from gw_frame import CobsFramer, encode_cmd_frame, decode_telem_frame
+from gw_serial import LineFramer
+from uuv_proto import WIRE_JSON, decode_cmd, decode_ballast, wire_of
+
+
+# Serial codecs for the motor Arduino
+CODEC_TEXT = "text"   # "C L R arm" lines out, "T {json}" lines back
+CODEC_COBS = "cobs"   # COBS/CRC-16 binary frames, see gw_frame
+
+
+def clamp(x, lo=-1.0, hi=1.0):
+    try:
+        x = float(x)
+    except:
+        return 0.0
+    return max(lo, min(hi, x))
+
+
+class Watchdog:
+    """
+    Last-heard times for each command channel, shared by every board.
+    A channel is expired when nothing arrived for `timeout` seconds, or
+    while its board's serial link is marked down.
+    """
+    def __init__(self, timeout=1.5):
+        self.timeout  = timeout
+        self.last     = {}
+        self.trips    = {}   # channel -> times it went from alive to expired
+        self.down     = set()   # channels whose serial link is gone
+        self._tripped = set()
+
+    def feed(self, channel, now):
+        self.last[channel] = now
+        self._tripped.discard(channel)
+
+    def link_down(self, channel, down=True):
+        """Mark a channel's board link down (always expired) or back up."""
+        if down:
+            self.down.add(channel)
+        else:
+            self.down.discard(channel)
+
+    def stale(self, channel, now) -> bool:
+        """expired() without counting a trip, for metrics and other readers."""
+        last = self.last.get(channel)
+        return last is None or (now - last) > self.timeout or channel in self.down
+
+    def expired(self, channel, now) -> bool:
+        last = self.last.get(channel)
+        if last is None:
+            return True
+        if not self.stale(channel, now):
+            return False
+        if channel not in self._tripped:
+            self._tripped.add(channel)
+            self.trips[channel] = self.trips.get(channel, 0) + 1
+        return True
+
+    def state(self, now) -> dict:
+        return {ch: self.stale(ch, now) for ch in self.last}
+
+
+class MotorDriver:
+    """
+    Motor/sensor Arduino protocol, independent of how I/O is scheduled:
+      - handle_cmd(data)    HUD command datagram
+      - serial_command()    command for the Arduino, text line or binary frame
+      - feed_serial(bytes)  raw bytes from the Arduino
+      - on_line(unit)       one complete line or frame (from a SerialLink reader thread)
+      - telem()             sections of the telemetry sent to the laptop
+    Commands and Arduino samples also go to self.recorder when one is set.
+    The serial codec is CODEC_TEXT or CODEC_COBS; self.framer matches it.
+    Thruster outputs come from a gw_alloc.ThrusterAllocator; the serial
+    command carries one pulse per thruster, in geometry order.
+    """
+    channel = "cmd"
+
+    def __init__(self, watchdog: Watchdog, codec=CODEC_TEXT, allocator=None):
+        self.watchdog     = watchdog
+        self.codec        = codec
+        self.alloc        = allocator or ThrusterAllocator()
+        self.last_cmd     = None
+        self.last_arduino = {}
+        self.telem_wire   = WIRE_JSON  # answer in whatever format the HUD speaks
+        self.framer       = CobsFramer() if codec == CODEC_COBS else LineFramer()
+        self.recorder     = None   # uuv_recorder.FlightRecorder
+
+        # HUD command datagrams accepted / undecodable
+        self.commands     = 0
+        self.rejected     = 0
+
+        # Newest Arduino sample and line counters
+        self.sample_time  = 0.0
+        self.samples      = 0
+        self.malformed    = 0
+
+        # Latency echo: newest command seq with its receive time, and the
+        # last seq written to the Arduino with when (gateway wall clock)
+        self.cmd_seq      = 0
+        self.cmd_rx_time  = 0.0
+        self.ack          = None
+
+        # Binary frame sequence numbers
+        self.tx_seq       = 0
+        self.rx_seq       = None
+        self.seq_gaps     = 0
+
+    def handle_cmd(self, data, now):
+        try:
+            self.last_cmd    = decode_cmd(data)
+            self.telem_wire  = wire_of(data)
+            self.cmd_seq     = self.last_cmd.get("seq", 0)
+            self.cmd_rx_time = time.time()
+            self.watchdog.feed(self.channel, now)
+            self.commands   += 1
+            if self.recorder:
+                self.recorder.cmd(self.last_cmd, self.cmd_rx_time)
+        except Exception:
+            self.rejected += 1
+
+    def outputs(self, now):
+        """(arm, timeout, command over AXES, thrust per thruster)"""
+        timeout = self.watchdog.expired(self.channel, now)
+
+        arm     = False
+        command = [0.0] * len(AXES)
+
+        if self.last_cmd and not timeout:
+            arm = bool(self.last_cmd.get("arm", False))
+            if arm:
+                command = [clamp(self.last_cmd.get(axis, 0.0)) for axis in AXES]
+
+        return arm, timeout, command, self.alloc.allocate(command)
+
+    def serial_command(self, now) -> bytes:
+        arm, timeout, command, thrust = self.outputs(now)
+        pwm_us  = self.alloc.pwm(thrust).tolist()
+        arm_int = 1 if (arm and not timeout) else 0
+        if self.cmd_seq and not timeout and (self.ack is None or self.ack["seq"] != self.cmd_seq):
+            self.ack = {"seq": self.cmd_seq, "t_rx": self.cmd_rx_time, "t_applied": time.time()}
+        if self.codec == CODEC_COBS:
+            self.tx_seq = (self.tx_seq + 1) & 0xFF
+            return encode_cmd_frame(self.tx_seq, pwm_us, arm_int)
+        return ("C " + " ".join(map(str, pwm_us)) + f" {arm_int}\n").encode("utf-8")
+
+    @staticmethod
+    def parse_line(raw: bytes):
+        """Return the sample dict from a "T {json}" line, or None if it is not one."""
+        line = raw.decode("utf-8", errors="ignore").strip()
+        if line.startswith("T "):
+            line = line[2:]
+        if line.startswith("{") and line.endswith("}"):
+            try:
+                sample = json.loads(line)
+            except ValueError:
+                return None
+            return sample if isinstance(sample, dict) else None
+        return None
+
+    def parse_frame(self, payload: bytes):
+        """Return the sample dict from a telemetry frame payload, or None."""
+        try:
+            seq, sample = decode_telem_frame(payload)
+        except ValueError:
+            return None
+        if self.rx_seq is not None and seq != (self.rx_seq + 1) & 0xFF:
+            self.seq_gaps += 1
+        self.rx_seq = seq
+        return sample
+
+    def on_line(self, raw: bytes):
+        if self.codec == CODEC_COBS:
+            sample = self.parse_frame(raw)
+        else:
+            if not raw.strip():
+                return
+            sample = self.parse_line(raw)
+        if sample is None:
+            self.malformed += 1
+            return
+        self.last_arduino = sample
+        self.sample_time  = time.monotonic()
+        self.samples     += 1
+        if self.recorder:
+            self.recorder.arduino(sample)
+
+    def feed_serial(self, data: bytes):
+        for raw in self.framer.feed(data):
+            self.on_line(raw)
+
+    def serial_stats(self) -> dict:
+        stats = {
+            "samples":   self.samples,
+            "malformed": self.malformed,
+            "dropped":   self.framer.overflows,
+        }
+        if self.codec == CODEC_COBS:
+            stats["crc_errors"] = self.framer.bad_frames
+            stats["seq_gaps"]   = self.seq_gaps
+        return stats
+
+    def sens(self) -> dict:
+        last_arduino = self.last_arduino
+        return {
+            "p1":     last_arduino.get("p1_psi",   None),
+            "p2":     last_arduino.get("p2_psi",   None),
+            "laser1": last_arduino.get("dist1_cm", None),
+            "laser2": last_arduino.get("dist2_cm", None),
+        }
+
+    def state(self, now) -> dict:
+        # "thrust" in geometry order for the binary wire, plus one entry per thruster by name
+        arm, timeout, command, thrust = self.outputs(now)
+        thrust = thrust.tolist()
+        return {
+            "arm":     arm,
+            "timeout": timeout,
+            "thrust":  thrust,
+            **dict(zip(self.alloc.names, thrust)),
+        }
+
+    def telem(self, now) -> dict:
+        telem = {"sens": self.sens(), "state": self.state(now)}
+        if self.ack:
+            telem["ack"] = self.ack
+        return telem
+
+    def status(self, now) -> str:
+        arm, timeout, command, thrust = self.outputs(now)
+        status = "ARMED" if arm and not timeout else "SAFE"
+        axes   = " ".join(f"{a}={c:+.2f}" for a, c in zip(AXES, command))
+        outs   = " ".join(f"{n}={x:+.2f}" for n, x in zip(self.alloc.names, thrust))
+        return f"[{status}] {axes} -> {outs}"
+
+
+class BallastDriver:
+    """Ballast board protocol: 4-character valve string, "0000" on watchdog timeout."""
+    channel = "ballast"
+
+    def __init__(self, watchdog: Watchdog):
+        self.watchdog   = watchdog
+        self.last_cmd   = "0000"   # safe default -- all valves closed
+        self.telem_wire = WIRE_JSON
+        self.recorder   = None
+        self.commands   = 0
+        self.rejected   = 0
+
+    def handle_cmd(self, data, now):
+        try:
+            # Validate -- binary frame or exactly 4 characters of 0s and 1s
+            cmd = decode_ballast(data)
+            if cmd is None:
+                self.rejected += 1
+                return
+            self.last_cmd   = cmd
+            self.telem_wire = wire_of(data)
+            self.watchdog.feed(self.channel, now)
+            self.commands  += 1
+            if self.recorder:
+                self.recorder.ballast(cmd)
+        except Exception:
+            self.rejected += 1
+
+    def active_cmd(self, now):
+        timeout = self.watchdog.expired(self.channel, now)
+        return ("0000" if timeout else self.last_cmd), timeout
+
+    def serial_command(self, now) -> bytes:
+        return f"{self.active_cmd(now)[0]}\n".encode("utf-8")
+
+    def feed_serial(self, data: bytes):
+        pass  # the ballast board does not report anything
+
+    def state(self, now) -> dict:
+        cmd, timeout = self.active_cmd(now)
+        return {"cmd": cmd, "timeout": timeout}
+
+    def telem(self, now) -> dict:
+        return {"ballast": self.state(now)}
+
+    def status(self, now) -> str:
+        cmd, timeout = self.active_cmd(now)
+        return f"[{'TIMEOUT' if timeout else 'ACTIVE'}] ballast={cmd}"
@@ -0,0 +1,88 @@
+import socket
+
+from uuv_proto import WIRE_BINARY, decode_subscribe, encode_telem, lease_seconds, wire_of
+
+MAX_LEASE       = 60.0   # seconds; stations renew well before this
+MAX_SUBSCRIBERS = 16     # bounds the per-tick sendto cost on the Pi
+
+
+class TelemetryFanout:
+    """
+    Telemetry to every registered station.
+
+    Static destinations (the pilot laptop) never expire; stations that send
+    a subscribe datagram get a lease and drop out when it runs out unless
+    they renew. Each telemetry tick is encoded once per wire format however
+    many stations listen. With a multicast group set, one extra datagram
+    goes to the group for any number of passive listeners.
+    """
+    def __init__(self, tx, static=(), multicast=None, ttl=1):
+        self.tx        = tx
+        self.static    = list(static)   # (addr, wire getter) pairs
+        self.multicast = multicast      # (group, port) or None
+        self.leases    = {}             # addr -> (expiry, wire)
+
+        self.subscribes  = 0
+        self.expired     = 0
+        self.rejected    = 0
+        self.sent        = 0
+        self.send_errors = 0
+
+        if multicast:
+            tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+
+    def on_subscribe(self, data, addr, now):
+        """
+        Handle one subscribe datagram from addr; lease 0 unsubscribes.
+        The lease is normalised like the sender's (uuv_proto.lease_seconds),
+        so a JSON NaN or negative lease is dropped instead of never expiring.
+        """
+        try:
+            port, lease = decode_subscribe(data)
+            lease = lease_seconds(lease)
+        except Exception:
+            self.rejected += 1
+            return
+        dest = (addr[0], port or addr[1])
+        if lease == 0:
+            self.leases.pop(dest, None)
+            return
+        if dest not in self.leases and len(self.leases) >= MAX_SUBSCRIBERS:
+            self.rejected += 1
+            return
+        self.leases[dest] = (now + min(lease, MAX_LEASE), wire_of(data))
+        self.subscribes += 1
+
+    def destinations(self, now):
+        """(addr, wire) for every live destination; expired leases are dropped here."""
+        for dest in [d for d, (expiry, _) in self.leases.items() if expiry < now]:
+            del self.leases[dest]
+            self.expired += 1
+        dests = {addr: wire() for addr, wire in self.static}
+        for dest, (_, wire) in self.leases.items():
+            dests.setdefault(dest, wire)
+        if self.multicast:
+            dests.setdefault(self.multicast, self.static[0][1]() if self.static else WIRE_BINARY)
+        return dests.items()
+
+    def send(self, telem, now):
+        encoded = {}
+        for dest, wire in self.destinations(now):
+            try:
+                data = encoded.get(wire)
+                if data is None:
+                    data = encoded[wire] = encode_telem(telem, wire)
+                self.tx.sendto(data, dest)
+                self.sent += 1
+            except Exception:
+                self.send_errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.leases),
+            "subscribes":  self.subscribes,
+            "expired":     self.expired,
+            "rejected":    self.rejected,
+            "sent":        self.sent,
+            "send_errors": self.send_errors,
+        }
@@ -0,0 +1,136 @@
+import binascii
+import math
+import struct
+
+# Binary serial framing for the motor Arduino -- the alternative to the
+# "C L R arm" / "T {json}" text lines.
+#
+#   on the wire : COBS(payload | crc16) 0x00
+#   crc16       : CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) over the
+#                 payload, appended little-endian
+#   payload     : type u8 | seq u8 | body (little-endian)
+#
+#   FRAME_CMD   Pi -> Arduino   pulse_us u16 per thruster (left, right, ...), arm u8
+#   FRAME_TELEM Arduino -> Pi   p1_psi, p2_psi, dist1_cm, dist2_cm  f32 (NaN = no reading)
+#
+# COBS guarantees the payload never contains 0x00, so a zero byte always
+# ends a frame: a receiver that starts mid-stream or loses bytes resyncs on
+# the next zero, and the CRC rejects anything damaged in between.
+FRAME_CMD   = 0x01
+FRAME_TELEM = 0x02
+
+_CRC         = struct.Struct("<H")
+_CMD_HEAD    = struct.Struct("<BB")
+_TELEM_FRAME = struct.Struct("<BB4f")
+
+TELEM_KEYS = ("p1_psi", "p2_psi", "dist1_cm", "dist2_cm")
+
+NAN = float("nan")
+
+
+def crc16(data: bytes) -> int:
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def cobs_encode(data: bytes) -> bytes:
+    out = bytearray()
+    for block in data.split(b"\0"):
+        while len(block) >= 254:
+            out.append(0xFF)
+            out += block[:254]
+            block = block[254:]
+        out.append(len(block) + 1)
+        out += block
+    return bytes(out)
+
+def cobs_decode(data: bytes) -> bytes:
+    out = bytearray()
+    i, n = 0, len(data)
+    while i < n:
+        code = data[i]
+        if code == 0 or i + code > n:
+            raise ValueError("bad COBS block")
+        out += data[i + 1:i + code]
+        i += code
+        if code < 0xFF and i < n:
+            out.append(0)
+    return bytes(out)
+
+
+def encode_frame(payload: bytes) -> bytes:
+    return cobs_encode(payload + _CRC.pack(crc16(payload))) + b"\0"
+
+def decode_frame(frame: bytes) -> bytes:
+    """Payload of one frame (without the trailing zero); ValueError if damaged."""
+    data = cobs_decode(frame)
+    if len(data) < 4:
+        raise ValueError("short frame")
+    payload = data[:-2]
+    if _CRC.unpack(data[-2:])[0] != crc16(payload):
+        raise ValueError("CRC mismatch")
+    return payload
+
+
+class CobsFramer:
+    """
+    Splits a serial byte stream into CRC-checked frame payloads.
+
+    Same interface as gw_serial.LineFramer, so SerialLink can use either:
+    `lines` counts good frames and `overflows` runs with no delimiter.
+    Damaged frames are dropped and counted in `bad_frames`.
+    """
+    def __init__(self, max_len=256):
+        self.buf        = bytearray()
+        self.max_len    = max_len
+        self.lines      = 0
+        self.overflows  = 0
+        self.bad_frames = 0
+
+    def feed(self, data: bytes) -> list:
+        buf = self.buf
+        buf += data
+        frames = []
+        start = 0
+        while True:
+            i = buf.find(b"\0", start)
+            if i < 0:
+                break
+            if i > start:
+                try:
+                    frames.append(decode_frame(bytes(buf[start:i])))
+                except ValueError:
+                    self.bad_frames += 1
+            start = i + 1
+        if start:
+            del buf[:start]
+        if len(buf) > self.max_len:
+            self.overflows += 1
+            buf.clear()
+        self.lines += len(frames)
+        return frames
+
+
+# ---- Typed payloads ----
+
+def encode_cmd_frame(seq, pwm_us, arm) -> bytes:
+    body = struct.pack(f"<{len(pwm_us)}HB", *pwm_us, 1 if arm else 0)
+    return encode_frame(_CMD_HEAD.pack(FRAME_CMD, seq & 0xFF) + body)
+
+def decode_cmd_frame(payload: bytes):
+    """(seq, pulse widths tuple, arm) from a command payload."""
+    n, odd = divmod(len(payload) - _CMD_HEAD.size - 1, 2)
+    if n < 1 or odd or payload[0] != FRAME_CMD:
+        raise ValueError("not a command frame")
+    *pwm_us, arm = struct.unpack_from(f"<{n}HB", payload, _CMD_HEAD.size)
+    return payload[1], tuple(pwm_us), bool(arm)
+
+def encode_telem_frame(seq, sample: dict) -> bytes:
+    values = [NAN if sample.get(k) is None else float(sample[k]) for k in TELEM_KEYS]
+    return encode_frame(_TELEM_FRAME.pack(FRAME_TELEM, seq & 0xFF, *values))
+
+def decode_telem_frame(payload: bytes):
+    """(seq, sample) where sample has the same keys as the Arduino's JSON line."""
+    if len(payload) != _TELEM_FRAME.size or payload[0] != FRAME_TELEM:
+        raise ValueError("not a telemetry frame")
+    _, seq, *values = _TELEM_FRAME.unpack(payload)
+    return seq, {k: (None if math.isnan(v) else v) for k, v in zip(TELEM_KEYS, values)}
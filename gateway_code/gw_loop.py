@@ -0,0 +1,121 @@
+import selectors
+import time
+
+from gw_sched import SKIP, Periodic
+
+
+class _Timer(Periodic):
+    def __init__(self, name, interval, callback, policy):
+        super().__init__(name, interval, policy)
+        self.callback = callback
+
+
+class EventLoop:
+    """
+    Single-threaded gateway loop on selectors (epoll on the Pi).
+
+    Sockets and the serial port are waited on together with the next timer
+    deadline, so each source is handled as soon as it is readable and
+    periodic sends fire on time instead of after a chain of 50 ms timeouts.
+    Timers are gw_sched.Periodic schedules: absolute monotonic_ns deadlines
+    with a skip or catch-up policy after a stall, and per-timer lateness and
+    jitter histograms in stats().
+
+    With a gw_metrics.Metrics, every reader and timer callback is timed
+    into the stage histogram of its name.
+    """
+    def __init__(self, metrics=None):
+        self.sel     = selectors.DefaultSelector()
+        self.timers  = []
+        self.running = False
+        self.metrics = metrics
+
+        self.wakeups    = 0
+        self.late_sum   = 0.0
+        self.late_max   = 0.0
+        self.late_count = 0
+        self.t_start    = time.monotonic()
+        self.cpu_start  = time.process_time()
+
+    def add_reader(self, fileobj, callback, name=""):
+        """callback(now) is called whenever fileobj is readable."""
+        self.sel.register(fileobj, selectors.EVENT_READ, self._timed(name or "reader", callback))
+
+    def remove_reader(self, fileobj):
+        try:
+            self.sel.unregister(fileobj)
+        except (KeyError, ValueError):
+            pass
+
+    def call_every(self, interval, callback, name="", policy=SKIP):
+        """callback(now) is called every interval seconds."""
+        name = name or f"timer{len(self.timers)}"
+        t = _Timer(name, interval, self._timed(name, callback), policy)
+        self.timers.append(t)
+        return t
+
+    def _timed(self, name, callback):
+        if self.metrics is None:
+            return callback
+        hist, clock = self.metrics.stage(name), time.perf_counter_ns
+
+        def timed(now):
+            t0 = clock()
+            try:
+                callback(now)
+            finally:
+                hist.add((clock() - t0) / 1e9)
+        return timed
+
+    def run(self):
+        self.running = True
+        sel, timers = self.sel, self.timers
+        while self.running:
+            timeout = None
+            if timers:
+                timeout = max(0, min(t.deadline_ns for t in timers) - time.monotonic_ns()) / 1e9
+
+            events = sel.select(timeout)
+            self.wakeups += 1
+
+            now_ns = time.monotonic_ns()
+            now    = now_ns / 1e9
+            for key, _ in events:
+                key.data(now)
+
+            for t in timers:
+                # More than once only for a CATCH_UP timer working off a stall
+                while t.due(now_ns):
+                    late = (now_ns - t.deadline_ns) / 1e9
+                    self.late_sum   += late
+                    self.late_count += 1
+                    if late > self.late_max:
+                        self.late_max = late
+                    t.fire(now_ns)
+                    t.callback(now)
+
+    def stop(self):
+        self.running = False
+
+    def stats(self) -> dict:
+        """Wakeup rate, mean/max timer lateness and process CPU share since start."""
+        wall = max(1e-9, time.monotonic() - self.t_start)
+        return {
+            "wakeups_hz":  self.wakeups / wall,
+            "late_avg_ms": self.late_sum / self.late_count * 1e3 if self.late_count else 0.0,
+            "late_max_ms": self.late_max * 1e3,
+            "cpu_pct":     (time.process_time() - self.cpu_start) / wall * 100.0,
+        }
+
+    def collect(self, m):
+        """gw_metrics collector: wakeups, CPU and per-timer tick counts."""
+        m.total("loop_wakeups", self.wakeups)
+        m.set("loop_cpu_percent", self.stats()["cpu_pct"])
+        for t in self.timers:
+            m.total("timer_fired",   t.fired,   timer=t.name)
+            m.total("timer_skipped", t.skipped, timer=t.name)
+            m.set("timer_late_max_seconds", t.late.max, timer=t.name)
+
+    def timer_stats(self) -> dict:
+        """Per-timer fired/skipped counts with lateness and jitter percentiles."""
+        return {t.name: t.stats() for t in self.timers}
@@ -0,0 +1,279 @@
+import json
+import socket
+import time
+
+from uuv_latency import LatencyHistogram
+
+# Gateway metrics, read on demand instead of printed every tick.
+#
+#   Metrics       counters, gauges and per-stage latency histograms
+#   MetricsHttp   Prometheus text on http://<bind>:<port>/metrics (and /json),
+#                 served from the gateway's own loop
+#   StatsSender   the same snapshot as one JSON datagram, for a logger or
+#                 the laptop without an HTTP client
+#
+# Components keep their own plain counters (SerialLink.writes, Watchdog.trips,
+# TelemetryFanout.sent, ...). A collector copies them in when a snapshot is
+# taken, so the control loop pays nothing for metrics nobody reads. Only the
+# stage timings are recorded as they happen.
+
+QUANTILES = (50, 90, 99)
+
+# MetricsHttp: connections still waiting for their request, and how long
+# one may take to send it
+MAX_PENDING     = 4
+REQUEST_TIMEOUT = 1.0
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """
+    Registry for one gateway process.
+
+      inc(name, n, **labels)      hot-path counter owned by the gateway
+      total(name, v, **labels)    counter total copied from a component
+      set(name, v, **labels)      gauge
+      stage(name)                 LatencyHistogram of one handler's run time
+      collect(fn)                 fn(metrics) refreshes totals and gauges
+                                  before every snapshot
+    """
+    def __init__(self, prefix="uuv_gw"):
+        self.prefix     = prefix
+        self.counters   = {}
+        self.gauges     = {}
+        self.stages     = {}
+        self.collectors = []
+        self.t_start    = time.monotonic()
+
+    def inc(self, name, n=1, **labels):
+        k = _key(name, labels)
+        self.counters[k] = self.counters.get(k, 0) + n
+
+    def total(self, name, value, **labels):
+        self.counters[_key(name, labels)] = value
+
+    def set(self, name, value, **labels):
+        self.gauges[_key(name, labels)] = value
+
+    def from_stats(self, prefix, stats, gauges=(), **labels):
+        """Copy a component's stats() dict: numbers become totals, keys in gauges gauges."""
+        for k, v in stats.items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                (self.set if k in gauges else self.total)(f"{prefix}_{k}", v, **labels)
+
+    def stage(self, name) -> LatencyHistogram:
+        h = self.stages.get(name)
+        if h is None:
+            h = self.stages[name] = LatencyHistogram()
+        return h
+
+    def collect(self, fn):
+        self.collectors.append(fn)
+        return fn
+
+    def refresh(self):
+        self.set("uptime_seconds", time.monotonic() - self.t_start)
+        for fn in self.collectors:
+            fn(self)
+
+    def snapshot(self) -> dict:
+        """Flat {"series": value} of everything, stage times in ms."""
+        self.refresh()
+        snap = {}
+        for (name, labels), v in list(self.counters.items()) + list(self.gauges.items()):
+            snap[_series(name, labels)] = v
+        for stage, h in self.stages.items():
+            for q in QUANTILES:
+                snap[f'stage_ms{{stage="{stage}",quantile="p{q}"}}'] = (h.percentile(q) or 0.0) * 1e3
+            snap[f'stage_ms{{stage="{stage}",quantile="max"}}'] = h.max * 1e3
+            snap[f'stage_count{{stage="{stage}"}}'] = h.n
+        return snap
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        self.refresh()
+        p, out = self.prefix, []
+        for kind, table in (("counter", self.counters), ("gauge", self.gauges)):
+            typed = set()
+            for (name, labels), v in sorted(table.items()):
+                full = f"{p}_{name}_total" if kind == "counter" else f"{p}_{name}"
+                if full not in typed:
+                    typed.add(full)
+                    out.append(f"# TYPE {full} {kind}")
+                out.append(f"{_series(full, labels)} {float(v):g}")
+        if self.stages:
+            full = f"{p}_stage_seconds"
+            out.append(f"# TYPE {full} summary")
+            for stage, h in sorted(self.stages.items()):
+                for q in QUANTILES:
+                    lab = (("stage", stage), ("quantile", f"{q / 100:g}"))
+                    out.append(f"{_series(full, lab)} {h.percentile(q) or 0.0:g}")
+                out.append(f'{full}_count{{stage="{stage}"}} {h.n}')
+            out.append(f"# TYPE {p}_stage_max_seconds gauge")
+            for stage, h in sorted(self.stages.items()):
+                out.append(f'{p}_stage_max_seconds{{stage="{stage}"}} {h.max:g}')
+        return "\n".join(out) + "\n"
+
+
+def http_response(metrics, request: bytes) -> bytes:
+    """Answer one HTTP/1.0-style GET from its request bytes."""
+    try:
+        method, path = request.split(b"\r\n", 1)[0].split()[:2]
+    except ValueError:
+        method, path = b"", b""
+    path = path.split(b"?", 1)[0]
+    if method != b"GET":
+        status, ctype, body = "405 Method Not Allowed", "text/plain", "GET only\n"
+    elif path in (b"/", b"/metrics"):
+        status, ctype, body = "200 OK", "text/plain; version=0.0.4", metrics.prometheus()
+    elif path == b"/json":
+        status, ctype, body = "200 OK", "application/json", json.dumps(metrics.snapshot()) + "\n"
+    else:
+        status, ctype, body = "404 Not Found", "text/plain", "try /metrics or /json\n"
+    data = body.encode("utf-8")
+    head = (f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\n"
+            f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n")
+    return head.encode("ascii") + data
+
+
+class MetricsHttp:
+    """
+    Minimal HTTP endpoint for a gw_loop.EventLoop gateway (attach(loop)).
+    The listening socket and every accepted connection are non-blocking
+    readers on the loop, so a slow or silent scraper never holds up the
+    control handlers. A request is answered once its headers are in, with
+    one send: the reply is a few kB and fits the socket buffer. Clients
+    that send nothing are closed after REQUEST_TIMEOUT, or when MAX_PENDING
+    newer ones are waiting. Scrapes are rare (seconds apart), so there is
+    no need for a server thread.
+    """
+    def __init__(self, metrics, port, bind="127.0.0.1"):
+        self.metrics = metrics
+        self.srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.srv.bind((bind, port))
+        self.srv.listen(4)
+        self.srv.setblocking(False)
+        self.loop     = None
+        self.pending  = {}   # conn -> (accept time, request so far)
+        self.scrapes  = 0
+        self.errors   = 0
+        self.timeouts = 0
+
+    def attach(self, loop):
+        self.loop = loop
+        loop.add_reader(self.srv, self.on_accept, "metrics")
+        return self
+
+    def on_accept(self, now):
+        try:
+            conn, _ = self.srv.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(False)
+        self.expire(now)
+        if len(self.pending) >= MAX_PENDING:
+            self._close(next(iter(self.pending)))
+            self.timeouts += 1
+        self.pending[conn] = (now, b"")
+        self.loop.add_reader(conn, lambda now, conn=conn: self.on_request(conn, now), "metrics")
+
+    def on_request(self, conn, now):
+        if conn not in self.pending:
+            return
+        t_accept, request = self.pending[conn]
+        try:
+            data = conn.recv(2048)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.errors += 1
+            self._close(conn)
+            return
+        request += data
+        if data and b"\r\n\r\n" not in request and len(request) < 2048:
+            self.pending[conn] = (t_accept, request)
+            return
+        if request:
+            try:
+                reply = http_response(self.metrics, request)
+                if conn.send(reply) == len(reply):
+                    self.scrapes += 1
+                else:
+                    self.errors += 1
+            except OSError:
+                self.errors += 1
+        self._close(conn)
+
+    def expire(self, now):
+        """Close connections that have not sent a request in REQUEST_TIMEOUT."""
+        for conn, (t_accept, _) in list(self.pending.items()):
+            if now - t_accept > REQUEST_TIMEOUT:
+                self._close(conn)
+                self.timeouts += 1
+
+    def _close(self, conn):
+        self.pending.pop(conn, None)
+        self.loop.remove_reader(conn)
+        conn.close()
+
+    def close(self):
+        for conn in list(self.pending):
+            self._close(conn)
+        self.srv.close()
+
+
+class StatsSender:
+    """Snapshot as one JSON datagram to addr, called from a periodic timer."""
+    def __init__(self, metrics, addr, tx=None):
+        self.metrics = metrics
+        self.addr    = addr
+        self.tx      = tx or socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sent    = 0
+        self.errors  = 0
+
+    def send(self, now):
+        try:
+            snap = dict(self.metrics.snapshot(), t=time.time())
+            self.tx.sendto(json.dumps(snap, separators=(",", ":")).encode("utf-8"), self.addr)
+            self.sent += 1
+        except OSError:
+            self.errors += 1
+
+
+def collect_driver(m, name, drv):
+    """Command counts and watchdog trips of one gw_drivers driver."""
+    m.total("commands",          drv.commands, board=name)
+    m.total("commands_rejected", drv.rejected, board=name)
+    m.total("watchdog_trips",    drv.watchdog.trips.get(drv.channel, 0), board=name)
+    # stale(), not expired(): a scrape must not count a trip itself
+    m.set("watchdog_expired", int(drv.watchdog.stale(drv.channel, time.monotonic())), board=name)
+
+
+def parse_addr(text):
+    """"host:port" -> (host, port)."""
+    host, port = text.rsplit(":", 1)
+    return host, int(port)
+
+
+class RateMeter:
+    """Events per second between successive reads of a running total."""
+    def __init__(self):
+        self.last_total = None
+        self.last_time  = None
+
+    def rate(self, total, now) -> float:
+        r = 0.0
+        if self.last_time is not None and now > self.last_time:
+            r = (total - self.last_total) / (now - self.last_time)
+        self.last_total, self.last_time = total, now
+        return r
@@ -0,0 +1,16 @@
+import os
+import sys
+
+# Import setup for the gateway code, done once here instead of in every
+# module. The gateway helpers (gw_*) import each other flat and use the
+# shared root modules (uuv_proto, uuv_latency, uuv_recorder), so both
+# directories go on sys.path.
+#
+#   gateway scripts    import gw_path           (their own dir is already on the path)
+#   sim, bench, tests  import gateway_code.gw_path  (with the repo root on the path)
+GATEWAY_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT        = os.path.dirname(GATEWAY_DIR)
+
+for _path in (GATEWAY_DIR, ROOT):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,71 @@
+import time
+
+from uuv_latency import LatencyHistogram
+
+SKIP     = "skip"      # after a stall, drop the missed ticks and stay on the original grid
+CATCH_UP = "catch_up"  # after a stall, fire the missed ticks back to back (up to max_burst)
+
+
+class Periodic:
+    """
+    Fixed-rate deadlines on time.monotonic_ns().
+
+    Deadlines are absolute multiples of the interval from the start, so
+    they never drift and ignore wall-clock jumps. What happens after a
+    stall depends on the policy. SKIP drops the missed ticks but keeps the
+    phase, which suits serial commands: the Arduino keeps a steady cadence
+    and never sees a burst. CATCH_UP fires up to max_burst missed ticks
+    back to back, then skips the rest.
+
+    Every tick records how late it fired and how far its spacing from the
+    previous tick was off the nominal interval (the jitter the receiver
+    sees), as histograms.
+    """
+    def __init__(self, name, interval, policy=SKIP, max_burst=5, now_ns=None):
+        if policy not in (SKIP, CATCH_UP):
+            raise ValueError(f"unknown policy {policy!r}")
+        self.name      = name
+        self.interval  = interval
+        self.period_ns = int(interval * 1e9)
+        self.policy    = policy
+        self.max_burst = max_burst
+        self.deadline_ns = (time.monotonic_ns() if now_ns is None else now_ns) + self.period_ns
+
+        self.fired   = 0
+        self.skipped = 0
+        self.late    = LatencyHistogram()
+        self.jitter  = LatencyHistogram()
+        self._last_ns = None
+
+    def due(self, now_ns) -> bool:
+        return now_ns >= self.deadline_ns
+
+    def fire(self, now_ns):
+        """Record a tick fired at now_ns and move to the next deadline."""
+        self.fired += 1
+        self.late.add((now_ns - self.deadline_ns) / 1e9)
+        if self._last_ns is not None:
+            self.jitter.add(abs((now_ns - self._last_ns) - self.period_ns) / 1e9)
+        self._last_ns = now_ns
+
+        period = self.period_ns
+        nxt    = self.deadline_ns + period
+        if now_ns >= nxt:
+            missed = (now_ns - nxt) // period + 1
+            keep   = 0 if self.policy == SKIP else min(missed, self.max_burst)
+            self.skipped += missed - keep
+            nxt += (missed - keep) * period
+        self.deadline_ns = nxt
+
+    def stats(self) -> dict:
+        ms = lambda h, q: (h.percentile(q) or 0.0) * 1e3
+        return {
+            "fired":         self.fired,
+            "skipped":       self.skipped,
+            "late_p50_ms":   ms(self.late, 50),
+            "late_p99_ms":   ms(self.late, 99),
+            "late_max_ms":   self.late.max * 1e3,
+            "jitter_p50_ms": ms(self.jitter, 50),
+            "jitter_p99_ms": ms(self.jitter, 99),
+            "jitter_max_ms": self.jitter.max * 1e3,
+        }
@@ -0,0 +1,176 @@
+import threading
+import time
+
+# Serial reopen delay after an error: first, cap (doubles on every failure)
+REOPEN_BACKOFF = (0.5, 8.0)
+
+
+class Backoff:
+    """Reopen delays after a serial error, shared by SerialLink and gateway_unified.Board."""
+    def __init__(self, first=REOPEN_BACKOFF[0], cap=REOPEN_BACKOFF[1]):
+        self.first = first
+        self.cap   = cap
+        self.delay = first
+
+    def failed(self) -> float:
+        """The attempt failed; the next delay."""
+        self.delay = min(self.delay * 2, self.cap)
+        return self.delay
+
+    def reset(self):
+        self.delay = self.first
+
+
+class LineFramer:
+    """
+    Splits a serial byte stream into complete lines.
+
+    Partial lines stay in a bounded buffer until their newline arrives, so a
+    sample split across two reads is never lost or corrupted. A run of more
+    than max_len bytes without a newline is discarded and counted.
+    """
+    def __init__(self, max_len=1024):
+        self.buf       = bytearray()
+        self.max_len   = max_len
+        self.lines     = 0
+        self.overflows = 0
+
+    def feed(self, data: bytes) -> list:
+        buf = self.buf
+        buf += data
+        lines = []
+        start = 0
+        while True:
+            i = buf.find(b"\n", start)
+            if i < 0:
+                break
+            lines.append(bytes(buf[start:i]))
+            start = i + 1
+        if start:
+            del buf[:start]
+        if len(buf) > self.max_len:
+            self.overflows += 1
+            buf.clear()
+        self.lines += len(lines)
+        return lines
+
+
+class SerialLink:
+    """
+    Serial port with a dedicated reader thread.
+
+    The thread blocks for the first byte (up to ser.timeout), then drains
+    everything already waiting with one bulk read, frames it and hands each
+    complete line to on_line(line) -- every line, in order. Writes go out
+    on the caller's thread under their own lock and never touch the input
+    buffer.
+
+    A read or write error (USB glitch, cable pulled) closes the port and
+    calls on_link(False, why); the reader thread then reopens it with
+    Backoff delays and calls on_link(True, None) once it is back. Writes
+    while the link is down are skipped.
+    """
+    def __init__(self, ser, on_line, framer=None, on_link=None):
+        self.ser     = ser
+        self.on_line = on_line
+        self.framer  = framer or LineFramer()
+        self.on_link = on_link
+        self.wlock   = threading.Lock()
+        self.up      = True
+        self.backoff = Backoff()
+
+        self.bytes_in    = 0
+        self.read_errors = 0
+        self.writes      = 0
+        self.write_errors = 0
+        self.reopens     = 0
+
+        self._running = False
+        self._thread  = threading.Thread(target=self._reader, name="serial-reader", daemon=True)
+
+    def start(self):
+        self._running = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+
+    def _reader(self):
+        ser = self.ser
+        while self._running:
+            if not self.up:
+                self._reopen()
+                continue
+            try:
+                data = ser.read(ser.in_waiting or 1)
+            except Exception as e:
+                self.read_errors += 1
+                self._lost(f"SERIAL READ ERROR: {e}")
+                continue
+            if not data:
+                continue
+            self.bytes_in += len(data)
+            for line in self.framer.feed(data):
+                self.on_line(line)
+
+    def _lost(self, why):
+        with self.wlock:
+            if not self.up:
+                return
+            self.up = False
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+        if self.on_link:
+            self.on_link(False, why)
+
+    def _reopen(self):
+        # Short sleeps, so stop() never waits out a long delay
+        deadline = time.monotonic() + self.backoff.delay
+        while self._running and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if not self._running:
+            return
+        try:
+            with self.wlock:
+                self.ser.open()
+                self.ser.reset_input_buffer()
+        except Exception:
+            self.backoff.failed()
+            return
+        self.framer.buf.clear()   # half a line from before the drop
+        self.backoff.reset()
+        self.reopens += 1
+        self.up = True
+        if self.on_link:
+            self.on_link(True, None)
+
+    def write(self, data: bytes) -> bool:
+        """False when skipped because the link is down; raises on a write error."""
+        with self.wlock:
+            if not self.up:
+                return False
+            try:
+                self.ser.write(data)
+                self.writes += 1
+                return True
+            except Exception as e:
+                self.write_errors += 1
+                error = e
+        self._lost(f"SERIAL ERROR: {error}")
+        raise error
+
+    def stats(self) -> dict:
+        return {
+            "bytes_in":     self.bytes_in,
+            "lines":        self.framer.lines,
+            "overflows":    self.framer.overflows,
+            "read_errors":  self.read_errors,
+            "writes":       self.writes,
+            "write_errors": self.write_errors,
+            "reopens":      self.reopens,
+            "up":           int(self.up),
+        }
@@ -0,0 +1,110 @@
+import numpy as np
+import pygame
+
+
+class RingBuffer:
+    """Fixed-size history of `channels` float samples; NaN marks a missing value."""
+    def __init__(self, capacity, channels):
+        self.capacity = capacity
+        self.data  = np.full((capacity, channels), np.nan, dtype=np.float32)
+        self.head  = 0   # next row to write
+        self.count = 0
+
+    def push(self, values):
+        self.data[self.head] = values
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n) -> np.ndarray:
+        """The newest n rows, oldest first (a copy)."""
+        n = min(n, self.count)
+        return self.data[np.arange(self.head - n, self.head) % self.capacity]
+
+
+class StripChart:
+    """
+    Scrolling chart of a few telemetry channels, one pixel column per sample.
+
+    The chart lives in a persistent surface. A new sample scrolls it left
+    and paints only the new columns, through surfarray with one vectorised
+    mask per channel, so the cost does not depend on how much history is
+    shown. Each column is a vertical span from the previous value to the
+    new one, which draws a connected trace without pygame.draw.line.
+
+    value_range=None autoscales: a value outside the current range widens
+    it and the whole chart is repainted from the ring buffer once.
+    """
+    def __init__(self, size, colors, value_range=None, bg=(16, 16, 24), alpha=190):
+        self.w, self.h = size
+        self.colors  = np.array(colors, dtype=np.uint8)
+        self.bg      = np.array(bg, dtype=np.uint8)
+        self.auto    = value_range is None
+        self.lo, self.hi = value_range or (np.inf, -np.inf)
+        self.ring    = RingBuffer(self.w + 1, len(colors))   # +1: the left edge's predecessor
+        self.surface = pygame.Surface(size)
+        self.surface.fill(bg)
+        self.surface.set_alpha(alpha)
+        self._rows   = np.arange(self.h)
+        self.pending = 0      # samples not yet painted
+        self.stale   = True   # repaint everything on the next render()
+        self.version = 0      # changes on every push; the HUD widget state
+
+        self.repaints = 0
+
+    def push(self, values):
+        """Append one sample; None becomes a gap."""
+        v = [np.nan if x is None else float(x) for x in values]
+        self.ring.push(v)
+        self.pending += 1
+        self.version += 1
+        if self.auto:
+            finite = [x for x in v if x == x]
+            if finite and (min(finite) < self.lo or max(finite) > self.hi):
+                self._rescale()
+
+    def _rescale(self):
+        data = self.ring.last(self.ring.count)
+        vmin, vmax = float(np.nanmin(data)), float(np.nanmax(data))
+        pad = max((vmax - vmin) * 0.1, abs(vmax) * 0.01, 1e-3)
+        self.lo, self.hi = vmin - pad, vmax + pad
+        self.stale = True
+
+    def _y(self, values) -> np.ndarray:
+        y = (self.hi - values) / (self.hi - self.lo) * (self.h - 1)
+        return np.clip(y, 0, self.h - 1)
+
+    def _paint(self, k):
+        """Paint the newest k samples into the rightmost k columns."""
+        vals = self.ring.last(k + 1)
+        if len(vals) <= k:   # the oldest sample has no predecessor
+            vals = np.vstack([vals[:1], vals])
+        y_new  = self._y(vals[1:])
+        y_prev = self._y(vals[:-1])
+        y_prev = np.where(np.isnan(y_prev), y_new, y_prev)
+        top    = np.minimum(y_new, y_prev).round()
+        bottom = np.maximum(y_new, y_prev).round()
+
+        pixels = pygame.surfarray.pixels3d(self.surface)
+        cols = pixels[self.w - k:]
+        cols[:] = self.bg
+        rows = self._rows
+        for c in range(len(self.colors)):
+            # NaN compares False on both sides: no pixels for a missing value
+            mask = (rows >= top[:, c, None]) & (rows <= bottom[:, c, None])
+            cols[mask] = self.colors[c]
+        del pixels, cols   # unlock the surface
+
+    def render(self) -> pygame.Surface:
+        """Bring the surface up to date with the ring buffer and return it."""
+        if self.stale or self.pending >= self.w or not self.hi > self.lo:
+            self.stale   = False
+            self.pending = 0
+            self.repaints += 1
+            self.surface.fill(self.bg)
+            if self.ring.count and self.hi > self.lo:
+                self._paint(min(self.ring.count, self.w))
+        elif self.pending:
+            self.surface.scroll(-self.pending, 0)
+            self._paint(self.pending)
+            self.pending = 0
+        return self.surface
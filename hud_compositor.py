@@ -0,0 +1,140 @@
+import time
+
+import pygame
+
+_UNSET = object()
+
+
+class Widget:
+    """
+    One HUD element.
+
+      rect  : screen area the widget may paint (restored before a redraw)
+      state : returns a comparable snapshot of whatever the widget shows
+      draw  : draw(dest, state) paints that snapshot
+      hz    : how often state is sampled (None = every frame)
+
+    A widget is redrawn only when its sampled state changes.
+    """
+    def __init__(self, name, rect, draw, state=lambda: None, hz=None):
+        self.name   = name
+        self.rect   = pygame.Rect(rect)
+        self.draw   = draw
+        self.state  = state
+        self.period = 1.0 / hz if hz else 0.0
+        self.next_poll = 0.0
+        self.value  = _UNSET
+        self.dirty  = True
+
+    def poll(self, now):
+        if now < self.next_poll:
+            return
+        self.next_poll = now + self.period
+        value = self.state()
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+
+class Compositor:
+    """
+    Layered HUD renderer: video -> baked static overlay -> widgets.
+
+    A new video frame (at most video_hz) recomposites the whole window and
+    flips. Otherwise only widgets whose state changed are restored from the
+    video/overlay layers, redrawn and pushed with display.update(rects).
+    on_drawn(), if set, runs after drawing and before the display is
+    flipped or updated (the HUD profiler times the two apart).
+    """
+    def __init__(self, screen, bg=(0, 0, 0), video_hz=None):
+        self.screen  = screen
+        self.bg      = bg
+        self.overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        self.overlay_rect = None
+        self.widgets = []
+        self.video   = None
+        self.on_drawn = None
+
+        self.video_period  = 1.0 / video_hz if video_hz else 0.0
+        self.next_video    = 0.0
+        self.video_pending = False
+        self.force_full    = True
+
+        self.full_frames    = 0
+        self.partial_frames = 0
+        self.idle_frames    = 0
+
+    def bake(self, surface, pos):
+        """Draw a static element into the overlay layer once."""
+        r = self.overlay.blit(surface, pos)
+        self.overlay_rect = r if self.overlay_rect is None else self.overlay_rect.union(r)
+
+    def add(self, widget: Widget) -> Widget:
+        self.widgets.append(widget)
+        return widget
+
+    def invalidate(self):
+        self.force_full = True
+
+    def _background(self, rect):
+        if self.video is not None:
+            self.screen.blit(self.video, rect, rect)
+        else:
+            self.screen.fill(self.bg, rect)
+        if self.overlay_rect is not None and rect.colliderect(self.overlay_rect):
+            r = rect.clip(self.overlay_rect)
+            self.screen.blit(self.overlay, r, r)
+
+    def compose(self, video_surface, video_fresh, now=None) -> str:
+        """Render one frame; returns "full", "partial" or "idle"."""
+        now = time.monotonic() if now is None else now
+        for w in self.widgets:
+            w.poll(now)
+
+        self.video_pending |= video_fresh
+        if self.video_pending and now >= self.next_video:
+            self.video_pending = False
+            self.next_video    = now + self.video_period
+            self.force_full    = True
+
+        if self.force_full:
+            self.force_full = False
+            self.video = video_surface
+            screen = self.screen
+            self._background(screen.get_rect())
+            for w in self.widgets:
+                w.draw(screen, w.value)
+                w.dirty = False
+            if self.on_drawn:
+                self.on_drawn()
+            pygame.display.flip()
+            self.full_frames += 1
+            return "full"
+
+        dirty = [w.rect for w in self.widgets if w.dirty]
+        if not dirty:
+            self.idle_frames += 1
+            return "idle"
+
+        screen = self.screen
+        for r in dirty:
+            self._background(r)
+            screen.set_clip(r)
+            for w in self.widgets:
+                if w.rect.colliderect(r):
+                    w.draw(screen, w.value)
+            screen.set_clip(None)
+        for w in self.widgets:
+            w.dirty = False
+        if self.on_drawn:
+            self.on_drawn()
+        pygame.display.update(dirty)
+        self.partial_frames += 1
+        return "partial"
+
+    def stats(self) -> dict:
+        return {
+            "full":    self.full_frames,
+            "partial": self.partial_frames,
+            "idle":    self.idle_frames,
+        }
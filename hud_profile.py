@@ -0,0 +1,106 @@
+import struct
+import time
+
+import numpy as np
+
+LOG_MAGIC = b"HUDPROF1"
+
+
+class StageProfiler:
+    """
+    Per-stage wall time of the HUD loop.
+
+    The loop calls begin() at the top of a frame, lap(stage) as each stage
+    finishes and end_frame() at the bottom, so every lap times the span since
+    the previous mark. Disabled (the default), each call is one attribute
+    test. The last `window` frames are kept for rolling stats; log_path
+    additionally records every frame, as CSV for *.csv and otherwise as a
+    packed binary file readable with load_log().
+    """
+    def __init__(self, stages, window=120, enabled=False, log_path=None):
+        self.stages  = tuple(stages)
+        self.index   = {s: i for i, s in enumerate(self.stages)}
+        self.window  = window
+        self.ring    = np.zeros((window, len(self.stages)), dtype=np.int64)
+        self.frame   = np.zeros(len(self.stages), dtype=np.int64)
+        self.frames  = 0
+        self.enabled = enabled
+        self._toggle = False
+        self._t      = 0
+
+        self.log   = None
+        self._row  = struct.Struct(f"<d{len(self.stages)}I")
+        self._csv  = False
+        if log_path:
+            self.open_log(log_path)
+
+    def toggle(self):
+        """Switch on/off at the next begin(), so no frame is timed halfway."""
+        self._toggle = not self._toggle
+
+    def begin(self):
+        if self._toggle:
+            self._toggle = False
+            self.enabled = not self.enabled
+            self.frames  = 0
+        if self.enabled:
+            self.frame[:] = 0
+            self._t = time.perf_counter_ns()
+
+    def lap(self, stage):
+        if self.enabled:
+            t = time.perf_counter_ns()
+            self.frame[self.index[stage]] += t - self._t
+            self._t = t
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self.ring[self.frames % self.window] = self.frame
+        self.frames += 1
+        if self.log is not None:
+            us = [min(int(v) // 1000, 0xFFFFFFFF) for v in self.frame]
+            if self._csv:
+                self.log.write(f"{time.time():.3f}," + ",".join(map(str, us)) + "\n")
+            else:
+                self.log.write(self._row.pack(time.time(), *us))
+
+    def stats(self) -> dict:
+        """stage -> (mean ms, max ms) over the rolling window."""
+        n = min(self.frames, self.window)
+        if not n:
+            return {}
+        rows = self.ring[:n] / 1e6
+        mean = rows.mean(axis=0)
+        peak = rows.max(axis=0)
+        return {s: (float(mean[i]), float(peak[i])) for i, s in enumerate(self.stages)}
+
+    # ---- Per-frame log ----
+
+    def open_log(self, path):
+        self.close_log()
+        self._csv = path.endswith(".csv")
+        if self._csv:
+            self.log = open(path, "w")
+            self.log.write("time," + ",".join(f"{s}_us" for s in self.stages) + "\n")
+        else:
+            self.log = open(path, "wb")
+            names = "\0".join(self.stages).encode("utf-8")
+            self.log.write(LOG_MAGIC + struct.pack("<H", len(names)) + names)
+
+    def close_log(self):
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+
+def load_log(path):
+    """Binary profile log as a NumPy record array: time plus one uint32 us column per stage."""
+    with open(path, "rb") as f:
+        head = f.read(len(LOG_MAGIC) + 2)
+        if head[:len(LOG_MAGIC)] != LOG_MAGIC:
+            raise ValueError(f"{path}: not a HUD profile log")
+        n = struct.unpack("<H", head[len(LOG_MAGIC):])[0]
+        stages = f.read(n).decode("utf-8").split("\0")
+    dtype = np.dtype([("time", "<f8")] + [(s, "<u4") for s in stages])
+    return np.fromfile(path, dtype=dtype, offset=len(LOG_MAGIC) + 2 + n)
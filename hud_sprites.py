@@ -0,0 +1,35 @@
+import pygame
+
+
+class RotationCache:
+    """
+    Table of rotated HUD icons, one entry per (icon, integer degrees).
+
+    Entries are built on first use (or up front with prefill) so rotating
+    an icon at runtime is a dict lookup. Each entry stores the offset that
+    centres the rotated sprite on an anchor point.
+    """
+    def __init__(self):
+        self._table = {}
+
+    def _entry(self, icon, angle):
+        key = (icon, int(angle) % 360)
+        entry = self._table.get(key)
+        if entry is None:
+            rotated = pygame.transform.rotate(icon, key[1])
+            entry = self._table[key] = (rotated, (-(rotated.get_width() // 2), -(rotated.get_height() // 2)))
+        return entry
+
+    def get(self, icon, angle) -> pygame.Surface:
+        return self._entry(icon, angle)[0]
+
+    def prefill(self, icon, angles):
+        for a in angles:
+            self._entry(icon, a)
+
+    def blit_centered(self, dest, icon, angle, center):
+        rotated, (dx, dy) = self._entry(icon, angle)
+        return dest.blit(rotated, (center[0] + dx, center[1] + dy))
+
+    def __len__(self):
+        return len(self._table)
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+
+class GlyphAtlas:
+    """
+    Per-character surfaces for one (font, colour). Changing numbers are
+    drawn by blitting cached glyphs instead of re-rasterising the string.
+    Glyphs outside the preloaded set are rendered once on first use.
+    """
+    def __init__(self, font, color, chars="0123456789.+-"):
+        self.font  = font
+        self.color = color
+        self.glyphs = {}
+        self.hits   = 0
+        self.misses = 0
+        for c in chars:
+            self.glyphs[c] = font.render(c, True, color)
+
+    def blit(self, dest, text, pos):
+        x, y = pos
+        glyphs = self.glyphs
+        for c in text:
+            g = glyphs.get(c)
+            if g is None:
+                g = glyphs[c] = self.font.render(c, True, self.color)
+                self.misses += 1
+            else:
+                self.hits += 1
+            dest.blit(g, (x, y))
+            x += g.get_width()
+        return x - pos[0]
+
+
+class HudText:
+    """
+    Text rendering for the HUD:
+      - text():   whole strings, LRU-cached by (font, string, colour)
+      - number(): numeric strings, blitted from a GlyphAtlas
+      - fields(): a line of alternating labels and numeric values
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._cache  = OrderedDict()
+        self._atlas  = {}
+        self.hits    = 0
+        self.misses  = 0
+
+    def render(self, font, text, color):
+        key  = (font, text, color)
+        surf = self._cache.get(key)
+        if surf is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, True, color)
+        self._cache[key] = surf
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return surf
+
+    def text(self, dest, font, text, color, pos):
+        return dest.blit(self.render(font, text, color), pos)
+
+    def atlas(self, font, color) -> GlyphAtlas:
+        key = (font, color)
+        atlas = self._atlas.get(key)
+        if atlas is None:
+            atlas = self._atlas[key] = GlyphAtlas(font, color)
+        return atlas
+
+    def number(self, dest, font, text, color, pos):
+        return self.atlas(font, color).blit(dest, text, pos)
+
+    def fields(self, dest, font, color, pos, *parts):
+        """parts alternate label, value, label, value, ... (labels may be empty)."""
+        x, y = pos
+        atlas = self.atlas(font, color)
+        for i, part in enumerate(parts):
+            if not part:
+                continue
+            if i % 2 == 0:
+                surf = self.render(font, part, color)
+                dest.blit(surf, (x, y))
+                x += surf.get_width()
+            else:
+                x += atlas.blit(dest, part, (x, y))
+        return x - pos[0]
+
+    def stats(self) -> dict:
+        return {
+            "entries":      len(self._cache),
+            "hits":         self.hits,
+            "misses":       self.misses,
+            "glyph_hits":   sum(a.hits for a in self._atlas.values()),
+            "glyph_misses": sum(a.misses for a in self._atlas.values()),
+        }
@@ -1,20 +1,77 @@
 import pygame
-import cv2
 import math
-import numpy as np
+import os
 import time
 
 from uuv_link import UdpUuvLink, UuvCmd, clamp
+from video_worker import VideoWorker
+from video_pipeline import LEVEL_NAMES, TRANSPORT_RTP, TRANSPORT_TCP, Adaptation, PipelineBuilder, pick_decoder
+from frame_present import FramePresenter, frombuffer_format
+from hud_text import HudText
+from hud_sprites import RotationCache
+from hud_compositor import Compositor, Widget
+from hud_profile import StageProfiler
+from hud_charts import StripChart
+from uuv_recorder import FlightRecorder
 
 # Network / video settings
-PI_IP = "192.168.0.2"
+PI_IP = os.environ.get("UUV_PI_IP", "192.168.0.2")  # 127.0.0.1 with python -m sim
 PI_PORT = 8000
 
-GST_PIPE = (
-    f"tcpclientsrc host={PI_IP} port={PI_PORT} ! "
-    "h264parse ! avdec_h264 ! videoconvert ! "
-    "video/x-raw,format=BGR ! appsink drop=true max-buffers=2 sync=false"
-)
+# Video transport: TRANSPORT_TCP pulls from the Pi's tcpserversink on
+# PI_PORT; TRANSPORT_RTP receives RTP/UDP the Pi sends to RTP_PORT (see
+# video_pipeline), which trades retransmission stalls for brief glitches.
+# RTP_LATENCY_MS is the jitter buffer budget.
+# RTP loss/jitter on the HUD is opt-in. RTP_STATS_PORT: the Pi sends a copy
+# of the stream there too (multiudpsink clients=<laptop>:5600,<laptop>:5601)
+# and a monitor thread reads it; the video itself goes straight to udpsrc.
+# RTP_RELAY_PORT: udpsrc moves there and a Python relay forwards RTP_PORT to
+# it, which costs every packet a trip through Python; for bench tests only.
+VIDEO_TRANSPORT = TRANSPORT_TCP
+RTP_PORT        = 5600
+RTP_LATENCY_MS  = 50
+RTP_STATS_PORT  = None
+RTP_RELAY_PORT  = None
+
+# Loop profiling (F4): per-frame stage timings also go to this file when set,
+# "*.csv" as text, anything else as a binary log (hud_profile.load_log)
+PROFILE_LOG = None
+
+# Loop stages in order; each one is timed from the end of the previous one
+STAGES = ("events", "keys", "send", "telem", "ballast", "video", "parse", "draw", "present", "idle")
+STAGE_COLORS = [(230, 80, 80), (230, 160, 60), (230, 230, 60), (120, 220, 80), (60, 200, 160),
+                (60, 160, 230), (120, 110, 240), (200, 90, 220), (240, 120, 170), (110, 110, 110)]
+FRAME_BUDGET_MS = 1000.0 / 30
+
+# Flight recording of sent commands and received telemetry, off unless
+# UUV_RECORD_DIR names a directory; play back with uuv_replay.py
+RECORD_DIR = os.environ.get("UUV_RECORD_DIR") or None
+
+# Dive video (R starts/stops): the H.264 stream is saved as received, no
+# re-encode, in segments rotated by time or size. "mkv" survives being cut
+# off; "mp4" is written fragmented for the same reason.
+VIDEO_DIR        = "flight_logs"
+VIDEO_MUX        = "mkv"
+VIDEO_SEGMENT_S  = 300
+VIDEO_SEGMENT_MB = 1024
+
+# H.264 decoder: None picks the first one found (video_pipeline.DECODERS).
+# With VIDEO_ADAPT the pipeline drops to half size, then keyframes only,
+# while the stream loses more than VIDEO_MAX_DROP of its frames or decode
+# queues up more than VIDEO_MAX_DELAY_MS, and steps back once it keeps up.
+VIDEO_DECODER      = None
+VIDEO_ADAPT        = True
+VIDEO_MAX_DROP     = 0.10
+VIDEO_MAX_DELAY_MS = 150.0
+
+# Telemetry strip charts (F6): (title, sens keys, unit, range or None to
+# autoscale). One pixel column per sample, so 270px is ~27s at 10Hz.
+CHARTS = [
+    ("P",  ("p1", "p2"),         "PSI", None),
+    ("L",  ("laser1", "laser2"), "cm",  None),
+]
+CHART_SIZE   = (270, 80)
+CHART_COLORS = [(80, 200, 255), (255, 170, 60)]
 
 def make_green(icon: pygame.Surface) -> pygame.Surface:
     g = icon.copy()
@@ -42,14 +99,21 @@ def main():
     pic_depth   = pygame.image.load("src/depth.png").convert_alpha()
     pic_laser   = pygame.image.load("src/laser.png").convert_alpha()
 
+    # Rotated icons come from one shared table
+    rotations = RotationCache()
+
     pic_up    = pygame.image.load("src/arrow.png").convert_alpha()
-    pic_left  = pygame.transform.rotate(pic_up, 90)
-    pic_down  = pygame.transform.rotate(pic_up, 180)
-    pic_right = pygame.transform.rotate(pic_up, 270)
+    pic_left  = rotations.get(pic_up, 90)
+    pic_down  = rotations.get(pic_up, 180)
+    pic_right = rotations.get(pic_up, 270)
 
     pic_pitch  = pygame.image.load("src/pitch.png").convert_alpha()
     pic_pitchl = pygame.image.load("src/pitchl.png").convert_alpha()
 
+    # atan() keeps the pitch angle inside (-90, 90)
+    rotations.prefill(pic_pitch,  range(-90, 91))
+    rotations.prefill(pic_pitchl, range(-90, 91))
+
     # Green versions
     pic_kw_g    = make_green(pic_kw)
     pic_ka_g    = make_green(pic_ka)
@@ -60,20 +124,203 @@ def main():
     pic_down_g  = make_green(pic_down)
     pic_right_g = make_green(pic_right)
 
-    # Video capture from Pi
-    cap = cv2.VideoCapture(GST_PIPE, cv2.CAP_GSTREAMER)
-    if not cap.isOpened():
-        print("ERROR: cannot open stream; check GStreamer and Pi connection")
-        return
+    # Video decode runs in its own process; frames arrive through shared memory
+    frame_fmt = frombuffer_format()
+    rtp       = VIDEO_TRANSPORT == TRANSPORT_RTP
+    pipeline  = PipelineBuilder(PI_IP, RTP_PORT if rtp else PI_PORT, win_w, win_h,
+                                VIDEO_DECODER or pick_decoder(),
+                                mux=VIDEO_MUX, segment_s=VIDEO_SEGMENT_S, segment_mb=VIDEO_SEGMENT_MB,
+                                transport=VIDEO_TRANSPORT, jitter_ms=RTP_LATENCY_MS,
+                                stats_port=RTP_STATS_PORT, relay_port=RTP_RELAY_PORT)
+    rtp_stats = rtp and bool(RTP_STATS_PORT or RTP_RELAY_PORT)
+    adapt     = (Adaptation(VIDEO_MAX_DROP, VIDEO_MAX_DELAY_MS, skip_from=pipeline.skip_from())
+                 if VIDEO_ADAPT else None)
+    video     = VideoWorker(pipeline, win_w, win_h, fmt=frame_fmt, adapt=adapt).start()
+    presenter = FramePresenter(video.ring, frame_fmt)
+
+    # Text surfaces are cached; F3 toggles the debug overlay, F4 the timing
+    # bar, F5 exports latency CSV, F6 the strip charts, R starts/stops video
+    # recording
+    text  = HudText()
+    debug = False
+    show_charts = True
+
+    # Layered rendering: static icons are baked once, widgets redraw on change
+    hud = Compositor(screen)
+    hud.bake(pic_depth,   (10, 10))
+    hud.bake(pic_laser,   (10, 70))
+    hud.bake(pic_battery, (10, 130))
+
+    prof = StageProfiler(STAGES, enabled=PROFILE_LOG is not None, log_path=PROFILE_LOG)
+    hud.on_drawn = lambda: prof.lap("draw")
+
+    def draw_no_video(dest, no_video):
+        if no_video:
+            text.text(dest, font, "NO VIDEO", (200, 60, 60), (win_w // 2 - 50, win_h // 2))
+
+    def draw_cmd(dest, st):
+        armed_, surge_, yaw_ = st
+        text.text(dest, font, f"ARM: {armed_} (Enter to toggle)", (200, 200, 200), (10, 200))
+        text.fields(dest, font, (200, 200, 200), (10, 230),
+                    "CMD surge=", f"{surge_:+.1f}", " yaw=", f"{yaw_:+.1f}")
+
+    def draw_pair(pos, label_a, label_b, unit):
+        def draw(dest, st):
+            if st is None:
+                return
+            a_str = f"{st[0]:.1f} {unit}" if st[0] is not None else "N/A"
+            b_str = f"{st[1]:.1f} {unit}" if st[1] is not None else "N/A"
+            text.fields(dest, font, (200, 200, 200), pos, label_a, a_str, label_b, b_str)
+        return draw
+
+    def draw_state(dest, st):
+        if st is None:
+            return
+        timeout_, l_, r_ = st
+        if l_ is not None:
+            text.fields(dest, font, (200, 200, 200), (10, 260),
+                        f"STATE timeout={timeout_} L=", f"{l_:.2f}", " R=", f"{r_:.2f}")
+        else:
+            text.text(dest, font, f"STATE timeout={timeout_}", (200, 200, 200), (10, 260))
+
+    def draw_pitch(dest, st):
+        use_left_, angle_ = st
+        rotations.blit_centered(dest, pic_pitchl if use_left_ else pic_pitch, angle_, (900, 75))
+
+    def draw_debug(dest, st):
+        if st is None:
+            return
+        ts, vs, cs, tx, rx, lat = st
+        text.fields(dest, font_small, (255, 255, 0), (10, 290),
+                    "text hit/miss ", f"{ts['hits']}/{ts['misses']}",
+                    "  glyph hit/miss ", f"{ts['glyph_hits']}/{ts['glyph_misses']}")
+        text.fields(dest, font_small, (255, 255, 0), (10, 312),
+                    "video frames ", str(vs["frames"]),
+                    "  dropped ", str(vs["dropped"]),
+                    "  dup ", str(vs["duplicated"]),
+                    "  " + LEVEL_NAMES[vs["level"]] + " drop% ", f"{vs['drop_rate'] * 100:.0f}",
+                    "  delay ", f"{vs['delay_ms']:.0f}")
+        text.fields(dest, font_small, (255, 255, 0), (10, 334),
+                    "frames full ", str(cs["full"]),
+                    "  partial ", str(cs["partial"]),
+                    "  idle ", str(cs["idle"]),
+                    *(("  rtp lost ", str(vs["rtp_lost"]), " late ", str(vs["rtp_late"]),
+                       " jitter ms ", f"{vs['rtp_jitter_ms']:.1f}") if rtp_stats else ()))
+        text.fields(dest, font_small, (255, 255, 0), (10, 356),
+                    "tx sent ", str(tx[0]), "  skipped ", str(tx[1]))
+        age = f"{rx['age_ms']:.0f}" if rx["age_ms"] is not None else "N/A"
+        text.fields(dest, font_small, (255, 255, 0), (10, 378),
+                    "telem rx ", str(rx["received"]), "  coalesced ", str(rx["coalesced"]),
+                    "  age ms ", age, "  jitter ms ", f"{rx['jitter_ms']:.1f}")
+        # Latency p50/p95/p99 in ms (F5 writes every sample to CSV)
+        pct = lambda m: "/".join("-" if v is None else f"{v:.0f}" for v in lat[m][1:])
+        text.fields(dest, font_small, (255, 255, 0), (10, 400),
+                    "lat n ", str(lat["rtt"][0]), "  rtt ", pct("rtt"), "  cmd ", pct("cmd"))
+        text.fields(dest, font_small, (255, 255, 0), (10, 422),
+                    "net ", pct("net"), "  gw ", pct("gw"), "  (p50/p95/p99 ms)")
+
+    def draw_timing(dest, st):
+        if st is None:
+            return
+        # Stacked bar of mean stage times; the white tick is the 30 FPS budget
+        scale = 400 / FRAME_BUDGET_MS
+        x = 580
+        for (stage, mean, peak), color in zip(st, STAGE_COLORS):
+            w = int(mean * scale)
+            if w and x < 990:
+                pygame.draw.rect(dest, color, (x, 300, min(w, 990 - x), 16))
+            x += w
+        pygame.draw.line(dest, (255, 255, 255), (580 + 400, 296), (580 + 400, 320), 2)
+        for i, ((stage, mean, peak), color) in enumerate(zip(st, STAGE_COLORS)):
+            text.fields(dest, font_small, color, (580, 324 + i * 20),
+                        stage + " ", f"{mean:.1f}", " / ", f"{peak:.1f}", " ms")
+
+    charts = [StripChart(CHART_SIZE, CHART_COLORS[:len(keys_)], value_range)
+              for _, keys_, _, value_range in CHARTS]
+
+    def draw_charts(dest, st):
+        if st is None:
+            return
+        x, y = 10, 470
+        for chart, (title, keys_, unit, _) in zip(charts, CHARTS):
+            dest.blit(chart.render(), (x, y))
+            label = f"{title}  {chart.lo:.1f}..{chart.hi:.1f} {unit}" if chart.hi > chart.lo else title
+            text.text(dest, font_small, label, (200, 200, 200), (x, y - 20))
+            x += CHART_SIZE[0] + 10
+
+    def draw_rec(dest, st):
+        wanted, live = st
+        if wanted or live:
+            # Yellow while the recording pipeline is being swapped in or out
+            color = (230, 40, 40) if wanted and live else (230, 200, 40)
+            text.text(dest, font, "REC", color, (win_w // 2 - 20, 10))
+
+    hud.add(Widget("rec", (win_w // 2 - 20, 10, 60, 28), draw_rec,
+                   state=lambda: (video_rec, video.recording), hz=4))
+
+    hud.add(Widget("no_video", (win_w // 2 - 50, win_h // 2, 200, 30), draw_no_video,
+                   state=lambda: presenter.surface is None))
+
+    # WASD and arrow keys (green when pressed)
+    key_sprites = [
+        (pygame.K_w,     pic_kw,    pic_kw_g,    (120, 570)),
+        (pygame.K_a,     pic_ka,    pic_ka_g,    (40,  650)),
+        (pygame.K_s,     pic_ks,    pic_ks_g,    (120, 650)),
+        (pygame.K_d,     pic_kd,    pic_kd_g,    (200, 650)),
+        (pygame.K_UP,    pic_up,    pic_up_g,    (800, 570)),
+        (pygame.K_LEFT,  pic_left,  pic_left_g,  (720, 650)),
+        (pygame.K_DOWN,  pic_down,  pic_down_g,  (800, 650)),
+        (pygame.K_RIGHT, pic_right, pic_right_g, (880, 650)),
+    ]
+    for k, pic, pic_g, pos in key_sprites:
+        hud.add(Widget(
+            f"key{k}", pic.get_rect(topleft=pos),
+            lambda dest, on, pic=pic, pic_g=pic_g, pos=pos: dest.blit(pic_g if on else pic, pos),
+            state=lambda k=k: bool(keys[k]),
+        ))
+
+    # Command and telemetry readouts (telemetry refreshes at 10 Hz)
+    hud.add(Widget("cmd", (10, 200, 480, 56), draw_cmd,
+                   state=lambda: (armed, surge, yaw)))
+    hud.add(Widget("pressure", (70, 15, 430, 28), draw_pair((70, 15), "P1: ", "  P2: ", "PSI"),
+                   state=lambda: (p1, p2) if last_telem else None, hz=10))
+    hud.add(Widget("laser", (70, 75, 430, 28), draw_pair((70, 75), "L1: ", "  L2: ", "cm"),
+                   state=lambda: (laser1, laser2) if last_telem else None, hz=10))
+    hud.add(Widget("state", (10, 260, 480, 28), draw_state,
+                   state=lambda: (timeout, Lout, Rout) if last_telem else None, hz=10))
+
+    pitch_size = max(max(p.get_size()) for p in (pic_pitch, pic_pitchl)) * 3 // 2
+    hud.add(Widget("pitch", pygame.Rect(0, 0, pitch_size, pitch_size).move(900 - pitch_size // 2, 75 - pitch_size // 2),
+                   draw_pitch, state=lambda: (use_left, pitch_angle)))
+
+    hud.add(Widget("debug", (10, 290, 560, 154), draw_debug,
+                   state=lambda: (text.stats(), video.stats(), hud.stats(), (link.tx_sent, link.tx_skipped),
+                                  link.telem_stats(), link.latency.summary()) if debug else None, hz=2))
+
+    hud.add(Widget("charts", (10, 450, 2 * CHART_SIZE[0] + 10, CHART_SIZE[1] + 20), draw_charts,
+                   state=lambda: tuple(c.version for c in charts) if show_charts else None, hz=10))
+
+    hud.add(Widget("timing", (580, 294, 412, 228), draw_timing,
+                   state=lambda: tuple((s, round(m, 1), round(p, 1)) for s, (m, p) in prof.stats().items())
+                   if prof.enabled else None, hz=4))
 
     # UDP link to Pi gateway
     link  = UdpUuvLink(pi_ip=PI_IP, cmd_port=9000, telemetry_port=9001, ballast_port=9002)
     armed = False
+    video_rec = False
+
+    recorder = FlightRecorder.in_dir(RECORD_DIR, "hud") if RECORD_DIR else None
+    def on_batch(batch):
+        # Every sample, not just the newest, goes to the charts and the recording
+        for telem in batch:
+            sens = telem.get("sens", {})
+            for chart, (_, keys_, _, _) in zip(charts, CHARTS):
+                chart.push([sens.get(k) for k in keys_])
+            if recorder:
+                recorder.telem(telem)
 
     # Ballast key state tracked by events (reliable)
     ballast = {"i": False, "k": False, "o": False, "l": False}
-    last_ballast_send  = 0.0
-    BALLAST_DT         = 0.10  # 10 Hz
     last_ballast_print = None
 
     clock      = pygame.time.Clock()
@@ -81,6 +328,8 @@ def main():
     last_telem = None
 
     while running:
+        prof.begin()
+
         # 1) Events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -92,6 +341,24 @@ def main():
                 elif event.key == pygame.K_RETURN:
                     armed = not armed
                     print("ARM =", armed)
+                elif event.key == pygame.K_F3:
+                    debug = not debug
+                elif event.key == pygame.K_F4:
+                    prof.toggle()
+                elif event.key == pygame.K_r:
+                    video_rec = not video_rec
+                    if video_rec:
+                        os.makedirs(VIDEO_DIR, exist_ok=True)
+                        prefix = os.path.join(VIDEO_DIR, time.strftime("video_%Y%m%d_%H%M%S"))
+                        video.record(prefix)
+                        print("REC ->", prefix)
+                    else:
+                        video.record(None)
+                        print("REC stopped")
+                elif event.key == pygame.K_F5:
+                    print("latency ->", link.latency.write_csv(time.strftime("latency_%Y%m%d_%H%M%S.csv")))
+                elif event.key == pygame.K_F6:
+                    show_charts = not show_charts
 
                 # Ballast keys (press)
                 elif event.key == pygame.K_i:
@@ -114,6 +381,8 @@ def main():
                 elif event.key == pygame.K_l:
                     ballast["l"] = False
 
+        prof.lap("events")
+
         # 2) Keys (movement stays with get_pressed)
         keys = pygame.key.get_pressed()
         kw = keys[pygame.K_w]
@@ -135,7 +404,9 @@ def main():
         # BALLAST command bits (same logic you had)
         command_ballast = f"{1 if kk else 0}{1 if (ki or kk) else 0}{1 if kl else 0}{1 if (ko or kl) else 0}"
 
-        # 3) Build and send motor command
+        prof.lap("keys")
+
+        # 3) Build and send motor command (goes out at once when it changes)
         surge = clamp((1.0 if kw else 0.0) + (-1.0 if ks else 0.0))
         yaw   = clamp((1.0 if ka else 0.0) + (-1.0 if kd else 0.0))
 
@@ -143,59 +414,31 @@ def main():
             t=time.time(), mode="MANUAL", arm=armed,
             surge=surge, yaw=yaw, heave=0.0, ballast=0.0
         )
-        link.send(cmd)
+        if link.send(cmd) and recorder:
+            recorder.cmd(cmd)
+        prof.lap("send")
 
-        # 4) Receive telemetry
-        telem = link.poll_telem()
+        # 4) Receive telemetry (drains the socket, keeps the newest sample)
+        telem = link.poll_telem(on_batch=on_batch)
         if telem is not None:
             last_telem = telem
+        prof.lap("telem")
 
-        # 4.5) Send ballast at fixed rate (10Hz)
-        now = time.time()
-        if now - last_ballast_send >= BALLAST_DT:
-            link.send_ballast(command_ballast)
-            last_ballast_send = now
-            if command_ballast != last_ballast_print:
-                print("HUD ballast ->", command_ballast)
-                last_ballast_print = command_ballast
-
-        # 5) Read camera frame
-        ret, frame = cap.read()
-        if not ret:
-            pygame.time.wait(10)
-            continue
-
-        frame = cv2.resize(frame, (win_w, win_h))
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame_surface = pygame.surfarray.make_surface(np.rot90(frame))
-
-        # 6) Draw
-        screen.fill((0, 0, 0))
-        screen.blit(frame_surface, (0, 0))
-
-        # Static icons
-        screen.blit(pic_depth,   (10, 10))
-        screen.blit(pic_laser,   (10, 70))
-        screen.blit(pic_battery, (10, 130))
-
-        # WASD keys
-        screen.blit(pic_kw_g if kw else pic_kw, (120, 570))
-        screen.blit(pic_ka_g if ka else pic_ka, (40,  650))
-        screen.blit(pic_ks_g if ks else pic_ks, (120, 650))
-        screen.blit(pic_kd_g if kd else pic_kd, (200, 650))
-
-        # Arrow keys
-        screen.blit(pic_up_g    if up    else pic_up,    (800, 570))
-        screen.blit(pic_left_g  if left  else pic_left,  (720, 650))
-        screen.blit(pic_down_g  if down  else pic_down,  (800, 650))
-        screen.blit(pic_right_g if right else pic_right, (880, 650))
-
-        # Command display
-        screen.blit(font.render(f"ARM: {armed} (Enter to toggle)", True, (200, 200, 200)), (10, 200))
-        screen.blit(font.render(f"CMD surge={surge:+.1f} yaw={yaw:+.1f}", True, (200, 200, 200)), (10, 230))
-
-        # Telemetry display
+        # 4.5) Send ballast (on change, heartbeat otherwise)
+        if link.send_ballast(command_ballast) and recorder:
+            recorder.ballast(command_ballast)
+        if command_ballast != last_ballast_print:
+            print("HUD ballast ->", command_ballast)
+            last_ballast_print = command_ballast
+        prof.lap("ballast")
+
+        # 5) Take newest decoded frame (never blocks, never allocates)
+        video_fresh = presenter.update()
+        prof.lap("video")
+
+        # 6) Telemetry values for the readouts
         p1 = p2 = laser1 = laser2 = None
+        timeout = Lout = Rout = None
 
         if last_telem:
             sens  = last_telem.get("sens", {})
@@ -210,19 +453,6 @@ def main():
             Lout    = state.get("left",    None)
             Rout    = state.get("right",   None)
 
-            p1_str = f"{p1:.1f} PSI"    if p1     is not None else "N/A"
-            p2_str = f"{p2:.1f} PSI"    if p2     is not None else "N/A"
-            l1_str = f"{laser1:.1f} cm" if laser1 is not None else "N/A"
-            l2_str = f"{laser2:.1f} cm" if laser2 is not None else "N/A"
-
-            screen.blit(font.render(f"P1: {p1_str}  P2: {p2_str}", True, (200, 200, 200)), (70, 15))
-            screen.blit(font.render(f"L1: {l1_str}  L2: {l2_str}", True, (200, 200, 200)), (70, 75))
-            screen.blit(font.render(
-                f"STATE timeout={timeout} L={Lout:.2f} R={Rout:.2f}" if Lout is not None
-                else f"STATE timeout={timeout}",
-                True, (200, 200, 200)
-            ), (10, 260))
-
         # Pitch indicator
         if laser1 is not None and laser2 is not None:
             d1 = laser1 / 100.0
@@ -233,14 +463,26 @@ def main():
             pitch_angle = 0
             use_left = False
 
-        pitch = pygame.transform.rotate(pic_pitchl if use_left else pic_pitch, pitch_angle)
-        pitchFrame = pitch.get_rect(center=(900, 75))
-        screen.blit(pitch, pitchFrame.topleft)
+        prof.lap("parse")
 
-        pygame.display.flip()
+        # 7) Draw: full recomposite on a new video frame, changed widgets otherwise
+        hud.compose(presenter.surface, video_fresh)
+        prof.lap("present")
         clock.tick(30)
-
-    cap.release()
+        prof.lap("idle")
+        prof.end_frame()
+
+    print("video:", video.stats())
+    print("frames:", hud.stats())
+    print("latency ms (n, p50, p95, p99):", link.latency.summary())
+    if prof.frames:
+        print("stages ms (mean, max):", {s: (round(m, 2), round(p, 2)) for s, (m, p) in prof.stats().items()})
+    prof.close_log()
+    if recorder:
+        recorder.close()
+        print("recording:", recorder.path, recorder.stats())
+    presenter.close()
+    video.close()
     pygame.quit()
 
 
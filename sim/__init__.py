@@ -0,0 +1,4 @@
+# Hardware-free stand-ins for the vehicle: pty boards for the gateways and a
+# test H.264 server for the HUD. `python -m sim` runs the whole loop locally.
+from .boards import PtyBoard, MotorBoard, BallastBoard
+from .video import VideoServer, test_pipeline
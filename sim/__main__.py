@@ -0,0 +1,108 @@
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from video_relay import TcpRelay, UdpRelay
+from .boards import MotorBoard, BallastBoard
+from .video import VideoServer
+
+GATEWAYS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gateway_code")
+MOTOR_GW   = os.path.join(GATEWAYS, "gateway_for arduino nano(motors and sensors).py")
+BALLAST_GW = os.path.join(GATEWAYS, "gateway_for board pop(ballast).py")
+UNIFIED_GW = os.path.join(GATEWAYS, "gateway_unified.py")
+
+
+def gateway_commands(args, motor, ballast):
+    common = ["--init-delay", "0.2"]
+    if args.gateway == "split":
+        return [
+            [sys.executable, MOTOR_GW, "--serial", motor.port, "--baud", str(args.motor_baud),
+             "--codec", args.codec, "--laptop-ip", "127.0.0.1"] + common,
+            [sys.executable, BALLAST_GW, "--serial", ballast.port, "--baud", str(args.ballast_baud)] + common,
+        ]
+    if args.gateway == "unified":
+        return [[sys.executable, UNIFIED_GW, "--serial", f"motor={motor.port}",
+                 "--serial", f"ballast={ballast.port}", "--codec", args.codec,
+                 "--laptop-ip", "127.0.0.1"] + common]
+    return []
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m sim", description="Run the vehicle side locally")
+    ap.add_argument("--gateway", choices=("split", "unified", "none"), default="split",
+                    help="which gateway(s) to start on the emulated boards")
+    ap.add_argument("--motor-baud",   type=int, default=115200)
+    ap.add_argument("--ballast-baud", type=int, default=9600)
+    ap.add_argument("--delay-ms",     type=float, default=0.0, help="board processing delay")
+    ap.add_argument("--period-ms",    type=float, default=50.0, help="motor board sample period")
+    ap.add_argument("--codec",        choices=("text", "cobs"), default="text")
+    ap.add_argument("--pressure-noise", type=float, default=0.02, help="psi (std dev)")
+    ap.add_argument("--distance-noise", type=float, default=0.5,  help="cm (std dev)")
+    ap.add_argument("--video-port",   type=int, default=8000)
+    ap.add_argument("--video-transport", choices=("tcp", "rtp"), default="tcp",
+                    help="serve TCP on --video-port, or send RTP to the HUD on --rtp-port")
+    ap.add_argument("--rtp-port",     type=int, default=5600)
+    ap.add_argument("--rtp-copy-port", type=int, default=None,
+                    help="also send the RTP stream here, as the HUD's RTP_STATS_PORT (before --video-loss)")
+    ap.add_argument("--video-loss",   type=float, default=0.0,
+                    help="packet (RTP) or segment (TCP, stalls 200ms) loss probability")
+    ap.add_argument("--no-video",     action="store_true")
+    args = ap.parse_args(argv)
+
+    motor = MotorBoard(args.motor_baud, args.delay_ms / 1e3, args.period_ms / 1e3, args.codec,
+                       args.pressure_noise, args.distance_noise).start()
+    ballast = BallastBoard(args.ballast_baud, args.delay_ms / 1e3).start()
+    print(f"[sim] motor board   {motor.port} @ {args.motor_baud} ({args.codec})")
+    print(f"[sim] ballast board {ballast.port} @ {args.ballast_baud}")
+
+    # With loss, the stream goes through a lossy relay on the advertised port
+    video = relay = None
+    if not args.no_video:
+        rtp  = args.video_transport == "rtp"
+        port = args.rtp_port if rtp else args.video_port
+        send = port + 100 if args.video_loss else port
+        try:
+            video = VideoServer(send, transport=args.video_transport, copy_port=args.rtp_copy_port).start()
+        except RuntimeError as e:
+            print(f"[sim] video disabled: {e}")
+        else:
+            if args.video_loss and rtp:
+                relay = UdpRelay(send, ("127.0.0.1", port), loss=args.video_loss).start()
+            elif args.video_loss:
+                relay = TcpRelay(port, ("127.0.0.1", send), loss=args.video_loss).start()
+            loss = f" ({args.video_loss:.1%} loss)" if relay else ""
+            print(f"[sim] video         {'rtp -> 127.0.0.1' if rtp else 'tcp://0.0.0.0'}:{port}{loss}")
+
+    procs = [subprocess.Popen(cmd, cwd=GATEWAYS) for cmd in gateway_commands(args, motor, ballast)]
+    print("[sim] HUD: UUV_PI_IP=127.0.0.1 python main.py")
+
+    try:
+        while all(p.poll() is None for p in procs):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # SIGINT lets the gateways print their stats and close recordings
+        for p in procs:
+            p.send_signal(signal.SIGINT)
+        for p in procs:
+            try:
+                p.wait(timeout=3.0)
+            except subprocess.TimeoutExpired:
+                p.kill()
+        if relay:
+            print(f"[sim] video relay {relay.stats()}")
+            relay.stop()
+        if video:
+            video.stop()
+        print(f"\n[sim] motor   {motor.stats()}")
+        print(f"[sim] ballast {ballast.stats()}")
+        motor.stop()
+        ballast.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import json
+import os
+import pty
+import random
+import threading
+import time
+import tty
+from collections import deque
+
+import gateway_code.gw_path  # gateway helpers (gw_*) import flat
+from gw_frame import CobsFramer, decode_cmd_frame, encode_telem_frame
+from gw_serial import LineFramer
+
+
+class PtyBoard:
+    """
+    A stand-in board on the master side of a pty; gateways open self.port.
+
+    Bytes in both directions take as long as they would at `baud` (8N1):
+    received bytes reach the board, and replies reach the gateway, only once
+    the wire would have carried them. Received units are handled `delay`
+    seconds after they arrive, like a busy microcontroller loop. When the
+    gateway does not read, replies are dropped as a real UART would.
+    """
+    name = "board"
+
+    def __init__(self, baud=115200, delay=0.0, framer=None):
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)   # kept open so the pty survives gateway restarts
+        os.set_blocking(self.master, False)
+        self.port      = os.ttyname(self.slave)
+        self.byte_time = 10.0 / baud if baud else 0.0
+        self.delay     = delay
+        self.framer    = framer or LineFramer()
+
+        self._rx      = deque()  # (handle time, bytes)
+        self._tx      = deque()  # (wire done time, bytes)
+        self._rx_free = 0.0
+        self._tx_free = 0.0
+
+        self.bytes_in  = 0
+        self.bytes_out = 0
+        self.tx_dropped = 0
+
+        self._running = False
+        self._thread  = threading.Thread(target=self._run, name=f"sim-{self.name}", daemon=True)
+
+    def start(self):
+        self._running = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+        os.close(self.master)
+        os.close(self.slave)
+
+    def send(self, data: bytes, now):
+        """Queue a reply; it appears on the pty when its last byte is on the wire."""
+        self._tx_free = max(now, self._tx_free) + len(data) * self.byte_time
+        self._tx.append((self._tx_free, data))
+
+    def on_unit(self, unit: bytes, now):
+        pass
+
+    def tick(self, now):
+        pass
+
+    def _run(self):
+        while self._running:
+            now = time.monotonic()
+            try:
+                data = os.read(self.master, 4096)
+            except BlockingIOError:
+                data = b""
+            except OSError:
+                data = b""   # no gateway attached (EIO) -- keep waiting
+            if data:
+                self.bytes_in += len(data)
+                self._rx_free = max(now, self._rx_free) + len(data) * self.byte_time
+                self._rx.append((self._rx_free + self.delay, data))
+
+            while self._rx and self._rx[0][0] <= now:
+                for unit in self.framer.feed(self._rx.popleft()[1]):
+                    self.on_unit(unit, now)
+
+            self.tick(now)
+
+            while self._tx and self._tx[0][0] <= now:
+                data = self._tx.popleft()[1]
+                try:
+                    os.write(self.master, data)
+                    self.bytes_out += len(data)
+                except (BlockingIOError, OSError):
+                    self.tx_dropped += 1
+
+            time.sleep(0.0005)
+
+    def stats(self) -> dict:
+        return {
+            "bytes_in":   self.bytes_in,
+            "bytes_out":  self.bytes_out,
+            "tx_dropped": self.tx_dropped,
+        }
+
+
+class MotorBoard(PtyBoard):
+    """
+    Motor/sensor Nano: takes "C L R arm" lines (or COBS command frames with
+    codec="cobs") and reports "T {json}" samples every `period` seconds.
+
+    Sensors follow a toy model: thrust moves the vehicle toward or away
+    from the wall the lasers see, and both readings get Gaussian noise
+    (pressure_noise in psi, distance_noise in cm).
+    """
+    name = "motor"
+
+    def __init__(self, baud=115200, delay=0.0, period=0.05, codec="text",
+                 pressure_noise=0.0, distance_noise=0.0):
+        super().__init__(baud, delay, CobsFramer() if codec == "cobs" else LineFramer())
+        self.codec  = codec
+        self.period = period
+        self.pressure_noise = pressure_noise
+        self.distance_noise = distance_noise
+
+        self.left_us  = 1500
+        self.right_us = 1500
+        self.arm      = False
+        self.commands = 0
+        self.malformed = 0
+        self.applied  = deque(maxlen=4096)  # (monotonic time, L, R, arm) per command
+
+        self.distance = 150.0   # cm to the wall ahead
+        self.seq      = 0
+        self._next    = 0.0
+        self._last    = None
+
+    def on_unit(self, unit, now):
+        try:
+            if self.codec == "cobs":
+                _, pwm_us, arm = decode_cmd_frame(unit)
+            else:
+                c, *pwm_us, arm = unit.decode().split()
+                if c != "C":
+                    raise ValueError(unit)
+                pwm_us, arm = [int(us) for us in pwm_us], arm == "1"
+            left, right = pwm_us[:2]   # the toy model drives the stern pair only
+        except ValueError:
+            self.malformed += 1
+            return
+        self.left_us, self.right_us, self.arm = left, right, arm
+        self.commands += 1
+        self.applied.append((now, left, right, arm))
+
+    def tick(self, now):
+        if self._last is not None and self.arm:
+            # Full thrust on both sides closes on the wall at 40 cm/s
+            surge = ((self.left_us - 1500) + (self.right_us - 1500)) / 800.0
+            self.distance = min(400.0, max(20.0, self.distance - surge * 40.0 * (now - self._last)))
+        self._last = now
+
+        if now < self._next:
+            return
+        self._next = max(self._next + self.period, now - self.period)
+
+        # Yawing tilts the two lasers apart a little
+        skew = (self.left_us - self.right_us) / 400.0 * 5.0 if self.arm else 0.0
+        n_p, n_d = self.pressure_noise, self.distance_noise
+        sample = {
+            "p1_psi":   round(14.7 + random.gauss(0.0, n_p), 2),
+            "p2_psi":   round(15.0 + random.gauss(0.0, n_p), 2),
+            "dist1_cm": round(self.distance + skew + random.gauss(0.0, n_d), 1),
+            "dist2_cm": round(self.distance - skew + random.gauss(0.0, n_d), 1),
+        }
+        if self.codec == "cobs":
+            self.seq = (self.seq + 1) & 0xFF
+            self.send(encode_telem_frame(self.seq, sample), now)
+        else:
+            self.send(("T " + json.dumps(sample) + "\n").encode("utf-8"), now)
+
+    def stats(self) -> dict:
+        return dict(super().stats(), commands=self.commands, malformed=self.malformed)
+
+
+class BallastBoard(PtyBoard):
+    """Ballast board: takes 4-character valve lines like "0101"; reports nothing."""
+    name = "ballast"
+
+    def __init__(self, baud=9600, delay=0.0):
+        super().__init__(baud, delay)
+        self.valves   = "0000"
+        self.commands = 0
+        self.malformed = 0
+        self.applied  = deque(maxlen=4096)  # (monotonic time, valves)
+
+    def on_unit(self, unit, now):
+        cmd = unit.decode("utf-8", errors="ignore").strip()
+        if len(cmd) != 4 or any(c not in "01" for c in cmd):
+            self.malformed += 1
+            return
+        self.valves = cmd
+        self.commands += 1
+        self.applied.append((now, cmd))
+
+    def stats(self) -> dict:
+        return dict(super().stats(), commands=self.commands, malformed=self.malformed, valves=self.valves)
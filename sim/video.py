@@ -0,0 +1,50 @@
+import shutil
+import subprocess
+
+
+def test_pipeline(port=8000, width=1280, height=720, fps=30, pattern="ball", transport="tcp", host="127.0.0.1",
+                  copy_port=None):
+    """
+    Live H.264, the same byte stream the HUD reads from the Pi camera: served
+    over TCP on `port`, or sent as RTP to host:port with transport="rtp"
+    (and a copy to host:copy_port, for the HUD's RTP_STATS_PORT).
+    """
+    src = (
+        f"videotestsrc is-live=true pattern={pattern} ! "
+        f"video/x-raw,width={width},height={height},framerate={fps}/1 ! "
+        "timeoverlay ! "
+        f"x264enc tune=zerolatency speed-preset=ultrafast key-int-max={fps} ! "
+    )
+    if transport == "rtp":
+        pay = src + "rtph264pay config-interval=-1 pt=96 mtu=1200 ! "
+        if copy_port:
+            return pay + f"multiudpsink clients={host}:{port},{host}:{copy_port} sync=false"
+        return pay + f"udpsink host={host} port={port} sync=false"
+    return src + (
+        "h264parse config-interval=-1 ! video/x-h264,stream-format=byte-stream ! "
+        f"tcpserversink host=0.0.0.0 port={port}"
+    )
+
+
+class VideoServer:
+    """gst-launch-1.0 serving a videotestsrc H.264 stream over TCP or RTP."""
+    def __init__(self, port=8000, **kw):
+        self.port = port
+        self.pipeline = test_pipeline(port, **kw)
+        self.proc = None
+
+    def start(self):
+        gst = shutil.which("gst-launch-1.0")
+        if gst is None:
+            raise RuntimeError("gst-launch-1.0 not found; install gstreamer1.0-tools and the x264 plugin")
+        self.proc = subprocess.Popen([gst, "-q"] + self.pipeline.split(), stdout=subprocess.DEVNULL)
+        return self
+
+    def stop(self):
+        if self.proc is not None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=2.0)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+            self.proc = None
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Root modules (uuv_proto, ...) import flat; gw_path adds the gateway helpers
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gateway_code.gw_path
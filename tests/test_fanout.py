@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from gw_fanout import MAX_LEASE, MAX_SUBSCRIBERS, TelemetryFanout
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append(addr)
+
+
+def subscribe(port, lease):
+    return json.dumps({"subscribe": port, "lease": lease}).encode("utf-8")
+
+
+@pytest.mark.parametrize("lease", ["NaN", "-1", "-Infinity"])
+def test_bad_json_lease_is_dropped(lease):
+    fan  = TelemetryFanout(FakeSocket())
+    data = b'{"subscribe": 9001, "lease": ' + lease.encode() + b"}"
+    fan.on_subscribe(data, ("10.0.0.2", 5000), 0.0)
+    assert fan.leases == {}
+    assert fan.rejected == 1
+
+
+def test_infinite_lease_is_capped_and_expires():
+    fan = TelemetryFanout(FakeSocket())
+    fan.on_subscribe(b'{"subscribe": 9001, "lease": Infinity}', ("10.0.0.2", 5000), 0.0)
+    expiry, _ = fan.leases[("10.0.0.2", 9001)]
+    assert expiry == MAX_LEASE
+    assert list(fan.destinations(MAX_LEASE + 1.0)) == []
+
+
+def test_negative_zero_unsubscribes():
+    fan = TelemetryFanout(FakeSocket())
+    fan.on_subscribe(subscribe(9001, 10), ("10.0.0.2", 5000), 0.0)
+    fan.on_subscribe(subscribe(9001, -0.0), ("10.0.0.2", 5000), 1.0)
+    assert fan.leases == {}
+
+
+def test_subscribers_are_bounded():
+    fan = TelemetryFanout(FakeSocket())
+    for i in range(MAX_SUBSCRIBERS + 2):
+        fan.on_subscribe(subscribe(9001, 10), (f"10.0.0.{i}", 5000), 0.0)
+    assert len(fan.leases) == MAX_SUBSCRIBERS
+    assert fan.rejected == 2
@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from gw_frame import (CobsFramer, cobs_decode, cobs_encode, crc16, decode_cmd_frame,
+                      decode_frame, decode_telem_frame, encode_cmd_frame, encode_frame,
+                      encode_telem_frame)
+
+COBS_CASES = [
+    b"",
+    b"\0",
+    b"\0\0\0",
+    b"\x11\0\0\x22",
+    b"\x11\x22\0",
+    bytes(range(1, 254)),              # 253 non-zero: one full-length block minus one
+    bytes(range(1, 255)),              # 254 non-zero: exactly one 0xFF block
+    bytes(range(1, 256)),              # 255 non-zero: spills into a second block
+    bytes(range(1, 255)) + b"\0",      # 254-byte block then a zero
+    bytes(range(1, 255)) + b"\0\x01",
+    b"\0" + bytes(range(1, 255)),
+    bytes(range(256)) * 3,
+]
+
+
+@pytest.mark.parametrize("data", COBS_CASES)
+def test_cobs_roundtrip(data):
+    enc = cobs_encode(data)
+    assert b"\0" not in enc
+    assert cobs_decode(enc) == data
+
+
+def test_cobs_random_roundtrip():
+    rng = os.urandom
+    for n in (1, 10, 253, 254, 255, 508, 600):
+        data = rng(n)
+        assert cobs_decode(cobs_encode(data)) == data
+
+
+@pytest.mark.parametrize("bad", [b"\x00", b"\x05\x01\x02", b"\xff" + b"\x01" * 10])
+def test_cobs_bad_block_rejected(bad):
+    with pytest.raises(ValueError):
+        cobs_decode(bad)
+
+
+def test_crc16_ccitt_false_check_value():
+    assert crc16(b"123456789") == 0x29B1
+
+
+def test_frame_roundtrip_and_crc_mismatch():
+    payload = b"\x01\x07\0\0\xff"
+    frame = encode_frame(payload)
+    assert frame.endswith(b"\0") and b"\0" not in frame[:-1]
+    assert decode_frame(frame[:-1]) == payload
+    raw = bytearray(cobs_decode(frame[:-1]))
+    for i in range(len(raw)):
+        damaged = bytearray(raw)
+        damaged[i] ^= 0x40
+        with pytest.raises(ValueError):
+            decode_frame(cobs_encode(bytes(damaged)))
+
+
+def test_short_frame_rejected():
+    with pytest.raises(ValueError, match="short"):
+        decode_frame(cobs_encode(b"\x01\x02\x03"))
+
+
+@pytest.mark.parametrize("pwm", [(1500, 1500), (1100, 1900, 1500), (1500,) * 8])
+def test_cmd_frame_roundtrip(pwm):
+    payload = decode_frame(encode_cmd_frame(300, pwm, True)[:-1])
+    assert decode_cmd_frame(payload) == (300 & 0xFF, pwm, True)
+
+
+def test_telem_frame_roundtrip():
+    sample = {"p1_psi": 14.5, "p2_psi": None, "dist1_cm": 120.0, "dist2_cm": 3.25}
+    seq, out = decode_telem_frame(decode_frame(encode_telem_frame(5, sample)[:-1]))
+    assert seq == 5 and out == sample
+
+
+def test_typed_payloads_reject_each_other():
+    cmd   = decode_frame(encode_cmd_frame(1, (1500, 1500), False)[:-1])
+    telem = decode_frame(encode_telem_frame(1, {})[:-1])
+    with pytest.raises(ValueError):
+        decode_telem_frame(cmd)
+    with pytest.raises(ValueError):
+        decode_cmd_frame(telem)
+
+
+def test_framer_split_stream_and_resync():
+    frames = [encode_cmd_frame(i, (1500 + i, 1500 - i), i % 2) for i in range(5)]
+    stream = b"\x13\x37garbage" + b"\0" + b"".join(frames)
+    framer = CobsFramer()
+    got = []
+    for i in range(0, len(stream), 3):   # arbitrary chunking
+        got += framer.feed(stream[i:i + 3])
+    assert [decode_cmd_frame(p)[0] for p in got] == list(range(5))
+    assert framer.bad_frames == 1 and framer.lines == 5
+
+
+def test_framer_counts_crc_errors():
+    frame = bytearray(encode_telem_frame(1, {"p1_psi": 1.0}))
+    frame[3] ^= 0x01 if frame[3] != 0x01 else 0x02
+    framer = CobsFramer()
+    assert framer.feed(bytes(frame)) == []
+    assert framer.bad_frames == 1
+
+
+def test_framer_overflow_without_delimiter():
+    framer = CobsFramer(max_len=16)
+    framer.feed(b"\x01" * 40)
+    assert framer.overflows == 1 and framer.buf == bytearray()
@@ -0,0 +1,34 @@
+import socket
+import time
+
+import pytest
+
+from uuv_link import UdpUuvLink
+from uuv_proto import WIRE_JSON, encode_telem
+
+
+def telem(seq, t_rx):
+    return {"t": time.time(), "sens": {"p1": None, "p2": None, "laser1": None, "laser2": None},
+            "state": {"arm": False, "timeout": False, "thrust": [0.0, 0.0]},
+            "ack": {"seq": seq, "t_rx": t_rx, "t_applied": t_rx}}
+
+
+def test_rtt_is_measured_to_arrival_not_to_the_poll():
+    link = UdpUuvLink(pi_ip="127.0.0.1", cmd_port=0, telemetry_port=0, wire=WIRE_JSON)
+    if not link._rx_stamps:
+        pytest.skip("no kernel receive timestamps on this platform")
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        link.latency.on_send(1, time.monotonic())
+        link.latency.on_send(2, time.monotonic())
+        addr = ("127.0.0.1", link.rx.getsockname()[1])
+        tx.sendto(encode_telem(telem(1, time.time()), WIRE_JSON), addr)
+        tx.sendto(encode_telem(telem(2, time.time()), WIRE_JSON), addr)
+        time.sleep(0.3)   # the HUD is busy; both wait in the socket
+        link.poll_telem()
+        count, p50, _, _ = link.latency.summary()["rtt"]
+        assert count == 2
+        assert p50 < 100.0   # ms; the 300 ms wait for the poll is not in it
+    finally:
+        tx.close()
+        link.rx.close()
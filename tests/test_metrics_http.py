@@ -0,0 +1,70 @@
+import socket
+import time
+
+from gw_drivers import BallastDriver, Watchdog
+from gw_metrics import REQUEST_TIMEOUT, Metrics, MetricsHttp, collect_driver
+
+
+class FakeLoop:
+    """The two gw_loop.EventLoop calls MetricsHttp makes."""
+    def __init__(self):
+        self.readers = {}
+
+    def add_reader(self, fileobj, callback, name=""):
+        self.readers[fileobj] = callback
+
+    def remove_reader(self, fileobj):
+        self.readers.pop(fileobj, None)
+
+
+def wait_readable(sock, timeout=1.0):
+    import select
+    return bool(select.select([sock], [], [], timeout)[0])
+
+
+def test_silent_scraper_does_not_block_the_loop():
+    metrics = Metrics()
+    metrics.set("up", 1)
+    loop = FakeLoop()
+    http = MetricsHttp(metrics, 0).attach(loop)
+    addr = http.srv.getsockname()
+    idle = socket.create_connection(addr)
+    good = socket.create_connection(addr)
+    try:
+        # The idle client is accepted and left waiting; nothing blocks
+        assert wait_readable(http.srv)
+        t0 = time.monotonic()
+        http.on_accept(0.0)
+        http.on_accept(0.0)
+        assert time.monotonic() - t0 < 0.05
+        assert len(http.pending) == 2
+
+        good.sendall(b"GET /metrics HTTP/1.1\r\nHost: pi\r\n\r\n")
+        conn = next(c for c in http.pending if c.getpeername() == good.getsockname())
+        assert wait_readable(conn)
+        loop.readers[conn](0.1)
+        reply = good.recv(65536)
+        assert reply.startswith(b"HTTP/1.1 200 OK") and b"uuv_gw_up 1" in reply
+        assert http.scrapes == 1
+
+        http.expire(REQUEST_TIMEOUT + 1.0)
+        assert http.pending == {} and http.timeouts == 1
+        assert list(loop.readers) == [http.srv]
+    finally:
+        idle.close()
+        good.close()
+        http.close()
+
+
+def test_scrape_does_not_count_watchdog_trips():
+    drv = BallastDriver(Watchdog(timeout=0.5))
+    drv.handle_cmd(b"0001", 0.0)
+    metrics = Metrics()
+    metrics.collect(lambda m: collect_driver(m, "ballast", drv))
+    for _ in range(3):
+        metrics.snapshot()
+    assert drv.watchdog.trips == {}
+    assert drv.watchdog.stale(drv.channel, 1.0)
+    assert drv.watchdog.trips == {}
+    assert drv.watchdog.expired(drv.channel, 1.0)
+    assert drv.watchdog.trips == {"ballast": 1}
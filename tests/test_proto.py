@@ -0,0 +1,144 @@
+import json
+import math
+import struct
+
+import pytest
+
+from uuv_link import UuvCmd
+from uuv_proto import (MAGIC, MSG_BALLAST, MSG_CMD, MSG_SUBSCRIBE, MSG_TELEM, VERSION,
+                       WIRE_BINARY, WIRE_JSON, decode_ballast, decode_cmd, decode_subscribe,
+                       decode_telem, encode_ballast, encode_cmd, encode_subscribe, encode_telem,
+                       wire_of)
+
+CMD = UuvCmd(t=1234.5, mode="MANUAL", arm=True, surge=0.5, yaw=-0.25, heave=0.0, ballast=1.0, seq=77)
+
+TELEM = {
+    "t": 99.25,
+    "sens":  {"p1": 14.5, "p2": None, "laser1": 120.0, "laser2": None},
+    "state": {"arm": True, "timeout": False, "thrust": [0.5, -0.25]},
+    "ballast": {"cmd": "1010", "timeout": True},
+    "ack": {"seq": 77, "t_rx": 1234.6, "t_applied": 1234.7},
+}
+
+
+def _patched(data, offset, value):
+    b = bytearray(data)
+    b[offset] = value
+    return bytes(b)
+
+
+@pytest.mark.parametrize("wire", [WIRE_BINARY, WIRE_JSON])
+def test_cmd_roundtrip(wire):
+    data = encode_cmd(CMD, wire)
+    assert wire_of(data) == wire
+    out = decode_cmd(data)
+    assert out["seq"] == 77 and out["arm"] is True and out["mode"] == "MANUAL"
+    for axis in ("t", "surge", "yaw", "heave", "ballast"):
+        assert out[axis] == pytest.approx(getattr(CMD, axis))
+
+
+def test_telem_roundtrip_binary():
+    out = decode_telem(encode_telem(TELEM, WIRE_BINARY))
+    assert out["t"] == TELEM["t"]
+    assert out["sens"]["p1"] == pytest.approx(14.5)
+    assert out["sens"]["p2"] is None and out["sens"]["laser2"] is None
+    assert out["state"]["arm"] is True and out["state"]["timeout"] is False
+    assert out["state"]["thrust"] == [0.5, -0.25]
+    assert out["ballast"] == {"cmd": "1010", "timeout": True}
+    assert out["ack"] == TELEM["ack"]
+
+
+def test_telem_without_optional_sections():
+    telem = {k: TELEM[k] for k in ("t", "sens", "state")}
+    out = decode_telem(encode_telem(telem, WIRE_BINARY))
+    assert "ballast" not in out and "ack" not in out
+
+
+def test_telem_roundtrip_json():
+    assert decode_telem(encode_telem(TELEM, WIRE_JSON)) == json.loads(json.dumps(TELEM))
+
+
+@pytest.mark.parametrize("command", ["0000", "1010", "0101", "1111"])
+@pytest.mark.parametrize("wire", [WIRE_BINARY, WIRE_JSON])
+def test_ballast_roundtrip(command, wire):
+    assert decode_ballast(encode_ballast(command, wire)) == command
+
+
+@pytest.mark.parametrize("text", [b"101", b"10102", b"abcd", b""])
+def test_ballast_text_rejected(text):
+    assert decode_ballast(text) is None
+
+
+def test_ballast_bits_out_of_range():
+    data = encode_ballast("1111", WIRE_BINARY)
+    assert decode_ballast(_patched(data, 4, 0x1F)) is None
+
+
+@pytest.mark.parametrize("wire", [WIRE_BINARY, WIRE_JSON])
+def test_subscribe_roundtrip(wire):
+    assert decode_subscribe(encode_subscribe(9001, 10, wire)) == (9001, 10.0)
+
+
+def test_subscribe_json_without_port():
+    with pytest.raises(ValueError):
+        decode_subscribe(b'{"lease": 3}')
+
+
+BINARY = [
+    (MSG_CMD,       lambda: encode_cmd(CMD),               decode_cmd),
+    (MSG_TELEM,     lambda: encode_telem(TELEM),           decode_telem),
+    (MSG_BALLAST,   lambda: encode_ballast("1010"),        decode_ballast),
+    (MSG_SUBSCRIBE, lambda: encode_subscribe(9001, 10),    decode_subscribe),
+]
+
+
+@pytest.mark.parametrize("mtype, encode, decode", BINARY)
+def test_header(mtype, encode, decode):
+    data = encode()
+    assert data[:2] == MAGIC and data[2] == VERSION and data[3] == mtype
+
+
+@pytest.mark.parametrize("mtype, encode, decode", BINARY)
+def test_wrong_version_rejected(mtype, encode, decode):
+    with pytest.raises(ValueError, match="version"):
+        decode(_patched(encode(), 2, VERSION - 1))
+
+
+@pytest.mark.parametrize("mtype, encode, decode", BINARY)
+def test_wrong_type_rejected(mtype, encode, decode):
+    other = MSG_BALLAST if mtype != MSG_BALLAST else MSG_CMD
+    with pytest.raises(ValueError):
+        decode(_patched(encode(), 3, other))
+
+
+@pytest.mark.parametrize("mtype, encode, decode", BINARY)
+@pytest.mark.parametrize("change", [-1, 1])
+def test_wrong_length_rejected(mtype, encode, decode, change):
+    data = encode()
+    data = data[:change] if change < 0 else data + b"\0"
+    with pytest.raises(ValueError, match="length"):
+        decode(data)
+
+
+def test_telem_header_only_rejected():
+    with pytest.raises(ValueError):
+        decode_telem(encode_telem(TELEM)[:4])
+
+
+def test_nan_sensor_is_none_not_nan():
+    out = decode_telem(encode_telem(TELEM))
+    assert not any(isinstance(v, float) and math.isnan(v) for v in out["sens"].values())
+
+
+@pytest.mark.parametrize("wire", [WIRE_BINARY, WIRE_JSON])
+@pytest.mark.parametrize("lease, sent", [(0, 0), (0.2, 1), (0.5, 1), (1.5, 2), (10, 10),
+                                         (65535, 65535), (1e6, 65535), (float("inf"), 65535),
+                                         (-0.0, 0)])
+def test_subscribe_lease_clamped(wire, lease, sent):
+    assert decode_subscribe(encode_subscribe(9001, lease, wire)) == (9001, float(sent))
+
+
+@pytest.mark.parametrize("lease", [-1, float("nan")])
+def test_subscribe_bad_lease_rejected(lease):
+    with pytest.raises(ValueError):
+        encode_subscribe(9001, lease)
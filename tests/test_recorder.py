@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import pytest
+
+from uuv_recorder import _CHUNK, _MAGIC_V1, _TELEM_V1, NAN, STREAMS, FlightRecorder, load, telem_row
+
+
+def test_idle_stream_is_flushed_without_new_rows(tmp_path):
+    rec = FlightRecorder(str(tmp_path / "idle.uvrec"), flush_interval=0.05)
+    rec.ballast("1010")
+    deadline = time.monotonic() + 2.0
+    while rec.written == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Readable from disk before close(), as after a crash
+    assert list(load(rec.path)["ballast"]["bits"]) == [0b1010]
+    rec.close()
+
+
+def test_close_writes_buffered_rows(tmp_path):
+    rec = FlightRecorder(str(tmp_path / "close.uvrec"), flush_interval=60.0)
+    rec.ballast("0001")
+    rec.ballast("0010")
+    assert rec.written == 0
+    rec.close()
+    assert list(load(rec.path)["ballast"]["bits"]) == [1, 2]
+
+
+def _telem(thrust, **state):
+    return {"t": 1.0, "sens": {"p1": 14.7, "p2": None, "laser1": 1.0, "laser2": 2.0},
+            "state": dict(arm=True, timeout=False, thrust=thrust, **state)}
+
+
+def test_thrust_vector_round_trip(tmp_path):
+    rec = FlightRecorder(str(tmp_path / "quad.uvrec"))
+    rec.telem(_telem([0.1, -0.2, 0.3, -0.4]))
+    rec.telem(_telem([0.5, -0.5], left=0.5, right=-0.5))
+    rec.close()
+    cols  = load(rec.path)["telem"]
+    quad  = telem_row(cols, 0)["state"]
+    assert quad["thrust"] == pytest.approx([0.1, -0.2, 0.3, -0.4])
+    assert "left" not in quad
+    twin = telem_row(cols, 1)["state"]
+    assert twin["thrust"] == pytest.approx([0.5, -0.5])
+    assert (twin["left"], twin["right"]) == pytest.approx((0.5, -0.5))
+
+
+def test_version_1_recording_still_loads(tmp_path):
+    row = np.array([(2.0, 1.0, 1, 0, 14.7, NAN, 1.0, 2.0, 0.25, -0.25, 5, 0, 7)], dtype=_TELEM_V1)
+    cols = b"".join(row[c].tobytes().ljust(8, b"\0") for c in _TELEM_V1.names)
+    path = tmp_path / "v1.uvrec"
+    path.write_bytes(_MAGIC_V1 + _CHUNK.pack(b"CK", STREAMS["telem"][0], 1) + cols)
+    telem = telem_row(load(str(path))["telem"], 0)
+    assert telem["state"]["thrust"] == pytest.approx([0.25, -0.25])
+    assert telem["ballast"] == {"cmd": "0101", "timeout": False}
+    with pytest.raises(ValueError):
+        FlightRecorder(str(path))
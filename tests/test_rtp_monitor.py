@@ -0,0 +1,34 @@
+import socket
+import struct
+import time
+
+from video_pipeline import TRANSPORT_RTP, PipelineBuilder
+from video_relay import RtpMonitor
+
+
+def rtp_packet(seq, ts):
+    return struct.pack("!BBHII", 0x80, 96, seq, ts, 0x1234) + b"\x00" * 32
+
+
+def test_udpsrc_binds_rtp_port_unless_relayed():
+    b = PipelineBuilder("pi", 5600, 640, 480, transport=TRANSPORT_RTP, stats_port=5601)
+    assert "udpsrc port=5600 " in b.source()
+    b = PipelineBuilder("pi", 5600, 640, 480, transport=TRANSPORT_RTP, relay_port=5602)
+    assert "udpsrc port=5602 " in b.source()
+
+
+def test_monitor_counts_loss_without_forwarding():
+    mon = RtpMonitor(0, bind="127.0.0.1").start()
+    tx  = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        for seq in (1, 2, 4, 5):   # 3 lost
+            tx.sendto(rtp_packet(seq, seq * 3000), mon.rx.getsockname())
+        deadline = time.monotonic() + 2.0
+        while mon.rtp.received < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = mon.stats()
+        assert stats["received"] == 4
+        assert stats["lost"] == 1
+    finally:
+        tx.close()
+        mon.stop()
@@ -0,0 +1,82 @@
+import time
+
+from gw_drivers import BallastDriver, Watchdog
+from gw_serial import Backoff, SerialLink
+
+
+class FakeSerial:
+    """Enough of serial.Serial for SerialLink: fails reads/opens on request."""
+    def __init__(self):
+        self.port      = "/dev/fake"
+        self.is_open   = True
+        self.fail      = False   # reads raise, as after a USB drop
+        self.refuse    = False   # open() raises, the device is still gone
+        self.in_waiting = 0
+        self.written   = []
+
+    def read(self, n):
+        if self.fail or not self.is_open:
+            raise OSError("device reports readiness to read but returned no data")
+        time.sleep(0.005)
+        return b""
+
+    def write(self, data):
+        if not self.is_open:
+            raise OSError("port closed")
+        self.written.append(data)
+
+    def open(self):
+        if self.refuse:
+            raise OSError("no such device")
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+    def reset_input_buffer(self):
+        pass
+
+
+def wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return cond()
+
+
+def test_lost_port_is_reopened_and_reported_through_the_watchdog():
+    ser = FakeSerial()
+    drv = BallastDriver(Watchdog(timeout=10.0))
+    drv.handle_cmd(b"1010", time.monotonic())
+    events = []
+
+    def on_link(up, why):
+        events.append(up)
+        drv.watchdog.link_down(drv.channel, not up)
+
+    link = SerialLink(ser, lambda line: None, on_link=on_link)
+    link.backoff = Backoff(0.01, 0.05)
+    link.start()
+    try:
+        assert link.write(drv.serial_command(time.monotonic()))
+        ser.fail = ser.refuse = True
+        assert wait_for(lambda: not link.up)
+        assert events == [False]
+        assert drv.state(time.monotonic()) == {"cmd": "0000", "timeout": True}
+        assert link.write(b"1010\n") is False   # skipped while down
+
+        ser.fail = ser.refuse = False
+        assert wait_for(lambda: link.up)
+        assert events == [False, True]
+        assert link.reopens == 1
+        assert link.backoff.delay == 0.01
+        assert drv.state(time.monotonic()) == {"cmd": "1010", "timeout": False}
+    finally:
+        link.stop()
+
+
+def test_backoff_doubles_up_to_cap():
+    b = Backoff(0.5, 2.0)
+    assert [b.failed() for _ in range(4)] == [1.0, 2.0, 2.0, 2.0]
+    b.reset()
+    assert b.delay == 0.5
@@ -0,0 +1,48 @@
+import pytest
+
+from gw_alloc import ThrusterAllocator
+from gw_drivers import MotorDriver, Watchdog
+from uuv_proto import WIRE_BINARY, WIRE_JSON, decode_telem, encode_telem
+
+# Three thrusters none of which is called left or right
+GEOMETRY = [
+    {"name": "port", "pos": [-0.30, -0.15, 0.0], "dir": [1.0, 0.0, 0.0],
+     "pwm": [[-1.0, 1100], [0.0, 1500], [1.0, 1900]]},
+    {"name": "stbd", "pos": [-0.30,  0.15, 0.0], "dir": [1.0, 0.0, 0.0],
+     "pwm": [[-1.0, 1100], [0.0, 1500], [1.0, 1900]]},
+    {"name": "vert", "pos": [0.0, 0.0, 0.0], "dir": [0.0, 0.0, 1.0],
+     "pwm": [[-1.0, 1100], [0.0, 1500], [1.0, 1900]]},
+]
+
+
+def driver_telem(geometry=None):
+    drv = MotorDriver(Watchdog(1.5), allocator=ThrusterAllocator(geometry) if geometry else None)
+    drv.handle_cmd(b'{"t": 0, "mode": "MANUAL", "arm": true, "surge": 0.5, "yaw": 0.25, "heave": -0.5}', 0.0)
+    return {"t": 12.5, **drv.telem(0.0)}
+
+
+def test_binary_roundtrip_custom_geometry():
+    telem = driver_telem(GEOMETRY)
+    out = decode_telem(encode_telem(telem, WIRE_BINARY))
+    assert out["state"]["arm"] is True
+    assert out["state"]["thrust"] == pytest.approx(telem["state"]["thrust"], abs=1e-6)
+    assert len(out["state"]["thrust"]) == 3
+    assert "left" not in out["state"]
+
+
+def test_binary_roundtrip_default_geometry_keeps_names():
+    telem = driver_telem()
+    out = decode_telem(encode_telem(telem, WIRE_BINARY))
+    assert out["state"]["left"]  == pytest.approx(telem["state"]["left"],  abs=1e-6)
+    assert out["state"]["right"] == pytest.approx(telem["state"]["right"], abs=1e-6)
+
+
+def test_json_keeps_thruster_names():
+    out = decode_telem(encode_telem(driver_telem(GEOMETRY), WIRE_JSON))
+    assert set(out["state"]) >= {"port", "stbd", "vert", "thrust"}
+
+
+def test_truncated_thrust_array_rejected():
+    data = encode_telem(driver_telem(GEOMETRY), WIRE_BINARY)
+    with pytest.raises(ValueError):
+        decode_telem(data[:-1])
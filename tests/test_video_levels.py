@@ -0,0 +1,57 @@
+import pytest
+
+from video_pipeline import (DECODERS, LEVEL_FULL, LEVEL_HALF, LEVEL_KEYFRAMES, Adaptation,
+                            PipelineBuilder, StreamHealth)
+
+# gst-libav's GstLibAVVidDecSkipFrame values (gst-inspect-1.0 avdec_h264)
+AVDEC_SKIP_FRAME = {"0", "1", "2", "5"}
+
+
+def test_half_level_reduces_decoding():
+    b = PipelineBuilder("pi", 8000, 640, 480, "avdec_h264")
+    assert "skip-frame" not in b.display(LEVEL_FULL)
+    assert "skip-frame=1" in b.display(LEVEL_HALF)
+    assert "drop-buffer-flags=delta-unit" in b.display(LEVEL_KEYFRAMES)
+    assert b.skip_from() == LEVEL_HALF
+
+
+def test_reduced_options_are_valid_enum_values():
+    for name, _, cheap in DECODERS:
+        for opt in cheap.split():
+            key, value = opt.split("=", 1)
+            if name.startswith("avdec_") and key == "skip-frame":
+                assert value in AVDEC_SKIP_FRAME
+
+
+def test_half_level_pipeline_parses():
+    gi = pytest.importorskip("gi")
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst
+    Gst.init(None)
+    if Gst.ElementFactory.find("avdec_h264") is None:
+        pytest.skip("gst-libav not installed")
+    b = PipelineBuilder("pi", 8000, 640, 480, "avdec_h264")
+    for level in (LEVEL_FULL, LEVEL_HALF, LEVEL_KEYFRAMES):
+        Gst.parse_launch(b.build(level)).set_state(Gst.State.NULL)
+
+
+def test_hardware_decoder_skips_only_at_keyframes():
+    b = PipelineBuilder("pi", 8000, 640, 480, "vah264dec")
+    assert b.display(LEVEL_HALF).startswith("vah264dec ! ")
+    assert b.skip_from() == LEVEL_KEYFRAMES
+
+
+def test_drops_ignored_where_frames_are_skipped():
+    bad = {"drop_rate": 0.5, "delay_ms": 0.0}
+    a = Adaptation(bad_windows=1, skip_from=LEVEL_HALF)
+    assert a.update(bad) == LEVEL_HALF
+    assert a.update(bad) == LEVEL_HALF
+
+
+def test_reset_takes_the_new_pipelines_rate():
+    h = StreamHealth(fps=30.0)
+    h.add(0.0, 0.0)
+    h.reset(fps=15.0)
+    assert h.fps == 15.0 and h.frames == 0 and h.last is None
+    h.reset(fps=0.0)   # caps without a rate keep the last one
+    assert h.fps == 15.0
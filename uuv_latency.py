@@ -0,0 +1,110 @@
+import csv
+import math
+import time
+from collections import deque
+
+
+class LatencyHistogram:
+    """
+    Log-spaced histogram of latencies in seconds.
+
+    50 bins per decade (~5% wide) from 10 us to 100 s, so percentiles stay
+    accurate over a long run without keeping every sample.
+    """
+    def __init__(self, lo=1e-5, hi=100.0, bins_per_decade=50):
+        self.lo     = lo
+        self.k      = bins_per_decade
+        self.counts = [0] * (int(math.log10(hi / lo) * bins_per_decade) + 2)
+        self.n      = 0
+        self.max    = 0.0
+
+    def add(self, x):
+        if x <= self.lo:
+            i = 0
+        else:
+            i = min(len(self.counts) - 1, int(math.log10(x / self.lo) * self.k) + 1)
+        self.counts[i] += 1
+        self.n   += 1
+        self.max  = max(self.max, x)
+
+    def percentile(self, q):
+        """Upper edge of the bin holding the q-th percentile (0..100), or None if empty."""
+        if not self.n:
+            return None
+        rank = q / 100.0 * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(self.lo * 10 ** (i / self.k), self.max)
+        return self.max
+
+
+class LatencyTracker:
+    """
+    Command latency from echoed sequence numbers.
+
+    The HUD records when each command seq went out; the gateway echoes the
+    last applied seq with its own receive and apply times. From one echo:
+
+      rtt   HUD send -> telemetry carrying the echo arrives (HUD clock only)
+      gw    gateway receive -> command written to serial (gateway clock only)
+      net   one-way network estimate: (rtt - gateway residence) / 2
+      cmd   HUD send -> PWM command on the serial line: net + gw
+
+    Only differences on the same clock are used, so the laptop and Pi
+    clocks never need to agree. `net` is also the age of telemetry on
+    arrival.
+
+    `now` in on_telem should be the datagram's arrival. UdpUuvLink passes
+    the kernel receive stamp (SO_TIMESTAMPNS) moved onto the monotonic
+    clock; without kernel stamps it can only pass the poll time, so rtt
+    then also includes how long the sample waited for the HUD to poll.
+    """
+    METRICS = ("rtt", "gw", "net", "cmd")
+
+    def __init__(self, max_rows=100_000):
+        self.hist  = {m: LatencyHistogram() for m in self.METRICS}
+        self.rows  = deque(maxlen=max_rows)
+        self.sent  = {}     # seq -> monotonic send time
+        self.acked = 0
+
+    def on_send(self, seq, now):
+        self.sent[seq] = now
+        if len(self.sent) > 1024:
+            for old in [s for s in self.sent if s < seq - 512]:
+                del self.sent[old]
+
+    def on_telem(self, telem, now):
+        """Feed one telemetry sample received at monotonic `now`."""
+        ack = telem.get("ack")
+        if not ack or ack["seq"] <= self.acked:
+            return
+        self.acked = ack["seq"]
+        sent = self.sent.pop(ack["seq"], None)
+        if sent is None:
+            return
+
+        rtt = now - sent
+        gw  = max(0.0, ack["t_applied"] - ack["t_rx"])
+        net = max(0.0, (rtt - (telem["t"] - ack["t_rx"])) / 2)
+        cmd = net + gw
+        for m, v in zip(self.METRICS, (rtt, gw, net, cmd)):
+            self.hist[m].add(v)
+        self.rows.append((time.time(), ack["seq"], rtt, gw, net, cmd))
+
+    def summary(self) -> dict:
+        """metric -> (count, p50, p95, p99) in milliseconds."""
+        out = {}
+        for m, h in self.hist.items():
+            ps = [h.percentile(q) for q in (50, 95, 99)]
+            out[m] = (h.n, *[p * 1e3 if p is not None else None for p in ps])
+        return out
+
+    def write_csv(self, path):
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["time", "seq"] + [f"{m}_ms" for m in self.METRICS])
+            for t, seq, *vals in self.rows:
+                w.writerow([f"{t:.3f}", seq] + [f"{v * 1e3:.3f}" for v in vals])
+        return path
@@ -1,7 +1,16 @@
-import json
 import socket
+import struct
+import sys
 import time
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+
+from uuv_latency import LatencyTracker
+from uuv_proto import WIRE_BINARY, encode_cmd, encode_ballast, encode_subscribe, decode_telem, lease_seconds
+
+# Kernel receive timestamps (Linux; the socket module has no name for it).
+# SCM_TIMESTAMPNS carries a struct timespec of when the datagram arrived.
+SO_TIMESTAMPNS = getattr(socket, "SO_TIMESTAMPNS", 35 if sys.platform.startswith("linux") else None)
+_TIMESPEC      = struct.Struct("@ll")
 
 @dataclass
 class UuvCmd:
@@ -12,6 +21,7 @@ class UuvCmd:
     yaw: float     # [-1..1]
     heave: float   # [-1..1] (optional; keep 0 for now)
     ballast: float # [-1..1] (optional; keep 0 for now)
+    seq: int = 0   # set by UdpUuvLink.send(); echoed back in telemetry "ack"
 
 def clamp(x, lo=-1.0, hi=1.0):
     return max(lo, min(hi, float(x)))
@@ -22,35 +32,202 @@ class UdpUuvLink:
       - send commands to Pi: udp://PI_IP:CMD_PORT
       - optionally receive telemetry: bind to TELEMETRY_PORT
       - optionally send ballast commands: udp://PI_IP:BALLAST_PORT
+
+    wire selects the datagram format (uuv_proto.WIRE_BINARY or WIRE_JSON).
+    The gateway replies with telemetry in the same format it receives.
+
+    Transmission policy: send() and send_ballast() go out immediately when
+    the command changes, otherwise at most heartbeat_hz times per second to
+    keep the gateway watchdog fed. The heartbeat repeats the full command
+    (30 bytes in binary), so a lost change is repaired by the next one.
+    heartbeat_hz=None sends on every call.
+
+    Every command datagram gets the next sequence number; the gateway echoes
+    the last one it applied and self.latency turns the echoes into latency
+    histograms.
+
+    Telemetry goes to the pilot laptop by default. Any other station calls
+    subscribe() for a lease on the same stream (renewed from poll_telem),
+    and with multicast_group set the rx socket also joins that group.
+    telemetry_port=0 binds any free port, e.g. for a second HUD on one host.
     """
-    def __init__(self, pi_ip="192.168.0.2", cmd_port=9000, telemetry_port=9001, ballast_port=9002):
+    def __init__(self, pi_ip="192.168.0.2", cmd_port=9000, telemetry_port=9001, ballast_port=9002,
+                 wire=WIRE_BINARY, heartbeat_hz=5.0, subscribe_port=9003, multicast_group=None):
+        self.wire = wire
+        self.heartbeat_dt = 1.0 / heartbeat_hz if heartbeat_hz else 0.0
+        self._last_tx = {}  # channel -> (command key, monotonic send time)
+        self.tx_sent    = 0
+        self.tx_skipped = 0
+        self.cmd_seq    = 0
+        self.latency    = LatencyTracker()
         self.pi_addr = (pi_ip, cmd_port)
         self.pi_ballast_addr = (pi_ip, ballast_port)
+        self.pi_sub_addr = (pi_ip, subscribe_port)
+        self.sub_lease   = 0.0   # seconds; 0 = not subscribed
+        self._sub_renew  = 0.0   # monotonic time of the next renewal
 
         self.tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.tx_ballast = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 
         self.rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if multicast_group:
+            # Several listeners on one host share the group port
+            self.rx.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.rx.bind(("0.0.0.0", telemetry_port))
         self.rx.setblocking(False)
+        if multicast_group:
+            mreq = struct.pack("4s4s", socket.inet_aton(multicast_group), socket.inet_aton("0.0.0.0"))
+            self.rx.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
 
         self.last_telem = None
         self.last_telem_time = 0.0
 
-    def send(self, cmd: UuvCmd):
-        payload = json.dumps(asdict(cmd)).encode("utf-8")
-        self.tx.sendto(payload, self.pi_addr)
+        # Receive statistics
+        self.rx_received  = 0
+        self.rx_coalesced = 0     # datagrams replaced by a newer one in the same poll
+        self.rx_last_batch = 0
+        self.rx_jitter    = 0.0   # RFC 3550 style transit jitter, seconds
+        self.rx_transit   = None  # smoothed arrival - sender t (includes the clock offset)
+        self._rx_prev     = None  # (sender t, arrival time) of the previous sample
+
+        # Per-datagram arrival times from the kernel, so datagrams drained in
+        # one poll keep their own times; without them only the first of each
+        # batch (the one that can have arrived just before the poll) is used
+        self._rx_stamps = False
+        if SO_TIMESTAMPNS is not None:
+            try:
+                self.rx.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+                self._rx_stamps = True
+            except OSError:
+                pass
+
+    def _due(self, channel, key, force):
+        now  = time.monotonic()
+        last = self._last_tx.get(channel)
+        if force or last is None or last[0] != key or now - last[1] >= self.heartbeat_dt:
+            self._last_tx[channel] = (key, now)
+            self.tx_sent += 1
+            return True
+        self.tx_skipped += 1
+        return False
+
+    def send(self, cmd: UuvCmd, force=False) -> bool:
+        """Returns True if a datagram went out."""
+        key = (cmd.mode, cmd.arm, cmd.surge, cmd.yaw, cmd.heave, cmd.ballast)
+        if not self._due("cmd", key, force):
+            return False
+        self.cmd_seq += 1
+        cmd.seq = self.cmd_seq
+        self.tx.sendto(encode_cmd(cmd, self.wire), self.pi_addr)
+        self.latency.on_send(cmd.seq, time.monotonic())
+        return True
+
+    def send_ballast(self, command: str, force=False) -> bool:
+        if not self._due("ballast", command, force):
+            return False
+        self.tx_ballast.sendto(encode_ballast(command, self.wire), self.pi_ballast_addr)
+        return True
 
-    def send_ballast(self, command: str):
-        self.tx_ballast.sendto(command.encode("utf-8"), self.pi_ballast_addr)
+    def subscribe(self, lease=10.0):
+        """Ask the gateway for telemetry on our rx port; renewed at half the lease."""
+        lease = lease_seconds(lease)   # what actually goes on the wire
+        self.sub_lease  = lease
+        self._sub_renew = time.monotonic() + lease / 2
+        self.tx.sendto(encode_subscribe(self.rx.getsockname()[1], lease, self.wire), self.pi_sub_addr)
 
-    def poll_telem(self):
-        try:
-            data, _ = self.rx.recvfrom(65535)
-            self.last_telem = json.loads(data.decode("utf-8"))
-            self.last_telem_time = time.time()
-            return self.last_telem
-        except BlockingIOError:
+    def unsubscribe(self):
+        self.sub_lease = 0.0
+        self.tx.sendto(encode_subscribe(self.rx.getsockname()[1], 0, self.wire), self.pi_sub_addr)
+
+    def poll_telem(self, drain=True, on_batch=None):
+        """
+        Return the newest telemetry sample, or None if nothing arrived.
+
+        With drain=True every pending datagram is read and only the newest
+        is kept, so a slow HUD frame never leaves the display behind the
+        gateway. on_batch(list_of_samples) receives the whole batch, oldest
+        first, e.g. for logging.
+        """
+        if self.sub_lease and time.monotonic() >= self._sub_renew:
+            self.subscribe(self.sub_lease)
+
+        batch, arrivals = [], []
+        while True:
+            try:
+                arrival = None
+                if self._rx_stamps:
+                    data, anc, _, _ = self.rx.recvmsg(65535, socket.CMSG_SPACE(_TIMESPEC.size))
+                    for level, kind, raw in anc:
+                        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS:
+                            sec, nsec = _TIMESPEC.unpack_from(raw)
+                            arrival = sec + nsec / 1e9
+                else:
+                    data, _ = self.rx.recvfrom(65535)
+            except BlockingIOError:
+                break
+            except Exception:
+                break
+            try:
+                batch.append(decode_telem(data))
+                arrivals.append(arrival)
+            except Exception:
+                pass
+            if not drain:
+                break
+
+        if not batch:
             return None
-        except Exception:
+
+        now = time.time()
+        mono = time.monotonic()
+        self.rx_received   += len(batch)
+        self.rx_coalesced  += len(batch) - 1
+        self.rx_last_batch  = len(batch)
+        if not self._rx_stamps:
+            arrivals[0] = now
+
+        # Transit jitter from the gateway's send time vs. when the HUD got it;
+        # the clock offset between Pi and laptop cancels out.
+        for telem, arrival in zip(batch, arrivals):
+            sent = telem.get("t")
+            if sent is not None and arrival is not None:
+                transit = arrival - sent
+                if self._rx_prev is not None:
+                    d = (arrival - self._rx_prev[1]) - (sent - self._rx_prev[0])
+                    self.rx_jitter += (abs(d) - self.rx_jitter) / 16.0
+                self.rx_transit = transit if self.rx_transit is None else \
+                    self.rx_transit + (transit - self.rx_transit) / 16.0
+                self._rx_prev = (sent, arrival)
+            # Kernel stamps are wall-clock; move them onto the monotonic clock
+            # the command send times use, so RTT excludes the wait for this poll
+            rx_mono = mono if arrival is None else mono - max(0.0, now - arrival)
+            self.latency.on_telem(telem, rx_mono)
+
+        if on_batch is not None:
+            on_batch(batch)
+
+        self.last_telem = batch[-1]
+        self.last_telem_time = now
+        return self.last_telem
+
+    def sample_age(self, now=None):
+        """
+        Seconds the newest sample is behind the gateway: time since it was
+        sent, in laptop time via the smoothed transit, less that transit.
+        Grows when the HUD stops polling or the gateway stops sending.
+        """
+        sent = self.last_telem.get("t") if self.last_telem else None
+        if sent is None or self.rx_transit is None:
             return None
+        return max(0.0, (time.time() if now is None else now) - (sent + self.rx_transit))
+
+    def telem_stats(self) -> dict:
+        """Receive counters, age of the newest sample and transit jitter."""
+        age = self.sample_age()
+        return {
+            "received":   self.rx_received,
+            "coalesced":  self.rx_coalesced,
+            "last_batch": self.rx_last_batch,
+            "age_ms":     age * 1e3 if age is not None else None,
+            "jitter_ms":  self.rx_jitter * 1e3,
+        }
@@ -0,0 +1,222 @@
+import json
+import math
+import struct
+from dataclasses import asdict
+
+# Wire format shared by the HUD (uuv_link.py) and the Pi gateways.
+#
+#   header : magic "UV" | version u8 | msg type u8
+#   body   : fixed little-endian struct per message type (telemetry adds
+#            one float per thruster after it)
+#
+# JSON (and the plain "0101" ballast string) stay available as a fallback
+# for debugging. Receivers auto-detect the format from the first two bytes,
+# and the gateway answers in whatever format the HUD last used.
+MAGIC   = b"UV"
+VERSION = 4
+
+MSG_CMD     = 1
+MSG_TELEM   = 2
+MSG_BALLAST = 3
+MSG_SUBSCRIBE = 4
+
+WIRE_BINARY = "binary"
+WIRE_JSON   = "json"
+
+MODES    = ("MANUAL",)
+_MODE_ID = {m: i for i, m in enumerate(MODES)}
+
+_HDR         = struct.Struct("<2sBB")
+_CMD_MSG     = struct.Struct("<2sBBdBB4fI")  # t, mode, arm, surge, yaw, heave, ballast, seq
+_TELEM_MSG   = struct.Struct("<2sBBdB4fBIddB")  # t, flags, p1, p2, laser1, laser2, ballast,
+                                               # ack seq, ack t_rx, ack t_applied, thruster count
+_THRUST      = struct.Struct("<f")             # x count, gateway geometry order
+MAX_THRUSTERS = 255
+_BALLAST_MSG = struct.Struct("<2sBBB")         # valve bits, MSB first as in "1010"
+_SUB_MSG     = struct.Struct("<2sBBHH")        # reply port, lease seconds (0 = unsubscribe)
+
+TELEM_ARM     = 0x01
+TELEM_TIMEOUT = 0x02
+
+# Telemetry ballast byte: valve bits in the low nibble
+BALLAST_TIMEOUT = 0x10
+BALLAST_PRESENT = 0x80
+
+NAN = float("nan")
+
+
+def _f(x):
+    return NAN if x is None else float(x)
+
+def _opt(x):
+    return None if math.isnan(x) else x
+
+
+def wire_of(data: bytes) -> str:
+    return WIRE_BINARY if data[:2] == MAGIC else WIRE_JSON
+
+def _check_header(data: bytes, msg_type: int, body: struct.Struct, extra=0):
+    if len(data) != body.size + extra:
+        raise ValueError(f"bad length {len(data)} for msg type {msg_type}")
+    magic, version, mtype = _HDR.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"unsupported wire version {version}")
+    if mtype != msg_type:
+        raise ValueError(f"expected msg type {msg_type}, got {mtype}")
+
+
+# ---- Commands (HUD -> gateway) ----
+
+def encode_cmd(cmd, wire=WIRE_BINARY) -> bytes:
+    if wire == WIRE_JSON:
+        return json.dumps(asdict(cmd)).encode("utf-8")
+    return _CMD_MSG.pack(
+        MAGIC, VERSION, MSG_CMD,
+        cmd.t, _MODE_ID[cmd.mode], 1 if cmd.arm else 0,
+        cmd.surge, cmd.yaw, cmd.heave, cmd.ballast, cmd.seq
+    )
+
+def decode_cmd(data: bytes) -> dict:
+    """Decode either wire format into the dict the gateways already use."""
+    if data[:2] != MAGIC:
+        return json.loads(data.decode("utf-8"))
+    _check_header(data, MSG_CMD, _CMD_MSG)
+    _, _, _, t, mode, arm, surge, yaw, heave, ballast, seq = _CMD_MSG.unpack(data)
+    return {
+        "t": t, "mode": MODES[mode] if mode < len(MODES) else None, "arm": bool(arm),
+        "surge": surge, "yaw": yaw, "heave": heave, "ballast": ballast, "seq": seq,
+    }
+
+
+# ---- Telemetry (gateway -> HUD) ----
+# Optional "ack" section: the last command seq the gateway applied, with its
+# gateway-clock receive and apply times (seq 0 = nothing applied yet).
+# state["thrust"] is one value per thruster in the gateway's geometry order
+# (gw_alloc). JSON also carries each one under its thruster name; binary
+# carries only the list, and names the default two-thruster layout
+# "left"/"right" on decode.
+
+def _thrust(state) -> list:
+    if "thrust" in state:
+        return list(state["thrust"])
+    return [state["left"], state["right"]]   # pre-allocator dicts (benches, replays)
+
+def encode_telem(telem: dict, wire=WIRE_BINARY) -> bytes:
+    if wire == WIRE_JSON:
+        return json.dumps(telem).encode("utf-8")
+    sens  = telem["sens"]
+    state = telem["state"]
+    flags = (TELEM_ARM if state["arm"] else 0) | (TELEM_TIMEOUT if state["timeout"] else 0)
+    ballast = telem.get("ballast")
+    bbyte = 0
+    if ballast is not None:
+        bbyte = BALLAST_PRESENT | int(ballast["cmd"], 2) | (BALLAST_TIMEOUT if ballast["timeout"] else 0)
+    ack = telem.get("ack") or {"seq": 0, "t_rx": 0.0, "t_applied": 0.0}
+    thrust = _thrust(state)
+    if len(thrust) > MAX_THRUSTERS:
+        raise ValueError(f"{len(thrust)} thrusters, at most {MAX_THRUSTERS} fit")
+    return _TELEM_MSG.pack(
+        MAGIC, VERSION, MSG_TELEM,
+        telem["t"], flags,
+        _f(sens["p1"]), _f(sens["p2"]), _f(sens["laser1"]), _f(sens["laser2"]),
+        bbyte, ack["seq"], ack["t_rx"], ack["t_applied"], len(thrust)
+    ) + struct.pack(f"<{len(thrust)}f", *thrust)
+
+def decode_telem(data: bytes) -> dict:
+    if data[:2] != MAGIC:
+        return json.loads(data.decode("utf-8"))
+    if len(data) < _TELEM_MSG.size:
+        raise ValueError(f"bad length {len(data)} for msg type {MSG_TELEM}")
+    n = data[_TELEM_MSG.size - 1]
+    _check_header(data, MSG_TELEM, _TELEM_MSG, n * _THRUST.size)
+    (_, _, _, t, flags, p1, p2, laser1, laser2, bbyte,
+     ack_seq, ack_rx, ack_applied, _) = _TELEM_MSG.unpack_from(data)
+    thrust = list(struct.unpack_from(f"<{n}f", data, _TELEM_MSG.size))
+    telem = {
+        "t": t,
+        "sens": {
+            "p1":     _opt(p1),
+            "p2":     _opt(p2),
+            "laser1": _opt(laser1),
+            "laser2": _opt(laser2),
+        },
+        "state": {
+            "arm":     bool(flags & TELEM_ARM),
+            "timeout": bool(flags & TELEM_TIMEOUT),
+            "thrust":  thrust,
+        }
+    }
+    if n == 2:
+        telem["state"]["left"], telem["state"]["right"] = thrust
+    if bbyte & BALLAST_PRESENT:
+        telem["ballast"] = {
+            "cmd":     format(bbyte & 0x0F, "04b"),
+            "timeout": bool(bbyte & BALLAST_TIMEOUT),
+        }
+    if ack_seq:
+        telem["ack"] = {"seq": ack_seq, "t_rx": ack_rx, "t_applied": ack_applied}
+    return telem
+
+
+# ---- Ballast (HUD -> ballast gateway) ----
+# The text fallback is the original 4-character "0101" string.
+
+def encode_ballast(command: str, wire=WIRE_BINARY) -> bytes:
+    if wire == WIRE_JSON:
+        return command.encode("utf-8")
+    return _BALLAST_MSG.pack(MAGIC, VERSION, MSG_BALLAST, int(command, 2))
+
+def decode_ballast(data: bytes):
+    """Return the 4-character valve string, or None if the datagram is invalid."""
+    if data[:2] != MAGIC:
+        cmd = data.decode("utf-8").strip()
+        if len(cmd) == 4 and all(c in "01" for c in cmd):
+            return cmd
+        return None
+    _check_header(data, MSG_BALLAST, _BALLAST_MSG)
+    bits = _BALLAST_MSG.unpack(data)[3]
+    if bits > 0x0F:
+        return None
+    return format(bits, "04b")
+
+
+# ---- Telemetry subscription (any station -> gateway) ----
+# The gateway sends telemetry to the sender's address at `port` until the
+# lease runs out, in the format the subscription arrived in. Leases are
+# whole seconds, MIN_LEASE..MAX_LEASE; 0 unsubscribes.
+MIN_LEASE = 1
+MAX_LEASE = 0xFFFF
+
+def lease_seconds(lease: float) -> int:
+    """
+    Wire lease for a requested one: 0 (and -0.0) stays 0, anything else,
+    infinity included, is rounded up into MIN_LEASE..MAX_LEASE. ValueError
+    for a negative or NaN lease.
+    """
+    lease = float(lease)
+    if not lease >= 0:
+        raise ValueError(f"bad lease {lease!r}")
+    if lease == 0:
+        return 0
+    return max(MIN_LEASE, math.ceil(min(lease, MAX_LEASE)))
+
+def encode_subscribe(port: int, lease: float, wire=WIRE_BINARY) -> bytes:
+    lease = lease_seconds(lease)
+    if wire == WIRE_JSON:
+        return json.dumps({"subscribe": port, "lease": lease}).encode("utf-8")
+    return _SUB_MSG.pack(MAGIC, VERSION, MSG_SUBSCRIBE, port, lease)
+
+def decode_subscribe(data: bytes):
+    """Return (port, lease seconds); ValueError if the datagram is not a subscription."""
+    if data[:2] != MAGIC:
+        msg = json.loads(data.decode("utf-8"))
+        try:
+            port, lease = int(msg["subscribe"]), float(msg.get("lease", 0))
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError("not a subscription")
+        if not 0 <= port <= 0xFFFF:
+            raise ValueError(f"bad port {port}")
+        return port, lease
+    _check_header(data, MSG_SUBSCRIBE, _SUB_MSG)
+    _, _, _, port, lease = _SUB_MSG.unpack(data)
+    return port, float(lease)
@@ -0,0 +1,268 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import asdict, is_dataclass
+
+import numpy as np
+
+from uuv_proto import MODES
+
+# Flight recording: append-only, columnar, chunked.
+#
+#   file   : MAGIC, then chunks until EOF
+#   chunk  : "CK" | stream id u8 | pad u8 | rows u32, then each column's
+#            `rows` values back to back (little-endian), each column padded
+#            to 8 bytes so it can be viewed straight out of an mmap
+#
+# A chunk is written whole, so a recording cut short by a crash or power
+# loss loses at most the rows still buffered. Every row starts with the
+# recorder's wall-clock time "t"; telemetry also keeps the sender's "t_sent".
+#
+# Telemetry keeps the thrust vector: "n_thrust" thrusters, in geometry order,
+# in the first n_thrust of REC_THRUSTERS "thrust" values. Version 1 files had
+# "left"/"right" columns instead; load() still reads them.
+MAGIC     = b"UVREC\x00\x02\x00"
+_MAGIC_V1 = b"UVREC\x00\x01\x00"
+_CHUNK    = struct.Struct("<2sBxI")
+
+NAN = float("nan")
+REC_THRUSTERS = 16   # thrust columns per telemetry row; more are not recorded
+
+STREAMS = {
+    "cmd": (1, np.dtype([
+        ("t", "<f8"), ("t_sent", "<f8"), ("seq", "<u4"), ("mode", "u1"), ("arm", "u1"),
+        ("surge", "<f4"), ("yaw", "<f4"), ("heave", "<f4"), ("ballast", "<f4")])),
+    "arduino": (2, np.dtype([
+        ("t", "<f8"), ("p1_psi", "<f4"), ("p2_psi", "<f4"), ("dist1_cm", "<f4"), ("dist2_cm", "<f4")])),
+    "telem": (3, np.dtype([
+        ("t", "<f8"), ("t_sent", "<f8"), ("arm", "u1"), ("timeout", "u1"),
+        ("p1", "<f4"), ("p2", "<f4"), ("laser1", "<f4"), ("laser2", "<f4"),
+        ("n_thrust", "u1"), ("thrust", "<f4", (REC_THRUSTERS,)),
+        ("ballast", "i1"), ("ballast_timeout", "u1"), ("ack_seq", "<u4")])),
+    "ballast": (4, np.dtype([("t", "<f8"), ("bits", "u1")])),
+}
+_BY_ID = {sid: (name, dtype) for name, (sid, dtype) in STREAMS.items()}
+
+_TELEM_V1 = np.dtype([
+    ("t", "<f8"), ("t_sent", "<f8"), ("arm", "u1"), ("timeout", "u1"),
+    ("p1", "<f4"), ("p2", "<f4"), ("laser1", "<f4"), ("laser2", "<f4"),
+    ("left", "<f4"), ("right", "<f4"), ("ballast", "i1"), ("ballast_timeout", "u1"),
+    ("ack_seq", "<u4")])
+
+
+def _f(x):
+    return NAN if x is None else float(x)
+
+def _opt(x):
+    x = float(x)
+    return None if x != x else x
+
+def _thrust(state) -> list:
+    if "thrust" in state:
+        return [_f(x) for x in state["thrust"]][:REC_THRUSTERS]
+    if "left" in state or "right" in state:
+        return [_f(state.get("left")), _f(state.get("right"))]
+    return []
+
+
+class FlightRecorder:
+    """
+    Buffers rows per stream and appends them as columnar chunks.
+
+    A stream's chunk goes out once it has chunk_rows rows buffered, or
+    flush_interval seconds after its first buffered row: checked when a
+    row arrives and by a background flusher thread, so an idle stream's
+    last rows reach the disk even if nothing else is recorded.
+    Thread-safe: the gateway's serial reader thread records Arduino
+    samples while the loop records commands and telemetry.
+    """
+    def __init__(self, path, chunk_rows=256, flush_interval=1.0):
+        self.path  = path
+        self.f     = open(path, "ab+")
+        if self.f.tell() == 0:
+            self.f.write(MAGIC)
+        else:
+            self.f.seek(0)
+            if self.f.read(len(MAGIC)) != MAGIC:
+                self.f.close()
+                raise ValueError(f"{path}: not a flight recording of this version")
+            self.f.seek(0, os.SEEK_END)
+        self.chunk_rows     = chunk_rows
+        self.flush_interval = flush_interval
+        self.rows   = {name: [] for name in STREAMS}
+        self.first  = {name: 0.0 for name in STREAMS}
+        self.lock   = threading.Lock()
+        self.written = 0
+        self.chunks  = 0
+
+        self._closed  = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="recorder-flush", daemon=True)
+        self._flusher.start()
+
+    @classmethod
+    def in_dir(cls, directory, prefix, **kw):
+        """New recording named <prefix>_<date>_<time>.uvrec in directory."""
+        os.makedirs(directory, exist_ok=True)
+        return cls(os.path.join(directory, time.strftime(f"{prefix}_%Y%m%d_%H%M%S.uvrec")), **kw)
+
+    def write(self, stream, row):
+        with self.lock:
+            rows = self.rows[stream]
+            if not rows:
+                self.first[stream] = time.monotonic()
+            rows.append(row)
+            if (len(rows) >= self.chunk_rows
+                    or time.monotonic() - self.first[stream] >= self.flush_interval):
+                self._flush_stream(stream)
+
+    # ---- Typed rows ----
+
+    def cmd(self, cmd, t=None):
+        """A UuvCmd (HUD side) or decoded command dict (gateway side)."""
+        c = asdict(cmd) if is_dataclass(cmd) else cmd
+        mode = MODES.index(c["mode"]) if c.get("mode") in MODES else 255
+        self.write("cmd", (time.time() if t is None else t, _f(c.get("t")), c.get("seq", 0),
+                           mode, 1 if c.get("arm") else 0,
+                           _f(c.get("surge")), _f(c.get("yaw")), _f(c.get("heave")), _f(c.get("ballast"))))
+
+    def arduino(self, sample: dict, t=None):
+        self.write("arduino", (time.time() if t is None else t,
+                               _f(sample.get("p1_psi")), _f(sample.get("p2_psi")),
+                               _f(sample.get("dist1_cm")), _f(sample.get("dist2_cm"))))
+
+    def telem(self, telem: dict, t=None):
+        sens    = telem.get("sens", {})
+        state   = telem.get("state", {})
+        ballast = telem.get("ballast")
+        ack     = telem.get("ack") or {}
+        thrust  = _thrust(state)
+        self.write("telem", (
+            time.time() if t is None else t, _f(telem.get("t")),
+            1 if state.get("arm") else 0, 1 if state.get("timeout") else 0,
+            _f(sens.get("p1")), _f(sens.get("p2")), _f(sens.get("laser1")), _f(sens.get("laser2")),
+            len(thrust), thrust + [NAN] * (REC_THRUSTERS - len(thrust)),
+            int(ballast["cmd"], 2) if ballast else -1, 1 if ballast and ballast["timeout"] else 0,
+            ack.get("seq", 0)))
+
+    def ballast(self, command: str, t=None):
+        self.write("ballast", (time.time() if t is None else t, int(command, 2)))
+
+    # ---- Output ----
+
+    def _flush_stream(self, stream):
+        rows = self.rows[stream]
+        if not rows:
+            return
+        sid, dtype = STREAMS[stream]
+        arr = np.array(rows, dtype=dtype)
+        out = [_CHUNK.pack(b"CK", sid, len(rows))]
+        for name in dtype.names:
+            col = arr[name].tobytes()
+            out.append(col + b"\0" * (-len(col) % 8))
+        self.f.write(b"".join(out))
+        self.f.flush()
+        self.written += len(rows)
+        self.chunks  += 1
+        rows.clear()
+
+    def flush_stale(self, now=None):
+        """Write every stream whose first buffered row is flush_interval old."""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            for stream, rows in self.rows.items():
+                if rows and now - self.first[stream] >= self.flush_interval:
+                    self._flush_stream(stream)
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.flush_interval / 2):
+            self.flush_stale()
+
+    def flush(self):
+        with self.lock:
+            for stream in self.rows:
+                self._flush_stream(stream)
+
+    def close(self):
+        self._closed.set()
+        self._flusher.join(timeout=1.0)
+        self.flush()
+        self.f.close()
+
+    def stats(self) -> dict:
+        return {"rows": self.written, "chunks": self.chunks}
+
+
+def load(path) -> dict:
+    """
+    Recording as {stream: {column: array}}.
+
+    Only chunk headers are read; every column is a view into the mmap
+    (concatenated when a stream spans several chunks). Telemetry of a
+    version 1 file gets its left/right columns as a two-thruster vector.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= len(MAGIC):
+            return {name: {c: np.zeros(0, dtype[c]) for c in dtype.names} for name, (_, dtype) in STREAMS.items()}
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic = buf[:len(MAGIC)]
+    if magic not in (MAGIC, _MAGIC_V1):
+        raise ValueError(f"{path}: not a flight recording")
+    by_id = dict(_BY_ID)
+    if magic == _MAGIC_V1:
+        by_id[STREAMS["telem"][0]] = ("telem", _TELEM_V1)
+
+    parts = {name: {c: [] for c in dtype.names} for name, dtype in by_id.values()}
+    pos, end = len(MAGIC), len(buf)
+    while pos + _CHUNK.size <= end:
+        tag, sid, n = _CHUNK.unpack_from(buf, pos)
+        if tag != b"CK" or sid not in by_id:
+            break
+        name, dtype = by_id[sid]
+        size = _CHUNK.size + sum((n * dtype[c].itemsize + 7) // 8 * 8 for c in dtype.names)
+        if pos + size > end:
+            break  # chunk cut short by a crash
+        off = pos + _CHUNK.size
+        for c in dtype.names:
+            parts[name][c].append(np.frombuffer(buf, dtype[c], n, off))
+            off += (n * dtype[c].itemsize + 7) // 8 * 8
+        pos += size
+
+    out = {}
+    for name, dtype in by_id.values():
+        cols = parts[name]
+        out[name] = {c: (cols[c][0] if len(cols[c]) == 1 else
+                         np.concatenate(cols[c]) if cols[c] else np.zeros(0, dtype[c]))
+                     for c in dtype.names}
+    if magic == _MAGIC_V1:
+        telem  = out["telem"]
+        thrust = np.full((len(telem["t"]), REC_THRUSTERS), NAN, dtype="<f4")
+        thrust[:, 0], thrust[:, 1] = telem.pop("left"), telem.pop("right")
+        telem["n_thrust"] = np.full(len(telem["t"]), 2, dtype="u1")
+        telem["thrust"]   = thrust
+    return out
+
+
+def telem_row(cols, i) -> dict:
+    """Rebuild the telemetry dict (as decode_telem returns it) for row i."""
+    telem = {
+        "t": float(cols["t_sent"][i]),
+        "sens": {
+            "p1":     _opt(cols["p1"][i]),
+            "p2":     _opt(cols["p2"][i]),
+            "laser1": _opt(cols["laser1"][i]),
+            "laser2": _opt(cols["laser2"][i]),
+        },
+        "state": {
+            "arm":     bool(cols["arm"][i]),
+            "timeout": bool(cols["timeout"][i]),
+            "thrust":  cols["thrust"][i][:int(cols["n_thrust"][i])].tolist(),
+        },
+    }
+    if cols["n_thrust"][i] == 2:
+        telem["state"]["left"], telem["state"]["right"] = telem["state"]["thrust"]
+    if cols["ballast"][i] >= 0:
+        telem["ballast"] = {"cmd": format(int(cols["ballast"][i]), "04b"),
+                            "timeout": bool(cols["ballast_timeout"][i])}
+    return telem
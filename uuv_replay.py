@@ -0,0 +1,76 @@
+import argparse
+import socket
+import time
+
+from uuv_link import UdpUuvLink, UuvCmd
+from uuv_proto import MODES, WIRE_BINARY, WIRE_JSON, encode_telem
+from uuv_recorder import load, telem_row
+
+# Plays a flight recording back in real time (or faster):
+#   telem : recorded telemetry to the HUD's telemetry port, as the gateway would
+#   cmd   : recorded commands to a gateway through UdpUuvLink, as the HUD would
+
+
+def schedule(t, speed):
+    """Yield row indexes, sleeping so they come out `speed` times as fast as recorded."""
+    if not len(t):
+        return
+    t0    = float(t[0])
+    start = time.monotonic()
+    for i in range(len(t)):
+        delay = (float(t[i]) - t0) / speed - (time.monotonic() - start)
+        if delay > 0:
+            time.sleep(delay)
+        yield i
+
+
+def replay_telem(rec, hud_ip, port, speed, wire):
+    cols = rec["telem"]
+    tx   = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    for i in schedule(cols["t"], speed):
+        telem = telem_row(cols, i)
+        telem["t"] = time.time()  # keeps the HUD's age/jitter figures meaningful
+        tx.sendto(encode_telem(telem, wire), (hud_ip, port))
+    return len(cols["t"])
+
+
+def replay_cmd(rec, pi_ip, port, speed, wire):
+    cols = rec["cmd"]
+    link = UdpUuvLink(pi_ip=pi_ip, cmd_port=port, telemetry_port=0, wire=wire)
+    for i in schedule(cols["t"], speed):
+        mode = int(cols["mode"][i])
+        link.send(UuvCmd(
+            t=time.time(), mode=MODES[mode] if mode < len(MODES) else MODES[0], arm=bool(cols["arm"][i]),
+            surge=float(cols["surge"][i]), yaw=float(cols["yaw"][i]),
+            heave=float(cols["heave"][i]), ballast=float(cols["ballast"][i])
+        ), force=True)
+    return len(cols["t"])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a .uvrec flight recording over UDP")
+    ap.add_argument("path")
+    ap.add_argument("--stream", choices=("telem", "cmd"), default="telem")
+    ap.add_argument("--host",   default="127.0.0.1", help="HUD (telem) or gateway (cmd) address")
+    ap.add_argument("--port",   type=int, help="default 9001 for telem, 9000 for cmd")
+    ap.add_argument("--speed",  type=float, default=1.0, help="playback speed, e.g. 4 for 4x")
+    ap.add_argument("--json",   action="store_true", help="send JSON instead of binary")
+    ap.add_argument("--loop",   action="store_true")
+    args = ap.parse_args()
+
+    rec  = load(args.path)
+    wire = WIRE_JSON if args.json else WIRE_BINARY
+    print(f"[replay] {args.path}: " + ", ".join(f"{k} {len(v['t'])}" for k, v in rec.items()))
+
+    while True:
+        if args.stream == "telem":
+            n = replay_telem(rec, args.host, args.port or 9001, args.speed, wire)
+        else:
+            n = replay_cmd(rec, args.host, args.port or 9000, args.speed, wire)
+        print(f"[replay] sent {n} {args.stream} rows at {args.speed:g}x")
+        if not args.loop or not n:
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+import argparse
+import os
+import shutil
+import subprocess
+import time
+
+import numpy as np
+
+# Builds the HUD's GStreamer receive pipeline and decides when to rebuild it.
+#
+#   probe_decoders()  H.264 decoders this GStreamer install has
+#   pick_decoder()    the preferred one (or the fastest, measured)
+#   PipelineBuilder   pipeline string for a degradation level, with or
+#                     without the recording branch
+#   StreamHealth      drop rate and queueing delay of the decoded frames
+#   Adaptation        when to step the level down or back up
+#
+# Try it against the simulator's videotestsrc ! x264enc ! tcpserversink:
+#   python -m sim --gateway none
+#   python video_pipeline.py --host 127.0.0.1 --slow-ms 50
+#
+# Transports: TCP (tcpclientsrc from the Pi's tcpserversink) or RTP over
+# UDP, where the Pi sends to the laptop, e.g.
+#   rpicam-vid -t 0 --inline --low-latency -o - | gst-launch-1.0 fdsrc ! h264parse !
+#     rtph264pay config-interval=-1 pt=96 mtu=1200 ! udpsink host=192.168.0.1 port=5600
+# TCP resends every lost segment and stalls all frames behind it; RTP
+# loses the packet, so the picture glitches until the next keyframe but
+# never falls behind.
+TRANSPORT_TCP = "tcp"
+TRANSPORT_RTP = "rtp"
+RTP_CAPS = "application/x-rtp,media=video,clock-rate=90000,encoding-name=H264,payload=96"
+
+# Fastest first when present: hardware decoders, then FFmpeg with slice
+# threads (frame threads would add a frame of latency per thread).
+# (name, options, options from LEVEL_HALF on): the last makes the decoder
+# itself do less. avdec's skip-frame is gst-libav's own enum, not FFmpeg's
+# AVDiscard names: 0 nothing, 1 B-frames (frames nothing else references),
+# 2 IDCT/dequantization, 5 everything. Hardware decoders have no such knob
+# and do not load the CPU anyway.
+DECODERS = [
+    ("v4l2slh264dec", "", ""),    # stateless V4L2 (Pi 5, Rockchip)
+    ("v4l2h264dec",   "", ""),    # stateful V4L2 (Pi 4 and earlier)
+    ("vah264dec",     "", ""),    # VA-API (Intel, AMD)
+    ("nvh264dec",     "", ""),    # NVDEC
+    ("d3d11h264dec",  "", ""),    # Windows
+    ("vtdec_hw",      "", ""),    # macOS VideoToolbox
+    ("avdec_h264",    "max-threads={threads} thread-type=slice", "skip-frame=1"),
+    ("openh264dec",   "", ""),
+]
+FALLBACK_DECODER = "avdec_h264"
+
+# Degradation levels, mildest first. Each one cuts decode work, not just
+# what happens after it:
+LEVEL_FULL      = 0   # decode every frame, convert at display size
+LEVEL_HALF      = 1   # decoder skips non-reference frames; convert at half size
+LEVEL_KEYFRAMES = 2   # only keyframes reach the decoder, half size
+LEVEL_NAMES     = ("full", "half", "keyframes")
+
+
+def _gst_tool(name):
+    return shutil.which(name)
+
+
+def probe_decoders() -> list:
+    """Names from DECODERS that gst-inspect finds, in preference order."""
+    inspect = _gst_tool("gst-inspect-1.0")
+    if inspect is None:
+        return []
+    found = []
+    for name, *_ in DECODERS:
+        r = subprocess.run([inspect, "--exists", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if r.returncode == 0:
+            found.append(name)
+    return found
+
+
+def decoder_element(name, threads=None, reduced=False) -> str:
+    """gst-launch text for a decoder; reduced adds its LEVEL_HALF options."""
+    opts, cheap = next(((o, c) for n, o, c in DECODERS if n == name), ("", ""))
+    opts = opts.format(threads=threads or min(4, os.cpu_count() or 1))
+    return " ".join(x for x in (name, opts, cheap if reduced else "") if x)
+
+
+def benchmark_decoders(names, frames=150, width=1280, height=720) -> dict:
+    """
+    Decoder -> ms per frame on a videotestsrc clip, x264-encoded like the Pi
+    stream. The encode-only run is subtracted; decoders that fail are left out.
+    """
+    launch = _gst_tool("gst-launch-1.0")
+    if launch is None:
+        return {}
+    src = (f"videotestsrc num-buffers={frames} pattern=ball ! "
+           f"video/x-raw,width={width},height={height},framerate=30/1 ! "
+           "x264enc tune=zerolatency speed-preset=ultrafast key-int-max=30 ! h264parse")
+
+    def run(tail):
+        t0 = time.perf_counter()
+        r  = subprocess.run([launch, "-q"] + f"{src} ! {tail}".split(),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return (time.perf_counter() - t0) if r.returncode == 0 else None
+
+    base = run("fakesink sync=false")
+    if base is None:
+        return {}
+    out = {}
+    for name in names:
+        t = run(f"{decoder_element(name)} ! fakesink sync=false")
+        if t is not None:
+            out[name] = max(t - base, 0.0) / frames * 1e3
+    return out
+
+
+def pick_decoder(benchmark=False) -> str:
+    """The first available decoder in DECODERS, or the fastest measured one."""
+    found = probe_decoders()
+    if benchmark and len(found) > 1:
+        times = benchmark_decoders(found)
+        if times:
+            return min(times, key=times.get)
+    return found[0] if found else FALLBACK_DECODER
+
+
+class PipelineBuilder:
+    """
+    The HUD receive pipeline for a degradation level.
+
+    tcpclientsrc (udpsrc, for RTP) stamps every buffer with its arrival
+    time, so the PTS of a decoded frame tells StreamHealth how long it spent
+    in parse and decode.
+    The appsink keeps one frame and drops older ones, so a slow reader
+    always gets the newest frame.
+
+    record=<prefix> adds the recording tee: parsed H.264 goes to
+    splitmuxsink before any of the display branch's degradation, so the
+    recording keeps every frame at full resolution.
+
+    transport=TRANSPORT_RTP listens on UDP `port` instead (host is unused)
+    and reorders and times packets in an rtpjitterbuffer. Packets later
+    than jitter_ms are dropped. udpsrc binds `port` itself; loss and jitter
+    stats are opt-in:
+      stats_port  the Pi also sends the stream there, and VideoWorker reads
+                  that copy with a video_relay.RtpMonitor (passive)
+      relay_port  udpsrc listens there instead, and VideoWorker forwards
+                  `port` to it through a video_relay.UdpRelay (every packet
+                  goes through Python; for tests on one machine)
+    """
+    def __init__(self, host, port, w, h, decoder=FALLBACK_DECODER, threads=None,
+                 mux="mkv", segment_s=300, segment_mb=1024,
+                 transport=TRANSPORT_TCP, jitter_ms=50, stats_port=None, relay_port=None):
+        if transport not in (TRANSPORT_TCP, TRANSPORT_RTP):
+            raise ValueError(f"unknown transport {transport!r}")
+        self.host, self.port = host, port
+        self.transport  = transport
+        self.jitter_ms  = jitter_ms
+        self.stats_port = stats_port
+        self.relay_port = relay_port
+        self.w, self.h  = w, h
+        self.decoder    = decoder
+        self.threads    = threads
+        self.mux        = mux
+        self.segment_s  = segment_s
+        self.segment_mb = segment_mb
+
+    def size(self, level):
+        if level >= LEVEL_HALF:
+            return self.w // 2 & ~1, self.h // 2 & ~1
+        return self.w, self.h
+
+    def skip_from(self) -> int:
+        """First level at which frames go undecoded on purpose."""
+        cheap = next((c for n, _, c in DECODERS if n == self.decoder), "")
+        return LEVEL_HALF if cheap else LEVEL_KEYFRAMES
+
+    def display(self, level) -> str:
+        w, h = self.size(level)
+        keyframes = "identity drop-buffer-flags=delta-unit ! " if level >= LEVEL_KEYFRAMES else ""
+        return (
+            f"{keyframes}{decoder_element(self.decoder, self.threads, level >= LEVEL_HALF)} ! "
+            "videoscale ! videoconvert ! "
+            f"video/x-raw,format=BGR,width={w},height={h} ! "
+            "appsink drop=true max-buffers=1 sync=false"
+        )
+
+    def source(self) -> str:
+        """Everything up to parsed H.264, for either transport."""
+        if self.transport == TRANSPORT_RTP:
+            return (
+                f"udpsrc port={self.relay_port or self.port} buffer-size=2097152 caps=\"{RTP_CAPS}\" ! "
+                f"rtpjitterbuffer latency={self.jitter_ms} drop-on-latency=true ! "
+                "rtph264depay ! h264parse"
+            )
+        return f"tcpclientsrc host={self.host} port={self.port} do-timestamp=true ! h264parse"
+
+    def build(self, level=LEVEL_FULL, record=None) -> str:
+        src = self.source()
+        if record is None:
+            return f"{src} ! {self.display(level)}"
+
+        # The recording queue leaks, so a slow disk drops recorded data
+        # instead of ever stalling the display
+        if self.mux == "mp4":
+            muxer = 'muxer-factory=mp4mux muxer-properties="properties,fragment-duration=1000"'
+        else:
+            muxer = "muxer-factory=matroskamux"
+        return (
+            f"{src} ! tee name=t "
+            f"t. ! queue ! {self.display(level)} "
+            "t. ! queue leaky=downstream max-size-buffers=0 max-size-bytes=0 max-size-time=3000000000 ! "
+            f"splitmuxsink location={record}_%05d.{self.mux} {muxer} "
+            f"max-size-time={self.segment_s * 10**9} max-size-bytes={self.segment_mb * 2**20}"
+        )
+
+
+class StreamHealth:
+    """
+    Per-window stats of decoded frames from their PTS (arrival time at the
+    tcpclientsrc) and the time the reader got them.
+
+      drop_rate : frames missing from the PTS sequence at the stream's fps,
+                  whether dropped at the appsink or never decoded
+      delay_ms  : p95 of (read time - PTS) above the lowest ever seen; the
+                  clocks differ by an unknown constant, so this is the delay
+                  added by queueing in parse/decode, not the absolute latency
+    """
+    def __init__(self, fps=30.0, window=2.0):
+        self.fps    = fps
+        self.window = window
+        self.reset()
+
+    def reset(self, now=None, fps=None):
+        """Start over, e.g. for a new pipeline; fps is its nominal frame rate."""
+        if fps:
+            self.fps = fps
+        self.base    = None   # lowest (now - pts) seen since the pipeline started
+        self.last    = None
+        self.start   = now
+        self.frames  = 0
+        self.missing = 0
+        self.lags    = []
+
+    def add(self, pts, now):
+        if self.start is None:
+            self.start = now
+        lag = now - pts
+        if self.base is None or lag < self.base:
+            self.base = lag
+        if self.last is not None:
+            self.missing += max(0, int(round((pts - self.last) * self.fps)) - 1)
+        self.last = pts
+        self.frames += 1
+        self.lags.append(lag)
+
+    def report(self, now):
+        """Stats once a window has passed (then a new window starts), else None."""
+        if self.start is None or now - self.start < self.window or not self.frames:
+            return None
+        lags = np.array(self.lags) - self.base
+        out  = {
+            "fps":       self.frames / (now - self.start),
+            "drop_rate": self.missing / (self.frames + self.missing),
+            "delay_ms":  float(np.percentile(lags, 95)) * 1e3,
+        }
+        self.start, self.frames, self.missing, self.lags = now, 0, 0, []
+        return out
+
+
+class Adaptation:
+    """
+    Degradation level from successive StreamHealth reports.
+
+    bad_windows bad reports in a row step one level down (more degraded);
+    good_windows good ones step back up. A level that goes bad right after
+    an upgrade doubles the good streak needed next time (up to
+    max_good_windows), so a link that cannot hold a level stops bouncing.
+    Drops do not count from skip_from on (PipelineBuilder.skip_from), where
+    the decoder skips frames on purpose.
+    """
+    def __init__(self, max_drop=0.10, max_delay_ms=150.0, bad_windows=2, good_windows=5,
+                 max_good_windows=60, max_level=LEVEL_KEYFRAMES, skip_from=LEVEL_KEYFRAMES):
+        self.max_drop     = max_drop
+        self.max_delay_ms = max_delay_ms
+        self.bad_windows  = bad_windows
+        self.good_windows = good_windows
+        self.max_good     = max_good_windows
+        self.max_level    = max_level
+        self.skip_from    = skip_from
+        self.level        = LEVEL_FULL
+        self.bad  = 0
+        self.good = 0
+        self.good_needed   = good_windows
+        self._just_upgraded = False
+
+    def update(self, report) -> int:
+        drop  = report["drop_rate"] if self.level < self.skip_from else 0.0
+        delay = report["delay_ms"]
+        if drop > self.max_drop or delay > self.max_delay_ms:
+            self.bad, self.good = self.bad + 1, 0
+        elif drop < self.max_drop / 2 and delay < self.max_delay_ms / 2:
+            self.good, self.bad = self.good + 1, 0
+        else:
+            self.good = self.bad = 0
+
+        if self.bad >= self.bad_windows and self.level < self.max_level:
+            if self._just_upgraded:
+                self.good_needed = min(self.good_needed * 2, self.max_good)
+            self.level += 1
+            self.bad = self.good = 0
+            self._just_upgraded = False
+        elif self.good >= self.good_needed and self.level > LEVEL_FULL:
+            self.level -= 1
+            self.bad = self.good = 0
+            self._just_upgraded = True
+        elif self.good >= self.good_needed:
+            self._just_upgraded = False
+        return self.level
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Probe H.264 decoders or watch the adaptive video pipeline")
+    ap.add_argument("--probe",   action="store_true", help="list decoders (with --bench, time them) and exit")
+    ap.add_argument("--bench",   action="store_true", help="pick the decoder by measured speed")
+    ap.add_argument("--decoder", help="use this decoder instead of probing")
+    ap.add_argument("--host",    default="127.0.0.1")
+    ap.add_argument("--port",    type=int, default=8000, help="TCP server port, or the UDP port for rtp")
+    ap.add_argument("--transport", choices=(TRANSPORT_TCP, TRANSPORT_RTP), default=TRANSPORT_TCP)
+    ap.add_argument("--jitter-ms", type=int, default=50, help="rtpjitterbuffer latency budget")
+    ap.add_argument("--size",    default="1000x750")
+    ap.add_argument("--seconds", type=float, default=30.0)
+    ap.add_argument("--slow-ms", type=float, default=0.0, help="extra time per frame, to provoke drops")
+    args = ap.parse_args()
+
+    if args.probe:
+        found = probe_decoders()
+        times = benchmark_decoders(found) if args.bench else {}
+        for name in found:
+            t = f"{times[name]:.2f} ms/frame" if name in times else ""
+            print(f"{decoder_element(name):48s} {t}")
+        if not found:
+            print("no decoders found (is gst-inspect-1.0 installed?)")
+        return
+
+    import cv2
+    w, h    = map(int, args.size.split("x"))
+    builder = PipelineBuilder(args.host, args.port, w, h, args.decoder or pick_decoder(args.bench),
+                              transport=args.transport, jitter_ms=args.jitter_ms)
+    adapt   = Adaptation(skip_from=builder.skip_from())
+    level   = LEVEL_FULL
+    print(f"[video] {builder.build(level)}")
+    cap    = cv2.VideoCapture(builder.build(level), cv2.CAP_GSTREAMER)
+    health = StreamHealth(cap.get(cv2.CAP_PROP_FPS) or 30.0)
+    end    = time.monotonic() + args.seconds
+    while time.monotonic() < end:
+        ok, _ = cap.read()
+        if not ok:
+            print("[video] no frame; is the stream up? (python -m sim --gateway none)")
+            time.sleep(1.0)
+            continue
+        now = time.monotonic()
+        health.add(cap.get(cv2.CAP_PROP_POS_MSEC) / 1e3, now)
+        if args.slow_ms:
+            time.sleep(args.slow_ms / 1e3)
+        report = health.report(now)
+        if report is None:
+            continue
+        print(f"[video] {LEVEL_NAMES[level]:9s} fps {report['fps']:5.1f}  "
+              f"drop {report['drop_rate'] * 100:5.1f}%  delay p95 {report['delay_ms']:6.1f} ms")
+        new = adapt.update(report)
+        if new != level:
+            level = new
+            print(f"[video] -> {LEVEL_NAMES[level]}")
+            cap.release()
+            cap = cv2.VideoCapture(builder.build(level), cv2.CAP_GSTREAMER)
+            health.reset(fps=cap.get(cv2.CAP_PROP_FPS))
+    cap.release()
+
+
+if __name__ == "__main__":
+    main()
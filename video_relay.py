@@ -0,0 +1,262 @@
+import random
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+# Relays in front of the HUD's video receiver, and a passive RTP monitor:
+#
+#   RtpMonitor  reads a copy of the RTP stream the Pi sends to a second port
+#               (multiudpsink) and keeps RTP loss/jitter stats (RtpStats).
+#               Video never passes through it; it exists because cv2 cannot
+#               read the rtpjitterbuffer element's own counters.
+#   UdpRelay    forwards RTP datagrams, with the same stats. With loss/delay
+#               it is the lossy link for tests; the HUD only puts one in the
+#               video path when asked to (main.RTP_RELAY_PORT).
+#   TcpRelay    forwards a TCP byte stream. A "lost" segment holds it and
+#               everything behind it for one retransmission timeout, as TCP
+#               does. This is the same lossy link for the TCP mode.
+#
+# The relays take loss as a probability per packet or segment.
+
+_RTP_HEADER = struct.Struct("!BBHII")
+RTP_CLOCK   = 90000   # H.264 RTP timestamp rate
+TCP_SEGMENT = 1448    # bytes per emulated segment (Ethernet MSS with timestamps)
+
+
+class RtpStats:
+    """
+    RFC 3550 receive statistics: loss from the extended sequence number,
+    interarrival jitter, plus packets that arrived later than the jitter
+    buffer's latency budget (the lowest transit seen is taken as zero, so
+    late means held up by more than the budget) and would be dropped there.
+    """
+    def __init__(self, latency_ms=50.0):
+        self.latency = latency_ms / 1e3
+        self.received   = 0
+        self.duplicates = 0
+        self.late       = 0
+        self.jitter     = 0.0   # seconds
+        self._base_seq  = None
+        self._max_seq   = 0     # extended
+        self._transit   = None
+        self._min_transit = None
+        self._seen      = deque(maxlen=512)
+
+    def on_packet(self, data: bytes, now):
+        if len(data) < _RTP_HEADER.size or data[0] >> 6 != 2:
+            return
+        _, _, seq, ts, _ = _RTP_HEADER.unpack_from(data)
+        if seq in self._seen:
+            self.duplicates += 1
+            return
+        self._seen.append(seq)
+        self.received += 1
+
+        # Extend the 16-bit sequence number across wraps
+        if self._base_seq is None:
+            self._base_seq = self._max_seq = seq
+        else:
+            ext = (self._max_seq & ~0xFFFF) | seq
+            if ext < self._max_seq - 0x8000:
+                ext += 0x10000
+            elif ext > self._max_seq + 0x8000:
+                ext -= 0x10000
+            self._max_seq = max(self._max_seq, ext)
+
+        transit = now - ts / RTP_CLOCK
+        if self._transit is not None:
+            d = abs(transit - self._transit)
+            if d < 1.0:   # ignore timestamp jumps (new stream, encoder restart)
+                self.jitter += (d - self.jitter) / 16.0
+        self._transit = transit
+        if self._min_transit is None or transit < self._min_transit:
+            self._min_transit = transit
+        elif transit - self._min_transit > self.latency:
+            self.late += 1
+
+    @property
+    def expected(self) -> int:
+        return 0 if self._base_seq is None else self._max_seq - self._base_seq + 1
+
+    @property
+    def lost(self) -> int:
+        return max(0, self.expected - self.received)
+
+    def stats(self) -> dict:
+        expected = self.expected
+        return {
+            "received":   self.received,
+            "lost":       self.lost,
+            "loss_rate":  self.lost / expected if expected else 0.0,
+            "late":       self.late,
+            "duplicates": self.duplicates,
+            "jitter_ms":  self.jitter * 1e3,
+        }
+
+
+class RtpMonitor(threading.Thread):
+    """
+    RtpStats of the datagrams arriving on listen_port, which are then
+    discarded. The video itself goes straight to udpsrc; this only sees a
+    copy, so a slow or stopped monitor cannot delay or drop a frame.
+    """
+    def __init__(self, listen_port, latency_ms=50.0, bind="0.0.0.0"):
+        super().__init__(name="rtp-monitor", daemon=True)
+        self.rtp = RtpStats(latency_ms)
+        self.rx  = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rx.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 21)
+        self.rx.bind((bind, listen_port))
+        self.rx.settimeout(0.2)
+        self._running = True
+
+    def start(self):
+        super().start()
+        return self
+
+    def run(self):
+        while self._running:
+            try:
+                data = self.rx.recv(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.rtp.on_packet(data, time.time())
+
+    def stop(self):
+        self._running = False
+        self.join(timeout=1.0)
+        self.rx.close()
+
+    def stats(self) -> dict:
+        return self.rtp.stats()
+
+
+class UdpRelay(threading.Thread):
+    """
+    Datagrams from listen_port to `forward`, after RtpStats. Each one is
+    dropped with probability loss, otherwise delayed by delay_ms plus up to
+    jitter_ms (late ones may overtake, as on a real network).
+    """
+    def __init__(self, listen_port, forward, loss=0.0, delay_ms=0.0, jitter_ms=0.0,
+                 latency_ms=50.0, bind="0.0.0.0"):
+        super().__init__(name="udp-relay", daemon=True)
+        self.forward  = forward
+        self.loss     = loss
+        self.delay    = delay_ms / 1e3
+        self.jitter   = jitter_ms / 1e3
+        self.rtp      = RtpStats(latency_ms)
+        self.dropped  = 0
+        self.rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rx.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 21)
+        self.rx.bind((bind, listen_port))
+        self.tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._queue   = []   # (due, seq, data), kept sorted
+        self._running = True
+
+    def start(self):
+        super().start()
+        return self
+
+    def run(self):
+        n = 0
+        while self._running:
+            # Wake up in time for the next delayed datagram
+            wait = self._queue[0][0] - time.monotonic() if self._queue else 0.05
+            self.rx.settimeout(min(0.05, max(0.0005, wait)))
+            try:
+                data = self.rx.recv(65535)
+            except socket.timeout:
+                data = None
+            now = time.monotonic()
+            if data is not None:
+                self.rtp.on_packet(data, time.time())
+                if self.loss and random.random() < self.loss:
+                    self.dropped += 1
+                elif not (self.delay or self.jitter):
+                    self.tx.sendto(data, self.forward)
+                else:
+                    n += 1
+                    self._queue.append((now + self.delay + random.uniform(0, self.jitter), n, data))
+                    self._queue.sort()
+            while self._queue and self._queue[0][0] <= now:
+                self.tx.sendto(self._queue.pop(0)[2], self.forward)
+
+    def stop(self):
+        self._running = False
+        self.join(timeout=1.0)
+        self.rx.close()
+        self.tx.close()
+
+    def stats(self) -> dict:
+        return dict(self.rtp.stats(), relay_dropped=self.dropped)
+
+
+class TcpRelay(threading.Thread):
+    """
+    One TCP client at a time on listen_port, fed from `upstream`. The stream
+    is cut into TCP_SEGMENT pieces. Each piece is lost with probability loss
+    and then arrives rto_ms late, together with everything queued behind it.
+    """
+    def __init__(self, listen_port, upstream, loss=0.0, rto_ms=200.0, bind="0.0.0.0"):
+        super().__init__(name="tcp-relay", daemon=True)
+        self.upstream = upstream
+        self.loss     = loss
+        self.rto      = rto_ms / 1e3
+        self.stalls   = 0
+        self.srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.srv.bind((bind, listen_port))
+        self.srv.listen(1)
+        self.srv.settimeout(0.2)
+        self._running = True
+
+    def start(self):
+        super().start()
+        return self
+
+    def run(self):
+        while self._running:
+            try:
+                client, _ = self.srv.accept()
+            except socket.timeout:
+                continue
+            try:
+                up = socket.create_connection(self.upstream, timeout=2.0)
+            except OSError:
+                client.close()
+                continue
+            up.settimeout(0.2)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                self._pump(up, client)
+            except OSError:
+                pass
+            finally:
+                up.close()
+                client.close()
+
+    def _pump(self, up, client):
+        while self._running:
+            try:
+                data = up.recv(65536)
+            except socket.timeout:
+                continue
+            if not data:
+                return
+            for i in range(0, len(data), TCP_SEGMENT):
+                if self.loss and random.random() < self.loss:
+                    # Head-of-line blocking: nothing behind the lost segment is delivered
+                    self.stalls += 1
+                    time.sleep(self.rto)
+                client.sendall(data[i:i + TCP_SEGMENT])
+
+    def stop(self):
+        self._running = False
+        self.join(timeout=1.0)
+        self.srv.close()
+
+    def stats(self) -> dict:
+        return {"stalls": self.stalls}
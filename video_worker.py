@@ -0,0 +1,317 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Header slots (int64) at the start of the shared block
+H_SEQ       = 0  # sequence number of the newest complete frame (0 = none yet)
+H_LATEST    = 1  # ring slot holding that frame
+H_READ_FAIL = 2  # cap.read() failures in the worker
+H_REOPENS   = 3  # pipeline (re)open attempts
+H_RECORDING = 4  # 1 while the pipeline with the recording branch is live
+H_LEVEL     = 5  # video_pipeline degradation level of the live pipeline
+H_DROP_PM   = 6  # frames missing from the stream in the last health window, per mille
+H_DELAY_US  = 7  # p95 queueing delay in parse/decode over that window
+H_RTP_LOST  = 8  # RTP mode: packets lost on the way from the Pi
+H_RTP_LATE  = 9  # RTP mode: packets later than the jitter buffer budget
+H_RTP_JITTER_US = 10  # RTP mode: RFC 3550 interarrival jitter
+H_WORDS     = 11
+
+
+class FrameRing:
+    """
+    Ring of preallocated 24-bit frames in shared memory.
+
+    Layout: int64 header[H_WORDS] | int64 slot_seq[slots] | uint8 frames[slots, h, w, 3]
+
+    The writer always fills the slot after the newest one, so with 3+ slots
+    the frame the reader is currently showing is never the one being written.
+    slot_seq is -1 while a slot is being filled.
+    """
+    def __init__(self, w, h, slots=3, name=None):
+        self.w, self.h, self.slots = w, h, slots
+        meta_words  = H_WORDS + slots
+        frame_bytes = w * h * 3
+        size = meta_words * 8 + slots * frame_bytes
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.meta = np.ndarray((meta_words,), dtype=np.int64, buffer=self.shm.buf)
+        self.slot_seq = self.meta[H_WORDS:]
+        self.frames = np.ndarray((slots, h, w, 3), dtype=np.uint8,
+                                 buffer=self.shm.buf, offset=meta_words * 8)
+        if self.owner:
+            self.meta[:] = 0
+
+        # Reader-side counters
+        self.last_seq   = 0
+        self.dropped    = 0
+        self.duplicated = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # ---- writer side (worker process) ----
+
+    def begin_write(self) -> int:
+        k = (int(self.meta[H_LATEST]) + 1) % self.slots
+        self.slot_seq[k] = -1
+        return k
+
+    def commit(self, k: int):
+        seq = int(self.meta[H_SEQ]) + 1
+        self.slot_seq[k] = seq
+        self.meta[H_LATEST] = k
+        self.meta[H_SEQ] = seq
+
+    # ---- reader side (HUD process) ----
+
+    def latest_slot(self):
+        """
+        Return (seq, slot) for the newest complete frame, or (0, -1) before
+        the first frame arrives. The slot stays valid until the writer laps
+        the ring.
+        """
+        k   = int(self.meta[H_LATEST])
+        seq = int(self.slot_seq[k])
+        if seq <= 0:
+            return 0, -1
+
+        if seq == self.last_seq:
+            self.duplicated += 1
+        elif self.last_seq and seq > self.last_seq + 1:
+            self.dropped += seq - self.last_seq - 1
+        self.last_seq = seq
+        return seq, k
+
+    def latest(self):
+        """Return (seq, frame) as a zero-copy view, or (0, None)."""
+        seq, k = self.latest_slot()
+        if k < 0:
+            return 0, None
+        return seq, self.frames[k]
+
+    def stats(self) -> dict:
+        return {
+            "frames":     int(self.meta[H_SEQ]),
+            "dropped":    self.dropped,
+            "duplicated": self.duplicated,
+            "read_fail":  int(self.meta[H_READ_FAIL]),
+            "reopens":    int(self.meta[H_REOPENS]),
+            "recording":  bool(self.meta[H_RECORDING]),
+            "level":      int(self.meta[H_LEVEL]),
+            "drop_rate":  int(self.meta[H_DROP_PM]) / 1000,
+            "delay_ms":   int(self.meta[H_DELAY_US]) / 1000,
+            "rtp_lost":   int(self.meta[H_RTP_LOST]),
+            "rtp_late":   int(self.meta[H_RTP_LATE]),
+            "rtp_jitter_ms": int(self.meta[H_RTP_JITTER_US]) / 1000,
+        }
+
+    def close(self):
+        # Drop numpy views before closing the mapping
+        self.meta = self.slot_seq = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class _Opener(threading.Thread):
+    """Opens a capture off the read loop, so the old pipeline keeps delivering meanwhile."""
+    def __init__(self, pipeline, recording, level):
+        super().__init__(name="video-open", daemon=True)
+        self.pipeline  = pipeline
+        self.recording = recording
+        self.level     = level
+        self.cap       = None
+
+    def run(self):
+        import cv2
+        self.cap = cv2.VideoCapture(self.pipeline, cv2.CAP_GSTREAMER)
+
+
+def _worker_main(pipeline, ring_name, w, h, slots, fmt, mirror, stop, record_pipeline, control, adapt):
+    import cv2
+    from video_pipeline import TRANSPORT_RTP, PipelineBuilder, StreamHealth
+    from video_relay import RtpMonitor, UdpRelay
+
+    ring = FrameRing(w, h, slots, name=ring_name)
+    scaled = np.empty((h, w, 3), dtype=np.uint8)
+    rgb    = np.empty((h, w, 3), dtype=np.uint8)
+    cap = None
+    prefix  = None   # recording file prefix while recording
+    pending = None   # _Opener for a pipeline swap in progress
+    builder = pipeline if isinstance(pipeline, PipelineBuilder) else None
+    health  = StreamHealth()
+    if builder is None:
+        adapt = None   # a fixed string cannot be rebuilt
+
+    # RTP loss/jitter stats, opt-in: from a copy of the stream (passive),
+    # or from a relay the packets pass on their way to udpsrc
+    relay = None
+    if builder is not None and builder.transport == TRANSPORT_RTP:
+        if builder.relay_port:
+            relay = UdpRelay(builder.port, ("127.0.0.1", builder.relay_port), latency_ms=builder.jitter_ms)
+        elif builder.stats_port:
+            relay = RtpMonitor(builder.stats_port, latency_ms=builder.jitter_ms)
+    if relay is not None:
+        relay.start()
+
+    def make(level, prefix, part=0):
+        # A reopen mid-recording starts a new file set instead of overwriting
+        name = None if prefix is None else prefix if not part else f"{prefix}_r{part}"
+        if builder is not None:
+            return builder.build(level, name)
+        return pipeline if name is None else record_pipeline.replace("{location}", name)
+
+    def swap(level, prefix):
+        opener = _Opener(make(level, prefix), prefix is not None, level)
+        opener.start()
+        return opener
+
+    while not stop.is_set():
+        # Recording start/stop and level changes swap pipelines
+        # make-before-break: the new one is opened in the background and
+        # replaces the old only once it is up
+        if pending is None and (record_pipeline or builder):
+            try:
+                prefix = control.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                pending = swap(int(ring.meta[H_LEVEL]), prefix)
+        if pending is not None and not pending.is_alive():
+            if pending.cap.isOpened():
+                if cap is not None:
+                    # Releasing the recording pipeline closes its last segment
+                    threading.Thread(target=cap.release, daemon=True).start()
+                cap = pending.cap
+                ring.meta[H_RECORDING] = 1 if pending.recording else 0
+                ring.meta[H_LEVEL]     = pending.level
+                health.reset(fps=cap.get(cv2.CAP_PROP_FPS))
+            else:
+                pending.cap.release()
+                if adapt is not None:
+                    adapt.level = int(ring.meta[H_LEVEL])
+            pending = None
+
+        if cap is None or not cap.isOpened():
+            ring.meta[H_REOPENS] += 1
+            part = int(ring.meta[H_REOPENS]) if ring.meta[H_RECORDING] else 0
+            cap = cv2.VideoCapture(make(int(ring.meta[H_LEVEL]), prefix if part else None, part),
+                                   cv2.CAP_GSTREAMER)
+            if not cap.isOpened():
+                time.sleep(1.0)
+                continue
+            health.reset(fps=cap.get(cv2.CAP_PROP_FPS))
+
+        ret, frame = cap.read()
+        if relay is not None:
+            rtp = relay.rtp
+            ring.meta[H_RTP_LOST]      = rtp.lost
+            ring.meta[H_RTP_LATE]      = rtp.late
+            ring.meta[H_RTP_JITTER_US] = int(rtp.jitter * 1e6)
+        if not ret:
+            ring.meta[H_READ_FAIL] += 1
+            time.sleep(0.01)
+            continue
+
+        # Stream health from the frame's arrival stamp; a bad run of windows
+        # rebuilds the pipeline one level down (video_pipeline.Adaptation)
+        now = time.monotonic()
+        health.add(cap.get(cv2.CAP_PROP_POS_MSEC) / 1e3, now)
+        report = health.report(now)
+        if report is not None:
+            ring.meta[H_DROP_PM]  = int(report["drop_rate"] * 1000)
+            ring.meta[H_DELAY_US] = int(report["delay_ms"] * 1000)
+            if adapt is not None and pending is None:
+                level = adapt.update(report)
+                if level != ring.meta[H_LEVEL]:
+                    pending = swap(level, prefix)
+
+        # Normally the pipeline already scales to (w, h); every step below
+        # writes into a preallocated buffer and the last one into the slot.
+        k   = ring.begin_write()
+        dst = ring.frames[k]
+        if frame.shape[0] != h or frame.shape[1] != w:
+            cv2.resize(frame, (w, h), dst=scaled)
+            frame = scaled
+        if fmt == "RGB":
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+            frame = rgb
+        if mirror:
+            cv2.flip(frame, 1, dst=dst)
+        else:
+            np.copyto(dst, frame)
+        ring.commit(k)
+
+    if cap is not None:
+        cap.release()
+    if relay is not None:
+        relay.stop()
+    if pending is not None:
+        pending.join(timeout=2.0)
+        if pending.cap is not None:
+            pending.cap.release()
+    ring.close()
+
+
+class VideoWorker:
+    """
+    Runs GStreamer decode (plus any resize/convert the pipeline did not do)
+    in a separate process. The HUD calls latest() every frame; it never
+    blocks on the network.
+
+    pipeline is a fixed pipeline string or a video_pipeline.PipelineBuilder.
+    With a builder, recording needs no record_pipeline, and adapt (a
+    video_pipeline.Adaptation) rebuilds the pipeline at a lower level when
+    the stream falls behind, and back up once it keeps up again.
+
+    fmt is the byte order stored in the ring ("BGR" or "RGB").
+    mirror flips horizontally, matching the np.rot90 orientation the HUD
+    has always displayed.
+
+    record_pipeline is the same pipeline with a recording branch whose file
+    location is "{location}"; record(prefix) switches to it and record(None)
+    back, without a gap in the displayed frames.
+    """
+    def __init__(self, pipeline, w, h, slots=3, fmt="BGR", mirror=True, record_pipeline=None, adapt=None):
+        self.ring = FrameRing(w, h, slots)
+        self.fmt  = fmt
+        ctx = mp.get_context("spawn")
+        self.stop    = ctx.Event()
+        self.control = ctx.Queue()
+        self.proc = ctx.Process(
+            target=_worker_main,
+            args=(pipeline, self.ring.name, w, h, slots, fmt, mirror, self.stop,
+                  record_pipeline, self.control, adapt),
+            daemon=True,
+        )
+
+    def start(self):
+        self.proc.start()
+        return self
+
+    def latest(self):
+        return self.ring.latest()
+
+    def record(self, prefix):
+        """Start recording to files starting with prefix, or stop with None."""
+        self.control.put(prefix)
+
+    @property
+    def recording(self) -> bool:
+        return bool(self.ring.meta[H_RECORDING])
+
+    def stats(self) -> dict:
+        return self.ring.stats()
+
+    def close(self):
+        self.stop.set()
+        self.proc.join(timeout=2.0)
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.ring.close()